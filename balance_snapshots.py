@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instantanés persistants des soldes mensuels
+
+Les séries de soldes calculées sont enregistrées à côté des fichiers utilisateur de data/,
+dans un format binaire en colonnes (un en-tête JSON suivi des colonnes brutes alignées)
+relu par projection mémoire. Chaque instantané porte une empreinte des transactions (ou d'une
+version des données, comme la date de modification du fichier utilisateur) et des paramètres qui
+l'ont produit : s'ils changent, l'instantané est ignoré et recalculé.
+"""
+
+import os
+import json
+import struct
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from logging import debug, info, warning
+from functions.balance_calculator import calculate_monthly_balances
+from period_boundaries import get_anchor_month
+
+# Version du format : à incrémenter si la disposition du fichier change
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b"MBSNAP01"
+SNAPSHOT_EXTENSION = ".mbsnap"
+
+# Dossier des fichiers utilisateur ; les instantanés sont rangés dans data/snapshots/<utilisateur>/
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Colonnes des transactions prises en compte dans l'empreinte
+_CHECKSUM_COLUMNS = ['Date', 'Amount', 'Type', 'AccountId', 'ToAccountId']
+
+# Alignement des colonnes dans le fichier, pour une projection mémoire directe
+_ALIGNMENT = 8
+
+def snapshot_path(user_id: str, account_id: Optional[int], month_mode: str,
+                  financial_month_day: int, data_dir: Optional[str] = None) -> str:
+    """
+    Retourne le chemin de l'instantané d'un compte
+
+    Args:
+        user_id: Identifiant de l'utilisateur (nom du fichier data/<hash>.json)
+        account_id: Identifiant du compte, ou None pour tous les comptes
+        month_mode: 'calendar' ou 'financial'
+        financial_month_day: Jour du début du mois financier
+        data_dir: Dossier des données (data/ du projet par défaut)
+
+    Returns:
+        Chemin du fichier d'instantané
+    """
+    account_part = "all" if account_id is None else str(account_id)
+    filename = f"{account_part}_{month_mode}_{financial_month_day}{SNAPSHOT_EXTENSION}"
+    return os.path.join(data_dir or DATA_DIR, "snapshots", str(user_id), filename)
+
+def compute_source_checksum(transactions_df: pd.DataFrame, **parameters) -> str:
+    """
+    Calcule l'empreinte des transactions et des paramètres d'un calcul de soldes
+
+    Args:
+        transactions_df: DataFrame des transactions ou TransactionStore
+        **parameters: Paramètres du calcul (date de création, solde initial, date de fin, ...)
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    if not isinstance(transactions_df, pd.DataFrame):
+        # TransactionStore : empreinte directe de ses tableaux
+        digest.update(transactions_df.checksum().encode("utf-8"))
+    else:
+        columns = [col for col in _CHECKSUM_COLUMNS if col in transactions_df.columns]
+        digest.update(json.dumps(columns).encode("utf-8"))
+        if len(transactions_df):
+            row_hashes = pd.util.hash_pandas_object(transactions_df[columns], index=False).to_numpy()
+            digest.update(row_hashes.tobytes())
+
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+def compute_version_checksum(data_version: str, **parameters) -> str:
+    """
+    Calcule l'empreinte d'un calcul de soldes à partir d'une version des données, sans lire les transactions
+
+    Args:
+        data_version: Version des données sources (voir file_data_version)
+        **parameters: Paramètres du calcul
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"version:" + str(data_version).encode("utf-8"))
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+def file_data_version(path: str) -> str:
+    """
+    Version d'un fichier utilisateur : date de modification (ns) et taille
+
+    Toute écriture de l'application ou d'un import réécrit le fichier et change cette version.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def save_snapshot(path: str, balances: pd.Series, checksum: str) -> None:
+    """
+    Enregistre une série de soldes mensuels
+
+    L'écriture passe par un fichier temporaire renommé, pour ne jamais laisser d'instantané partiel.
+
+    Args:
+        path: Chemin de l'instantané
+        balances: Soldes indexés par mois ('YYYY-MM')
+        checksum: Empreinte des données sources
+    """
+    months = np.array(balances.index.tolist(), dtype='datetime64[M]').astype(np.int64).astype(np.int32)
+    values = np.ascontiguousarray(balances.to_numpy())
+
+    columns = []
+    offset = 0
+    for name, array in (("month", months), ("balance", values)):
+        columns.append({"name": name, "dtype": array.dtype.str, "offset": offset})
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "checksum": checksum,
+        "rows": len(values),
+        "columns": columns,
+        "created_at": datetime.now().isoformat()
+    }).encode("utf-8")
+    # Les colonnes commencent à une position alignée après l'en-tête
+    header += b" " * (-(len(SNAPSHOT_MAGIC) + 4 + len(header)) % _ALIGNMENT)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for array in (months, values):
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % _ALIGNMENT))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    debug("Instantané enregistré: %s (%s mois)", path, len(values), module="balance_snapshots")
+
+def load_snapshot(path: str, checksum: Optional[str] = None) -> Optional[pd.Series]:
+    """
+    Relit une série de soldes mensuels par projection mémoire
+
+    Args:
+        path: Chemin de l'instantané
+        checksum: Empreinte attendue des données sources (aucune vérification si None)
+
+    Returns:
+        Soldes indexés par mois ('YYYY-MM'), ou None si l'instantané est absent, illisible ou périmé
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                warning("Instantané invalide ignoré: %s", path, module="balance_snapshots")
+                return None
+            header_length, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length))
+        data_offset = len(SNAPSHOT_MAGIC) + 4 + header_length
+
+        if header.get("version") != SNAPSHOT_FORMAT_VERSION:
+            debug("Instantané d'une autre version de format ignoré: %s", path, module="balance_snapshots")
+            return None
+        if checksum is not None and header.get("checksum") != checksum:
+            debug("Instantané périmé: %s", path, module="balance_snapshots")
+            return None
+
+        rows = header["rows"]
+        if rows == 0:
+            return pd.Series(np.array([], dtype=header["columns"][1]["dtype"]), index=pd.Index([], dtype=object))
+
+        arrays = {
+            column["name"]: np.memmap(path, dtype=np.dtype(column["dtype"]), mode="r",
+                                      offset=data_offset + column["offset"], shape=(rows,))
+            for column in header["columns"]
+        }
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        warning("Lecture de l'instantané %s impossible: %s", path, e, module="balance_snapshots")
+        return None
+
+    month_keys = arrays["month"].astype('datetime64[M]').astype(str).tolist()
+    return pd.Series(arrays["balance"], index=month_keys)
+
+def load_or_compute_monthly_balances(user_id: str,
+                                     transactions_df: Union[pd.DataFrame, Callable[[], pd.DataFrame]],
+                                     account_creation_date: datetime,
+                                     initial_balance: float,
+                                     month_mode: str,
+                                     financial_month_day: int,
+                                     end_date: datetime,
+                                     account_id: Optional[int] = None,
+                                     data_dir: Optional[str] = None,
+                                     fixed_point: bool = False,
+                                     data_version: Optional[str] = None) -> pd.Series:
+    """
+    Retourne les soldes mensuels depuis l'instantané s'il est à jour, sinon les recalcule et l'enregistre
+
+    Les arguments sont ceux de `calculate_monthly_balances`, plus l'utilisateur et le dossier des données.
+    Les soldes ne dépendent de end_date que par la période qui la contient : l'instantané reste valable
+    jusqu'à la fin de cette période.
+
+    Args:
+        transactions_df: Transactions (DataFrame ou TransactionStore), ou fonction qui les charge :
+                         avec data_version, elle n'est appelée que si l'instantané est périmé
+        data_version: Version des données sources (voir file_data_version) ; l'empreinte porte alors sur
+                      elle au lieu du contenu des transactions, qui n'est plus parcouru en O(n)
+
+    Returns:
+        pd.Series: Soldes indexés par mois ('YYYY-MM')
+    """
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date)
+    parameters = {
+        "account_creation_date": account_creation_date,
+        "initial_balance": initial_balance,
+        "month_mode": month_mode,
+        "financial_month_day": financial_month_day,
+        "end_period": get_anchor_month(end_date, month_mode, financial_month_day),
+        "account_id": account_id,
+        "fixed_point": fixed_point
+    }
+    path = snapshot_path(user_id, account_id, month_mode, financial_month_day, data_dir)
+    if data_version is not None:
+        checksum = compute_version_checksum(data_version, **parameters)
+    else:
+        if callable(transactions_df):
+            transactions_df = transactions_df()
+        checksum = compute_source_checksum(transactions_df, **parameters)
+
+    balances = load_snapshot(path, checksum)
+    if balances is not None:
+        debug("Soldes relus depuis l'instantané %s", path, module="balance_snapshots")
+        return balances
+
+    if callable(transactions_df):
+        transactions_df = transactions_df()
+    balances = calculate_monthly_balances(
+        transactions_df,
+        account_creation_date,
+        initial_balance,
+        month_mode,
+        financial_month_day,
+        end_date,
+        account_id,
+        fixed_point
+    )
+    try:
+        save_snapshot(path, balances, checksum)
+    except OSError as e:
+        warning("Enregistrement de l'instantané %s impossible: %s", path, e, module="balance_snapshots")
+    else:
+        info("Instantané recalculé pour l'utilisateur %s, compte %s", user_id, account_id, module="balance_snapshots")
+
+    return balances
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import en masse des relevés bancaires (CSV, OFX) dans un fichier utilisateur
+
+Les relevés sont lus par morceaux ; dates et montants sont normalisés, les mouvements déjà
+présents sont écartés d'après leur empreinte (jour, montant, compte, libellé), puis les mouvements
+de signes opposés entre deux comptes de l'utilisateur sont regroupés en transferts. Les nouvelles
+transactions sont ajoutées par lots en réécrivant le fichier utilisateur, qui n'est jamais chargé
+en entier : seuls quelques tableaux compacts par mouvement restent en mémoire.
+"""
+
+import os
+import re
+import csv
+import json
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+from logging import info, debug
+from cache import invalidate_account
+from functions.balance_calculator import to_cents, from_cents
+from functions.transaction_search import tokenize
+from functions.transaction_store import id_or_missing
+from functions.user_data_reader import (DEFAULT_CHUNK_SIZE, JsonStreamReader, iter_transaction_chunks,
+                                        read_user_section)
+from profiling import profiled
+from utils_date import APP_TIMEZONE, local_days
+
+# Écart maximal, en jours, entre le débit et le crédit d'un même transfert
+DEFAULT_TRANSFER_WINDOW_DAYS = 3
+
+# Fuseau de l'application : ses dates sont le minuit local du jour choisi, enregistré en UTC par toISOString()
+DEFAULT_TIMEZONE = APP_TIMEZONE
+
+# Libellés d'en-tête reconnus (normalisés : minuscules, sans accents ni ponctuation), par colonne
+_CSV_HEADERS = {
+    'date': ('date', 'date operation', 'dateop', 'date de l operation', 'date comptable', 'booking date',
+             'transaction date'),
+    'amount': ('montant', 'amount', 'montant eur', 'montant euros', 'montant en euros'),
+    'debit': ('debit', 'debit eur', 'debit euros'),
+    'credit': ('credit', 'credit eur', 'credit euros'),
+    'description': ('libelle', 'label', 'description', 'libelle operation', 'libelle de l operation', 'intitule',
+                    'memo', 'details'),
+    'category': ('categorie', 'category'),
+    'account': ('compte', 'account', 'accountnum', 'numero de compte', 'n de compte', 'iban'),
+}
+# Nombre de lignes parcourues pour trouver l'en-tête (certaines banques le font précéder d'un préambule)
+_HEADER_SEARCH_LINES = 30
+_SNIFF_SIZE = 1 << 16
+
+_OFX_TAG = re.compile(r'<(/?[A-Za-z0-9.]+)>([^<]*)')
+_OFX_EXTENSIONS = ('.ofx', '.qfx')
+
+# Les transferts existants sont enregistrés côté crédit sous ce libellé : le libellé bancaire du crédit
+# n'est pas conservé par l'application
+_TRANSFER_CREDIT_KEY = '\x00transfert'
+
+# Heure des dates écrites : midi UTC reste le même jour quel que soit le fuseau de l'application
+_DATE_SUFFIX = 'T12:00:00.000Z'
+
+class _HashMultiset:
+    """
+    Multiensemble d'empreintes uint64 tenu en tranches triées.
+
+    Chaque ajout forme une tranche, fusionnée avec les précédentes tant qu'elles ne sont pas plus de deux
+    fois plus grandes : il reste O(log n) tranches, chaque empreinte est recopiée O(log n) fois, et un
+    comptage est une recherche dichotomique par tranche.
+    """
+
+    def __init__(self):
+        self._runs = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Ajoute des empreintes"""
+        if len(hashes) == 0:
+            return
+        run = np.sort(hashes)
+        while self._runs and len(self._runs[-1]) <= 2 * len(run):
+            run = np.sort(np.concatenate([self._runs.pop(), run]), kind='stable')
+        self._runs.append(run)
+
+    def count(self, hashes: np.ndarray) -> np.ndarray:
+        """Nombre d'occurrences de chaque empreinte"""
+        # Des empreintes triées rendent les recherches dichotomiques successives bien plus rapides
+        order = np.argsort(hashes)
+        needles = hashes[order]
+        sorted_counts = np.zeros(len(hashes), dtype=np.int64)
+        for run in self._runs:
+            sorted_counts += np.searchsorted(run, needles, side='right') - np.searchsorted(run, needles, side='left')
+        counts = np.empty(len(hashes), dtype=np.int64)
+        counts[order] = sorted_counts
+        return counts
+
+def _occurrence_ranks(hashes: np.ndarray) -> np.ndarray:
+    """Rang de chaque empreinte parmi les empreintes égales qui la précèdent dans le tableau (0 pour la première)"""
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    positions = np.arange(len(hashes))
+    starts = np.ones(len(hashes), dtype=bool)
+    starts[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    ranks = np.empty(len(hashes), dtype=np.int64)
+    ranks[order] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+    return ranks
+
+def movement_hashes(days: np.ndarray, cents: np.ndarray, account_ids: np.ndarray, descriptions) -> np.ndarray:
+    """
+    Empreintes de mouvements bancaires : jour, montant signé en centimes, compte et libellé normalisé.
+
+    Le libellé est comparé sans tenir compte des majuscules, des accents ni de la ponctuation.
+
+    Args:
+        days (np.ndarray): Jours (datetime64[D])
+        cents (np.ndarray): Montants signés en centimes (crédit positif, débit négatif)
+        account_ids (np.ndarray): Comptes de l'application
+        descriptions: Libellés
+
+    Returns:
+        np.ndarray: Empreinte uint64 de chaque mouvement
+    """
+    # Chaque libellé distinct n'est normalisé qu'une fois
+    codes, labels = pd.factorize(pd.Series(descriptions, dtype=object).fillna(''))
+    keys = np.array([' '.join(tokenize(label)) for label in labels], dtype=object)[codes]
+    frame = pd.DataFrame({
+        'Day': np.asarray(days, dtype='datetime64[D]').astype(np.int64),
+        'Cents': np.asarray(cents, dtype=np.int64),
+        'AccountId': np.asarray(account_ids, dtype=np.int64),
+        'Key': keys
+    })
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def _sniff_csv(path: str, encoding: Optional[str]) -> tuple:
+    """
+    Détermine l'encodage, le séparateur et la ligne d'en-tête d'un relevé CSV.
+
+    Returns:
+        tuple: (encodage, séparateur, nombre de lignes à sauter avant l'en-tête, colonnes reconnues)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(_SNIFF_SIZE)
+
+    if encoding is None:
+        # Les exports des banques françaises sont en UTF-8 ou en Windows-1252
+        try:
+            head.decode('utf-8')
+            encoding = 'utf-8-sig'
+        except UnicodeDecodeError as e:
+            encoding = 'utf-8-sig' if e.start >= len(head) - 3 else 'cp1252'
+
+    lines = head.decode(encoding, errors='ignore').splitlines()[:_HEADER_SEARCH_LINES]
+    for skip, line in enumerate(lines):
+        delimiter = max(';,\t|', key=line.count)
+        columns = _match_headers(next(csv.reader([line], delimiter=delimiter), []))
+        if 'date' in columns and ('amount' in columns or 'debit' in columns or 'credit' in columns):
+            return encoding, delimiter, skip, columns
+
+    raise ValueError(f"En-tête de relevé non reconnu dans {path} (colonnes date et montant attendues)")
+
+def _match_headers(headers) -> Dict[str, str]:
+    """Associe chaque colonne attendue ('date', 'amount'...) au premier en-tête qui la désigne"""
+    normalized = {' '.join(tokenize(header)): header for header in reversed(list(headers))}
+    columns = {}
+    for field, names in _CSV_HEADERS.items():
+        for name in names:
+            if name in normalized:
+                columns[field] = normalized[name]
+                break
+    return columns
+
+def iter_csv_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parcourt un relevé CSV par morceaux.
+
+    L'encodage, le séparateur (';', ',', tabulation ou '|') et la ligne d'en-tête sont détectés ;
+    seules les colonnes reconnues sont lues.
+
+    Args:
+        path: Chemin du relevé
+        chunk_size: Nombre de lignes par morceau
+        encoding: Encodage du fichier (détecté par défaut)
+
+    Returns:
+        Itérateur de DataFrames de chaînes ('date', 'amount' ou 'debit'/'credit', et si présents
+        'description', 'category', 'account')
+    """
+    encoding, delimiter, skip, columns = _sniff_csv(path, encoding)
+    debug("Relevé CSV %s: encodage %s, séparateur %r, colonnes %s", path, encoding, delimiter, columns,
+          module="bank_import")
+
+    reader = pd.read_csv(path, sep=delimiter, skiprows=skip, encoding=encoding, dtype=str, keep_default_na=False,
+                         usecols=list(columns.values()), chunksize=chunk_size)
+    renames = {header: field for field, header in columns.items()}
+    for chunk in reader:
+        yield chunk.rename(columns=renames)
+
+def iter_ofx_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parcourt un relevé OFX (SGML ou XML) par morceaux, sans le charger en entier.
+
+    Chaque opération (STMTTRN) donne sa date (DTPOSTED), son montant signé (TRNAMT), son libellé
+    (NAME, complété par MEMO) et le compte du relevé qui la contient (ACCTID).
+
+    Args:
+        path: Chemin du relevé
+        chunk_size: Nombre d'opérations par morceau
+        encoding: Encodage du fichier (Windows-1252 par défaut, courant pour les OFX français)
+
+    Returns:
+        Itérateur de DataFrames de chaînes ('date', 'amount', 'description', 'account')
+    """
+    rows = []
+    account = ''
+    transaction = None
+    tail = ''
+    with open(path, 'r', encoding=encoding or 'cp1252', errors='replace') as f:
+        while True:
+            block = f.read(_SNIFF_SIZE)
+            text, tail = tail + block, ''
+            if block:
+                # La dernière balise du bloc et sa valeur peuvent être coupées : elles sont reprises avec le bloc suivant
+                cut = text.rfind('<')
+                if cut >= 0:
+                    text, tail = text[:cut], text[cut:]
+            for tag, value in _OFX_TAG.findall(text):
+                tag, value = tag.upper(), value.strip()
+                if tag == 'ACCTID':
+                    account = value
+                elif tag == 'STMTTRN':
+                    transaction = {}
+                elif tag == '/STMTTRN' and transaction is not None:
+                    name, memo = transaction.get('NAME', ''), transaction.get('MEMO', '')
+                    description = f"{name} {memo}" if memo and memo != name else (name or memo)
+                    rows.append((transaction.get('DTPOSTED', ''), transaction.get('TRNAMT', ''), description, account))
+                    transaction = None
+                    if len(rows) >= chunk_size:
+                        yield pd.DataFrame(rows, columns=['date', 'amount', 'description', 'account'])
+                        rows = []
+                elif transaction is not None and not tag.startswith('/'):
+                    transaction[tag] = value
+            if not block:
+                break
+    if rows:
+        yield pd.DataFrame(rows, columns=['date', 'amount', 'description', 'account'])
+
+def _parse_days(values: pd.Series) -> np.ndarray:
+    """
+    Convertit des dates de relevé en jours (datetime64[D], NaT si invalides).
+
+    Formats reconnus : ISO ('2024-01-31', avec ou sans heure), OFX ('20240131...') et français
+    ('31/01/2024', '31-01-24', '31.01.2024').
+    """
+    text = values.astype(str).str.strip()
+    iso = text.str.extract(r'^(\d{4})-?(\d{2})-?(\d{2})')
+    french = text.str.extract(r'^(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{2,4})\b')
+    years = pd.to_numeric(iso[0].fillna(french[2]), errors='coerce')
+    years = years.where(years >= 100, years + 2000)
+    parts = pd.DataFrame({
+        'year': years,
+        'month': pd.to_numeric(iso[1].fillna(french[1]), errors='coerce'),
+        'day': pd.to_numeric(iso[2].fillna(french[0]), errors='coerce')
+    })
+    return pd.to_datetime(parts, errors='coerce').to_numpy().astype('datetime64[D]')
+
+def _parse_amounts(values: pd.Series) -> pd.Series:
+    """
+    Convertit des montants de relevé en nombres (NaN si invalides).
+
+    Accepte la virgule comme le point décimal, avec séparateurs de milliers ('-1 234,56 €', '1.234,56',
+    '-1,234.56', '-12.50'). Un montant lisible des deux façons ('1,234', '1.234') suit la convention des
+    montants non ambigus du même morceau de la colonne ; s'ils n'en indiquent aucune, il est rejeté.
+    """
+    text = values.astype(str).str.replace(r'[\s€+]|EUR', '', regex=True)
+    comma_decimal = text.str.fullmatch(r'-?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?')
+    dot_decimal = text.str.fullmatch(r'-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?')
+    as_comma = pd.to_numeric(text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+                             .where(comma_decimal), errors='coerce')
+    as_dot = pd.to_numeric(text.str.replace(',', '', regex=False).where(dot_decimal), errors='coerce')
+
+    ambiguous = comma_decimal & dot_decimal & (as_comma != as_dot)
+    comma_only = int((comma_decimal & ~dot_decimal).sum())
+    dot_only = int((dot_decimal & ~comma_decimal).sum())
+    amounts = as_comma.where(comma_decimal & ~ambiguous, as_dot)
+    if comma_only and not dot_only:
+        return amounts.where(~ambiguous, as_comma)
+    if dot_only and not comma_only:
+        return amounts.where(~ambiguous, as_dot)
+    return amounts.where(~ambiguous)
+
+def normalize_chunk(chunk: pd.DataFrame, account_id: Optional[int] = None,
+                    account_map: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """
+    Normalise un morceau de relevé.
+
+    Args:
+        chunk: Morceau produit par `iter_csv_chunks` ou `iter_ofx_chunks`
+        account_id: Compte de l'application des mouvements dont le compte bancaire n'est pas dans account_map
+        account_map: Numéro de compte bancaire -> compte de l'application
+
+    Returns:
+        pd.DataFrame: Mouvements valides ('Day', 'Cents', 'AccountId', 'Description', 'Category'), montants
+                      signés en centimes ; les lignes sans date, sans montant, de montant nul ou sans compte
+                      sont écartées
+    """
+    days = _parse_days(chunk['date'])
+    if 'amount' in chunk.columns:
+        amounts = _parse_amounts(chunk['amount'])
+    else:
+        credits = _parse_amounts(chunk['credit']) if 'credit' in chunk.columns else pd.Series(np.nan, index=chunk.index)
+        debits = _parse_amounts(chunk['debit']) if 'debit' in chunk.columns else pd.Series(np.nan, index=chunk.index)
+        # Les débits sont donnés tantôt positifs, tantôt négatifs
+        amounts = credits.fillna(0).abs() - debits.fillna(0).abs()
+        amounts = amounts.where(credits.notna() | debits.notna())
+
+    account_ids = np.full(len(chunk), -1 if account_id is None else account_id, dtype=np.int64)
+    if account_map and 'account' in chunk.columns:
+        mapped = chunk['account'].astype(str).str.replace(r'\s', '', regex=True).map(account_map)
+        account_ids = np.where(mapped.notna(), mapped.fillna(-1).to_numpy(dtype=np.int64), account_ids)
+
+    cents = to_cents(amounts.to_numpy(dtype=float))
+    valid = ~np.isnat(days) & amounts.notna().to_numpy() & (cents != 0) & (account_ids >= 0)
+
+    descriptions = chunk['description'] if 'description' in chunk.columns else pd.Series('', index=chunk.index)
+    categories = chunk['category'].tolist() if 'category' in chunk.columns else [None] * len(chunk)
+    return pd.DataFrame({
+        'Day': days[valid],
+        'Cents': cents[valid],
+        'AccountId': account_ids[valid],
+        'Description': descriptions.astype(str).str.strip().str.replace(r'\s+', ' ', regex=True).to_numpy()[valid],
+        'Category': np.array([category or None for category in categories], dtype=object)[valid]
+    })
+
+def pair_transfers(days: np.ndarray, cents: np.ndarray, account_ids: np.ndarray,
+                   window_days: int = DEFAULT_TRANSFER_WINDOW_DAYS) -> tuple:
+    """
+    Associe les débits et crédits de même montant passés entre deux comptes différents.
+
+    Les mouvements sont regroupés par montant absolu puis parcourus par date : chacun est associé au plus
+    ancien mouvement de signe opposé, sur un autre compte, encore libre et daté d'au plus window_days jours
+    plus tôt. Seuls les montants ayant à la fois des débits et des crédits sur plusieurs comptes sont parcourus.
+
+    Args:
+        days (np.ndarray): Jours des mouvements (datetime64[D])
+        cents (np.ndarray): Montants signés en centimes
+        account_ids (np.ndarray): Comptes des mouvements
+        window_days (int): Écart maximal entre le débit et le crédit
+
+    Returns:
+        tuple: (indices des débits, indices des crédits associés)
+    """
+    count = len(cents)
+    if count == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    day_numbers = np.asarray(days, dtype='datetime64[D]').astype(np.int64)
+    magnitudes = np.abs(cents)
+    order = np.lexsort((np.arange(count), day_numbers, magnitudes))
+    sorted_magnitudes = magnitudes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_magnitudes[1:] != sorted_magnitudes[:-1]])
+    ends = np.r_[starts[1:], count]
+
+    # Montants candidats : au moins un débit, un crédit et deux comptes
+    sorted_credits = cents[order] > 0
+    sorted_accounts = account_ids[order]
+    has_credit = np.maximum.reduceat(sorted_credits, starts)
+    has_debit = ~np.minimum.reduceat(sorted_credits, starts)
+    several_accounts = np.maximum.reduceat(sorted_accounts, starts) != np.minimum.reduceat(sorted_accounts, starts)
+    candidates = np.flatnonzero(has_credit & has_debit & several_accounts)
+
+    day_list, account_list, credit_list = day_numbers.tolist(), account_ids.tolist(), (cents > 0).tolist()
+    debits, credits = [], []
+    for group in candidates.tolist():
+        # Mouvements encore libres du montant, par date : débits puis crédits
+        open_rows = (deque(), deque())
+        for row in order[starts[group]:ends[group]].tolist():
+            is_credit = credit_list[row]
+            opposite = open_rows[not is_credit]
+            while opposite and day_list[row] - day_list[opposite[0]] > window_days:
+                opposite.popleft()
+            match = next((other for other in opposite if account_list[other] != account_list[row]), None)
+            if match is None:
+                open_rows[is_credit].append(row)
+                continue
+            opposite.remove(match)
+            debits.append(match if is_credit else row)
+            credits.append(row if is_credit else match)
+
+    return np.array(debits, dtype=np.int64), np.array(credits, dtype=np.int64)
+
+def _existing_hashes(path: str, chunk_size: int, timezone: str = DEFAULT_TIMEZONE) -> tuple:
+    """
+    Empreintes des transactions d'un fichier utilisateur, lues par morceaux, et plus grand identifiant.
+
+    Un revenu est un crédit et une dépense un débit de son compte ; un transfert est un débit de son compte
+    source et un crédit de son compte destination (enregistré sous un libellé générique). Le jour d'une
+    transaction est celui de sa date dans le fuseau de l'application : une opération saisie le 02/03 est
+    enregistrée '2025-03-01T23:00:00.000Z' mais figure au 02/03 sur le relevé.
+    """
+    known = _HashMultiset()
+    max_id = 0
+    for chunk in iter_transaction_chunks(path, chunk_size):
+        days = local_days([t.get('date') for t in chunk], timezone)
+        cents = to_cents([t.get('amount', 0.0) for t in chunk])
+        types = np.array([t.get('type') for t in chunk], dtype=object)
+        account_ids = np.array([id_or_missing(t.get('accountId')) for t in chunk], dtype=np.int64)
+        descriptions = [t.get('description') or '' for t in chunk]
+        max_id = max([max_id] + [t['id'] for t in chunk if isinstance(t.get('id'), int)])
+
+        signed = np.where(types == 'income', cents, -cents)
+        known.add(movement_hashes(days, signed, account_ids, descriptions))
+
+        transfers = np.flatnonzero((types == 'transfer') & np.array([t.get('toAccountId') is not None for t in chunk]))
+        if len(transfers):
+            to_account_ids = np.array([chunk[i]['toAccountId'] for i in transfers.tolist()])
+            known.add(movement_hashes(days[transfers], cents[transfers], to_account_ids,
+                                      [_TRANSFER_CREDIT_KEY] * len(transfers)))
+    return known, max_id
+
+def _iter_source_chunks(path: str, chunk_size: int, encoding: Optional[str]) -> Iterator[pd.DataFrame]:
+    """Parcourt un relevé par morceaux, selon son format (OFX d'après l'extension, CSV sinon)"""
+    if path.lower().endswith(_OFX_EXTENSIONS):
+        return iter_ofx_chunks(path, chunk_size, encoding)
+    return iter_csv_chunks(path, chunk_size, encoding)
+
+def _iso_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + '000Z'
+
+def _write_user_file(path: str, new_transactions: Iterator[List[str]], chunk_size: int) -> None:
+    """
+    Réécrit un fichier utilisateur en ajoutant des transactions (déjà sérialisées en JSON) à la fin de data.transactions.
+
+    Le fichier est recopié section par section et les transactions par morceaux ; le nouveau fichier
+    remplace l'ancien d'un seul coup une fois entièrement écrit.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    out = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False)
+    written = 0
+
+    def write_batch(lines: List[str]) -> None:
+        nonlocal written
+        if lines:
+            out.write(('\n' if written == 0 else ',\n') + ',\n'.join(lines))
+            written += len(lines)
+
+    def write_transactions(reader: Optional[JsonStreamReader]) -> None:
+        out.write('"transactions": [')
+        if reader is not None:
+            batch = []
+            for _ in reader.iter_array():
+                batch.append(json.dumps(reader.read_value(), ensure_ascii=False))
+                if len(batch) >= chunk_size:
+                    write_batch(batch)
+                    batch = []
+            write_batch(batch)
+        for batch in new_transactions:
+            write_batch(batch)
+        out.write('\n]')
+
+    try:
+        with out, open(path, 'r', encoding='utf-8-sig') as source:
+            reader = JsonStreamReader(source)
+            separator = ''
+            out.write('{')
+            for key in reader.iter_object():
+                out.write(separator + json.dumps(key) + ': ')
+                separator = ', '
+                if key != 'data':
+                    out.write(json.dumps(reader.read_value(), ensure_ascii=False))
+                    continue
+
+                data_separator = ''
+                has_transactions = False
+                out.write('{')
+                for data_key in reader.iter_object():
+                    out.write(data_separator)
+                    data_separator = ', '
+                    if data_key == 'transactions':
+                        write_transactions(reader)
+                        has_transactions = True
+                    else:
+                        out.write(json.dumps(data_key) + ': ' + json.dumps(reader.read_value(), ensure_ascii=False))
+                if not has_transactions:
+                    out.write(data_separator)
+                    write_transactions(None)
+                out.write('}')
+            out.write('}\n')
+    except BaseException:
+        os.unlink(out.name)
+        raise
+    os.chmod(out.name, os.stat(path).st_mode & 0o777)
+    os.replace(out.name, path)
+
+@profiled()
+def import_bank_files(user_path: str,
+                      sources: Dict[str, Optional[int]],
+                      account_map: Optional[Dict[str, int]] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      transfer_window_days: int = DEFAULT_TRANSFER_WINDOW_DAYS,
+                      encoding: Optional[str] = None,
+                      dry_run: bool = False,
+                      timezone: str = DEFAULT_TIMEZONE) -> Dict[str, object]:
+    """
+    Importe des relevés bancaires dans un fichier utilisateur data/<hash>.json
+
+    Chaque relevé est lu par morceaux. Un mouvement est écarté comme doublon si sa k-ième occurrence
+    dans le relevé (même jour, montant, compte et libellé) dépasse le nombre de mouvements identiques déjà
+    connus : réimporter un relevé qui chevauche le précédent n'ajoute que les nouvelles opérations, tandis
+    que deux opérations identiques d'un même relevé sont bien importées toutes les deux. Les mouvements
+    retenus sont mis de côté dans un fichier temporaire ; seuls leur jour, montant et compte restent en
+    mémoire pour associer les transferts.
+
+    Args:
+        user_path: Chemin du fichier utilisateur
+        sources: Relevés à importer (CSV, ou OFX/QFX d'après l'extension) -> compte de l'application de leurs
+                 mouvements, ou None pour les relevés dont tous les comptes bancaires sont dans account_map
+        account_map: Numéro de compte bancaire (colonne compte du CSV, ACCTID de l'OFX) -> compte de l'application
+        chunk_size: Nombre de lignes lues, et de transactions écrites, à la fois
+        transfer_window_days: Écart maximal en jours entre le débit et le crédit d'un transfert
+        encoding: Encodage des relevés (détecté par défaut)
+        dry_run: Analyser les relevés sans modifier le fichier utilisateur
+        timezone: Fuseau de l'application, dans lequel les dates du fichier utilisateur sont lues
+
+    Returns:
+        Bilan : lignes lues, rejetées, doublons, transferts formés, transactions ajoutées, durée
+    """
+    if chunk_size < 1:
+        raise ValueError("La taille des morceaux doit être d'au moins une ligne")
+
+    start = time.perf_counter()
+    user_accounts = {account['id'] for account in read_user_section(user_path, 'accounts') or []}
+    account_map = {re.sub(r'\s', '', str(number)): int(target) for number, target in (account_map or {}).items()}
+    for target in list(sources.values()) + list(account_map.values()):
+        if target is not None and target not in user_accounts:
+            raise ValueError(f"Compte inconnu: {target}")
+
+    known, max_id = _existing_hashes(user_path, chunk_size, timezone)
+    summary = {"rows": 0, "rejected": 0, "duplicates": 0, "transfers": 0, "imported": 0}
+    kept_days, kept_cents, kept_accounts = [], [], []
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as spill:
+        for path, account_id in sources.items():
+            seen, seen_credits = _HashMultiset(), _HashMultiset()
+            for chunk in _iter_source_chunks(path, chunk_size, encoding):
+                movements = normalize_chunk(chunk, account_id, account_map)
+                summary["rows"] += len(chunk)
+                summary["rejected"] += len(chunk) - len(movements)
+
+                days = movements['Day'].to_numpy().astype('datetime64[D]')
+                cents = movements['Cents'].to_numpy()
+                accounts = movements['AccountId'].to_numpy()
+                hashes = movement_hashes(days, cents, accounts, movements['Description'])
+
+                # k-ième occurrence dans le relevé, comparée aux mouvements identiques déjà connus
+                duplicate = seen.count(hashes) + _occurrence_ranks(hashes) < known.count(hashes)
+                seen.add(hashes)
+
+                # Crédit d'un transfert existant : enregistré sous un libellé générique, à la date du débit
+                # (au plus transfer_window_days jours avant ou après, les plus proches d'abord)
+                pending = np.flatnonzero(~duplicate & (cents > 0))
+                for lag in sorted(range(-transfer_window_days, transfer_window_days + 1), key=abs):
+                    if not len(pending):
+                        break
+                    credit_hashes = movement_hashes(days[pending] - np.timedelta64(lag, 'D'), cents[pending],
+                                                    accounts[pending], [_TRANSFER_CREDIT_KEY] * len(pending))
+                    matched = (seen_credits.count(credit_hashes) + _occurrence_ranks(credit_hashes)
+                               < known.count(credit_hashes))
+                    seen_credits.add(credit_hashes[matched])
+                    duplicate[pending[matched]] = True
+                    pending = pending[~matched]
+
+                kept = np.flatnonzero(~duplicate)
+                summary["duplicates"] += len(movements) - len(kept)
+                known.add(hashes[kept])
+
+                kept_days.append(days[kept].astype(np.int64).astype(np.int32))
+                kept_cents.append(cents[kept])
+                kept_accounts.append(accounts[kept].astype(np.int32))
+                # Libellé et catégorie mis de côté déjà sérialisés, tels qu'ils seront écrits
+                for description, category in zip(movements['Description'].to_numpy()[kept].tolist(),
+                                                 movements['Category'].to_numpy()[kept].tolist()):
+                    fragment = '"description": ' + json.dumps(description, ensure_ascii=False)
+                    if category:
+                        fragment += ', "category": ' + json.dumps(category, ensure_ascii=False)
+                    spill.write(fragment + '\n')
+
+            info("Relevé %s lu: %s lignes", path, summary["rows"], module="bank_import")
+
+        days = np.concatenate(kept_days).astype('datetime64[D]') if kept_days else np.array([], dtype='datetime64[D]')
+        cents = np.concatenate(kept_cents) if kept_cents else np.array([], dtype=np.int64)
+        accounts = np.concatenate(kept_accounts) if kept_accounts else np.array([], dtype=np.int32)
+        debits, credits = pair_transfers(days, cents, accounts, transfer_window_days)
+        summary["transfers"] = len(debits)
+        summary["imported"] = len(cents) - len(credits)
+
+        # Compte destination des débits associés ; les crédits associés ne donnent pas de transaction
+        partners = np.full(len(cents), -1, dtype=np.int64)
+        partners[debits] = accounts[credits]
+        partners[credits] = -2
+        day_strings = np.datetime_as_string(days)
+
+        def new_transactions() -> Iterator[List[str]]:
+            spill.seek(0)
+            now = _iso_now()
+            amounts = from_cents(np.abs(cents)).tolist()
+            types = np.where(partners >= 0, 'transfer', np.where(cents > 0, 'income', 'expense')).tolist()
+            account_list, partner_list = accounts.tolist(), partners.tolist()
+            next_id = max_id + 1
+            batch = []
+            for row, fragment in enumerate(spill):
+                if partner_list[row] == -2:
+                    continue
+                destination = f', "toAccountId": {partner_list[row]}' if partner_list[row] >= 0 else ''
+                batch.append(f'{{"id": {next_id}, "accountId": {account_list[row]}{destination}, '
+                             f'"amount": {amounts[row]!r}, "type": "{types[row]}", {fragment[:-1]}, '
+                             f'"date": "{day_strings[row]}{_DATE_SUFFIX}", "createdAt": "{now}", "updatedAt": "{now}"}}')
+                next_id += 1
+                if len(batch) >= chunk_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        if not dry_run and summary["imported"]:
+            _write_user_file(user_path, new_transactions(), chunk_size)
+            invalidate_account(os.path.splitext(os.path.basename(user_path))[0])
+
+    summary["seconds"] = time.perf_counter() - start
+    info("Import terminé: %s lignes, %s rejetées, %s doublons, %s transferts, %s transactions ajoutées en %.1f s",
+         summary["rows"], summary["rejected"], summary["duplicates"], summary["transfers"], summary["imported"],
+         summary["seconds"], module="bank_import")
+    return summary
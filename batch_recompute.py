@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recalcul en lot des soldes mensuels de tous les utilisateurs
+
+Parcourt les fichiers utilisateur de data/ (<hash>.json), recalcule les soldes de chaque compte
+et de la vue tous comptes, et les enregistre dans les instantanés (voir balance_snapshots).
+Les fichiers sont répartis par paquets entre des processus : une erreur sur un fichier n'arrête
+ni son paquet ni le lot.
+"""
+
+import os
+import re
+import sys
+import time
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import profiling
+from logging import info, warning, error
+from balance_snapshots import DATA_DIR, file_data_version, load_or_compute_monthly_balances
+from functions.transaction_store import TransactionStore
+from functions.user_data_reader import iter_transaction_stores, read_user_section
+from utils_date import local_days
+
+# Les fichiers utilisateur sont nommés d'après l'empreinte MD5 du nom d'utilisateur (voir fileStorage.js)
+_USER_FILE = re.compile(r'^[0-9a-f]{32}\.json$')
+
+# Nombre de paquets par processus : assez pour équilibrer la charge, assez peu pour limiter les échanges
+_CHUNKS_PER_WORKER = 4
+
+def list_user_files(data_dir: Optional[str] = None) -> List[str]:
+    """
+    Liste les fichiers utilisateur d'un dossier de données (users.json, admins.json... exclus)
+
+    Args:
+        data_dir: Dossier des données (data/ du projet par défaut)
+
+    Returns:
+        Chemins des fichiers, du plus gros au plus petit
+    """
+    data_dir = data_dir or DATA_DIR
+    paths = [os.path.join(data_dir, name) for name in os.listdir(data_dir) if _USER_FILE.match(name)]
+    return sorted(paths, key=os.path.getsize, reverse=True)
+
+def default_workers() -> int:
+    """Nombre de cœurs utilisables par ce processus (limites de conteneur ou d'affinité comprises)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def _parse_date(value) -> datetime:
+    """Date d'un champ JSON de l'application ('YYYY-MM-DDTHH:MM:SS.sssZ'), ramenée à son jour local"""
+    day = local_days([value])[0]
+    if np.isnat(day):
+        raise ValueError(f"Date invalide: {value!r}")
+    return datetime.combine(day.astype(date), datetime.min.time())
+
+def recompute_user_file(path: str, end_date: datetime, data_dir: Optional[str] = None) -> Dict[str, object]:
+    """
+    Recalcule et enregistre les soldes mensuels d'un utilisateur
+
+    Le mode de mois est celui des préférences de l'utilisateur (useFinancialMonth,
+    financialMonthStartDay). Les instantanés sont validés d'après la version du fichier (date de
+    modification et taille) : les transactions ne sont lues, une seule fois et par morceaux, que si
+    l'un d'eux est périmé.
+
+    Args:
+        path: Chemin du fichier utilisateur
+        end_date: Date de fin des calculs
+        data_dir: Dossier des données où ranger les instantanés (celui du fichier par défaut)
+
+    Returns:
+        Résumé : identifiant, nombre de comptes, de transactions (None si tous les soldes ont été relus
+        depuis les instantanés) et de mois calculés
+    """
+    user_id = os.path.splitext(os.path.basename(path))[0]
+    data_dir = data_dir or os.path.dirname(path)
+
+    # Version relevée avant toute lecture : une écriture concurrente rendra l'instantané périmé
+    data_version = file_data_version(path)
+    preferences = read_user_section(path, 'preferences') or {}
+    accounts = read_user_section(path, 'accounts') or []
+    stores = []
+
+    def load_store() -> TransactionStore:
+        if not stores:
+            stores.append(TransactionStore.concatenate(list(iter_transaction_stores(path))))
+        return stores[0]
+
+    if preferences.get('useFinancialMonth'):
+        month_mode, financial_month_day = 'financial', int(preferences.get('financialMonthStartDay') or 1)
+    else:
+        month_mode, financial_month_day = 'calendar', 1
+
+    months = 0
+    for account in accounts:
+        balances = load_or_compute_monthly_balances(
+            user_id, load_store, _parse_date(account['createdAt']), float(account.get('initialBalance') or 0.0),
+            month_mode, financial_month_day, end_date, account['id'], data_dir, data_version=data_version
+        )
+        months += len(balances)
+
+    # Vue tous comptes : depuis le compte le plus ancien, avec la somme des soldes initiaux
+    if accounts:
+        balances = load_or_compute_monthly_balances(
+            user_id, load_store, min(_parse_date(account['createdAt']) for account in accounts),
+            sum(float(account.get('initialBalance') or 0.0) for account in accounts),
+            month_mode, financial_month_day, end_date, None, data_dir, data_version=data_version
+        )
+        months += len(balances)
+
+    return {"user_id": user_id, "accounts": len(accounts), "transactions": len(stores[0]) if stores else None,
+            "months": months}
+
+def _recompute_chunk(paths: List[str], end_date: datetime, data_dir: Optional[str],
+                     profile: bool = False) -> Tuple[List[Dict[str, object]], Optional[Dict[str, tuple]]]:
+    """
+    Traite un paquet de fichiers dans un processus de travail
+
+    Args:
+        profile: Mesurer les fonctions critiques pendant ce paquet et en retourner les histogrammes
+
+    Returns:
+        Un résultat par fichier (le résumé, ou l'erreur rencontrée), et les histogrammes de mesure
+        du paquet si profile (None sinon)
+    """
+    if profile:
+        # Le processus de travail peut hériter des mesures du parent ou d'un paquet précédent
+        profiling.reset_stats()
+        profiling.enable()
+    results = []
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            summary = recompute_user_file(path, end_date, data_dir)
+            summary.update(path=path, ok=True)
+        except Exception as e:
+            summary = {"path": path, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        summary["seconds"] = time.perf_counter() - start
+        results.append(summary)
+    return results, profiling.export_histograms() if profile else None
+
+def _make_chunks(paths: List[str], workers: int, chunk_size: Optional[int]) -> List[List[str]]:
+    """
+    Répartit les fichiers en paquets
+
+    Les fichiers arrivent du plus gros au plus petit et sont distribués à tour de rôle,
+    pour que les paquets aient des tailles de données comparables.
+    """
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(paths) // (workers * _CHUNKS_PER_WORKER)))
+    chunk_count = max(1, -(-len(paths) // chunk_size))
+    return [paths[i::chunk_count] for i in range(chunk_count) if paths[i::chunk_count]]
+
+def recompute_all(data_dir: Optional[str] = None,
+                  workers: Optional[int] = None,
+                  chunk_size: Optional[int] = None,
+                  end_date: Optional[datetime] = None,
+                  progress: Optional[Callable[[int, int, Dict[str, object]], None]] = None) -> Dict[str, object]:
+    """
+    Recalcule les soldes de tous les utilisateurs d'un dossier de données en parallèle
+
+    Args:
+        data_dir: Dossier des données (data/ du projet par défaut)
+        workers: Nombre de processus (nombre de cœurs par défaut, 1 pour tout traiter ici)
+        chunk_size: Nombre de fichiers par paquet (par défaut, environ 4 paquets par processus)
+        end_date: Date de fin des calculs (aujourd'hui par défaut)
+        progress: Fonction appelée après chaque fichier avec (fichiers traités, total, résultat)
+
+    Returns:
+        Bilan : nombres de fichiers traités et en échec, durée, résultats par fichier
+    """
+    data_dir = data_dir or DATA_DIR
+    # Au jour près : les soldes ne dépendent que de la période contenant la date de fin
+    end_date = end_date or datetime.combine(date.today(), datetime.min.time())
+    workers = workers or default_workers()
+    paths = list_user_files(data_dir)
+    start = time.perf_counter()
+
+    info("Recalcul des soldes de %s utilisateurs avec %s processus", len(paths), workers, module="batch_recompute")
+
+    results = []
+
+    def collect(chunk_results: List[Dict[str, object]]) -> None:
+        for result in chunk_results:
+            results.append(result)
+            if not result["ok"]:
+                warning("Échec du recalcul de %s: %s", result["path"], result["error"], module="batch_recompute")
+            if progress is not None:
+                progress(len(results), len(paths), result)
+
+    chunks = _make_chunks(paths, workers, chunk_size) if paths else []
+    if workers == 1:
+        # Dans ce processus : les mesures éventuelles sont enregistrées directement
+        for chunk in chunks:
+            collect(_recompute_chunk(chunk, end_date, data_dir)[0])
+    elif chunks:
+        # Les mesures des processus de travail sont rapatriées avec les résultats de chaque paquet
+        profile = profiling.is_enabled()
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = {executor.submit(_recompute_chunk, chunk, end_date, data_dir, profile): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    chunk_results, histograms = future.result()
+                    if histograms:
+                        profiling.merge_histograms(histograms)
+                except Exception as e:
+                    # Processus de travail perdu : seuls les fichiers de son paquet sont en échec
+                    error("Paquet de %s fichiers interrompu: %s", len(futures[future]), e, module="batch_recompute")
+                    chunk_results = [{"path": path, "ok": False, "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+                                     for path in futures[future]]
+                collect(chunk_results)
+
+    failed = [result for result in results if not result["ok"]]
+    summary = {
+        "users": len(paths),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "seconds": time.perf_counter() - start,
+        "results": results
+    }
+
+    info("Recalcul terminé: %s réussis, %s en échec en %.1f s", summary["succeeded"], summary["failed"], summary["seconds"],
+         module="batch_recompute")
+
+    return summary
+
+def print_progress(done: int, total: int, result: Dict[str, object]) -> None:
+    """Affiche l'avancement du lot sur la sortie standard"""
+    status = "ok" if result["ok"] else f"ÉCHEC ({result['error']})"
+    print(f"[{done}/{total}] {os.path.basename(result['path'])} - {status} - {result['seconds']:.2f} s")
+    sys.stdout.flush()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Contrôle du temps de démarrage de Ma Bourse
+Lance les commandes simples dans des interpréteurs neufs et vérifie qu'elles démarrent sous un
+budget de temps, sans charger les dépendances lourdes (numpy, pandas...) ni créer le logger
+
+Exemples :
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --budget-ms 100 --repeat 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_REPEAT = 7
+
+# Modules qui ne doivent être importés que par une commande qui calcule réellement
+HEAVY_MODULES = ('numpy', 'pandas', 'dateutil', '_stdlib_logging')
+
+# Commandes simples chronométrées (arguments de l'interpréteur, lancés depuis la racine du projet)
+COMMANDS = {
+    "python -c pass": ['-c', 'pass'],
+    "main.py --help": ['main.py', '--help'],
+    "import main": ['-c', 'import main'],
+    "import logging + info()": ['-c', 'import logging; logging.info("démarrage")'],
+    "import cache": ['-c', 'import cache']
+}
+
+# Importe les modules légers puis rapporte les modules lourds chargés et l'état du logger
+_PROBE = """
+import sys, json
+import main, cache, profiling, logging
+import logging.logger
+heavy = sorted(name for name in sys.modules if name.split('.')[0] in %r)
+print(json.dumps({"heavy": heavy, "logger_created": logging.logger._logger is not None}))
+""" % (HEAVY_MODULES,)
+
+def _run(arguments: List[str]) -> float:
+    """Exécute l'interpréteur avec ces arguments et retourne sa durée totale (en secondes)"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + arguments, cwd=ROOT_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def measure(repeat: int = DEFAULT_REPEAT) -> Dict[str, float]:
+    """
+    Chronomètre chaque commande simple
+
+    Args:
+        repeat: Nombre de lancements par commande (la meilleure durée est retenue)
+
+    Returns:
+        Dictionnaire commande -> meilleure durée en millisecondes
+    """
+    return {name: min(_run(arguments) for _ in range(repeat)) * 1e3 for name, arguments in COMMANDS.items()}
+
+def probe_imports() -> Dict[str, object]:
+    """
+    Importe les modules légers dans un interpréteur neuf
+
+    Returns:
+        {"heavy": modules lourds chargés, "logger_created": logger instancié à l'importation}
+    """
+    output = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Contrôle du temps de démarrage de Ma Bourse')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Durée maximale tolérée pour chaque commande simple, interpréteur compris')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Nombre de lancements par commande')
+    return parser.parse_args()
+
+def main() -> int:
+    """Point d'entrée : retourne 1 si une commande dépasse le budget ou charge un module lourd"""
+    args = parse_arguments()
+    failures = []
+
+    timings = measure(args.repeat)
+    print(f"{'Commande':<30} {'Durée ms':>10}")
+    for name, duration in timings.items():
+        flag = "  HORS BUDGET" if duration > args.budget_ms else ""
+        print(f"{name:<30} {duration:>10.1f}{flag}")
+        if flag:
+            failures.append(f"{name} : {duration:.1f} ms > {args.budget_ms:.0f} ms")
+
+    probe = probe_imports()
+    if probe["heavy"]:
+        failures.append(f"modules lourds chargés à l'importation : {', '.join(probe['heavy'])}")
+    if probe["logger_created"]:
+        failures.append("le logger est créé à l'importation")
+
+    for failure in failures:
+        print(f"Échec : {failure}")
+    if not failures:
+        print("Démarrage dans le budget, sans dépendance lourde.")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
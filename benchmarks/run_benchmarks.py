@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mesures de performance de Ma Bourse sur des utilisateurs synthétiques
+Chronomètre le calcul des soldes, les dates de période, le cache et la journalisation, enregistre
+les résultats en JSON et les compare à une référence pour signaler les régressions
+
+Exemples :
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --threshold 0.2
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000 10000000 --repeat 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Ajouter le répertoire parent en tête du chemin d'importation, avant pandas : le paquet logging
+# de Ma Bourse doit être importé à la place du module standard
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import pandas as pd
+from synthetic_data import write_user_file
+from functions.balance_calculator import calculate_monthly_balances, calculate_monthly_balances_with_adjustments
+from functions.transaction_store import TransactionStore
+from functions.user_data_reader import iter_transaction_stores, read_user_section
+from utils_date import calculate_period_dates
+from cache import BalanceCache
+from logging.logger import Logger
+
+DEFAULT_SIZES = [1000, 100000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+
+# Modes de mois mesurés : (mode, jour de début)
+MONTH_MODES = [('calendar', 1), ('financial', 15), ('financial', 28), ('financial', 31)]
+
+def _time(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Exécute une fonction `repeat` fois et retourne ses durées (en secondes)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(durations),
+        "min_s": min(durations),
+        "repeat": repeat
+    }
+
+def _bench_user(size: int, repeat: int, workdir: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Mesure le chargement et le calcul des soldes d'un utilisateur synthétique de `size` transactions"""
+    path = write_user_file(os.path.join(workdir, f"user_{size}.json"), transactions=size, accounts=3, recurring=20, seed=size)
+
+    results[f"load_transactions[{size}]"] = _time(
+        lambda: TransactionStore.concatenate(list(iter_transaction_stores(path))), repeat)
+
+    store = TransactionStore.concatenate(list(iter_transaction_stores(path)))
+    transactions_df = store.to_dataframe()
+    accounts = read_user_section(path, 'accounts')
+    account = accounts[0]
+    creation_date = datetime.fromisoformat(account['createdAt'][:19])
+    end_date = datetime.fromisoformat(str(store.dates[-1])) if len(store) else creation_date
+
+    # Un ajustement par an sur le premier compte
+    adjustment_months = pd.period_range(creation_date, end_date, freq='12M').strftime('%Y-%m')
+    adjustments = pd.DataFrame({
+        'YearMonth': adjustment_months,
+        'AccountId': account['id'],
+        'AdjustedBalance': np.linspace(0, 10000, len(adjustment_months))
+    })
+
+    for month_mode, day in MONTH_MODES:
+        suffix = f"{month_mode}_{day}][{size}]"
+        results[f"calculate_monthly_balances[{suffix}"] = _time(
+            lambda: calculate_monthly_balances(transactions_df, creation_date, account['initialBalance'],
+                                               month_mode, day, end_date, account['id']), repeat)
+        results[f"calculate_monthly_balances_store[{suffix}"] = _time(
+            lambda: calculate_monthly_balances(store, creation_date, account['initialBalance'],
+                                               month_mode, day, end_date, account['id']), repeat)
+        results[f"calculate_monthly_balances_with_adjustments[{suffix}"] = _time(
+            lambda: calculate_monthly_balances_with_adjustments(transactions_df, creation_date, account['initialBalance'],
+                                                                month_mode, day, end_date, account['id'], adjustments), repeat)
+
+def _bench_period_dates(repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    """Mesure 12 000 calculs de bornes de période (mille ans de mois, dans les deux modes)"""
+    def run(mode: str, day: int) -> None:
+        for year in range(1500, 2500):
+            for month in range(1, 13):
+                calculate_period_dates(month, year, mode, day)
+
+    results["calculate_period_dates[calendaire]"] = _time(lambda: run('calendaire', 1), repeat)
+    results["calculate_period_dates[financier_28]"] = _time(lambda: run('financier', 28), repeat)
+
+def _bench_cache(repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    """Mesure 100 000 écritures puis lectures dans un cache plus petit que le jeu de clés (évictions)"""
+    months = [f"{year}-{month:02d}" for year in range(2000, 2050) for month in range(1, 13)]
+
+    def run() -> None:
+        cache = BalanceCache(max_entries=5000)
+        for i in range(100000):
+            cache.set(BalanceCache.make_key(months[i % len(months)], 'bench', i % 10), float(i))
+        for i in range(100000):
+            cache.get(BalanceCache.make_key(months[i % len(months)], 'bench', i % 10))
+
+    results["cache_set_get[100000]"] = _time(run, repeat)
+
+def _bench_logger(repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    """Mesure 100 000 messages filtrés (DEBUG sous le niveau INFO) et 100 000 messages conservés"""
+    series = pd.Series(np.arange(1000.0))
+
+    def filtered() -> None:
+        logger = Logger(level="INFO")
+        for _ in range(100000):
+            logger.debug("Returning calculated balances: %s", series, module="benchmark")
+
+    def kept() -> None:
+        logger = Logger(level="INFO")
+        for i in range(100000):
+            logger.info("Solde %s", i, module="benchmark")
+
+    results["logger_filtered[100000]"] = _time(filtered, repeat)
+    results["logger_kept[100000]"] = _time(kept, repeat)
+
+def run_benchmarks(sizes: List[int], repeat: int = DEFAULT_REPEAT) -> Dict[str, object]:
+    """
+    Exécute toutes les mesures
+
+    Args:
+        sizes: Nombres de transactions des utilisateurs synthétiques
+        repeat: Nombre d'exécutions de chaque mesure (la médiane est retenue)
+
+    Returns:
+        Résultats : {"meta": {...}, "results": {nom: {"median_s", "min_s", "repeat"}}}
+    """
+    results: Dict[str, Dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory(prefix="mabourse_bench_") as workdir:
+        for size in sizes:
+            print(f"Utilisateur synthétique de {size} transactions...")
+            _bench_user(size, repeat, workdir, results)
+
+    print("Dates de période, cache et journalisation...")
+    _bench_period_dates(repeat, results)
+    _bench_cache(repeat, results)
+    _bench_logger(repeat, results)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "sizes": sizes,
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compare des résultats à une référence et affiche l'écart de chaque mesure
+
+    Args:
+        current: Résultats de run_benchmarks
+        baseline: Résultats de référence
+        threshold: Ralentissement relatif toléré (0.25 = +25 % sur la meilleure durée)
+
+    Returns:
+        Noms des mesures en régression
+    """
+    regressions = []
+    print(f"{'Mesure':<75} {'Référence ms':>13} {'Actuel ms':>11} {'Écart':>8}")
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<75} {'-':>13} {result['min_s'] * 1e3:>11.3f} {'nouveau':>8}")
+            continue
+        # La meilleure durée est moins sensible que la médiane aux perturbations de la machine
+        ratio = result["min_s"] / reference["min_s"] - 1 if reference["min_s"] > 0 else 0.0
+        flag = "  RÉGRESSION" if ratio > threshold else ""
+        print(f"{name:<75} {reference['min_s'] * 1e3:>13.3f} {result['min_s'] * 1e3:>11.3f} {ratio:>+8.1%}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Mesures de performance de Ma Bourse')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Nombres de transactions des utilisateurs synthétiques (1000 à 10000000)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Nombre d\'exécutions de chaque mesure')
+    parser.add_argument('--output', type=str, help='Fichier JSON où écrire les résultats')
+    parser.add_argument('--save-baseline', type=str, help='Enregistrer les résultats comme référence dans ce fichier')
+    parser.add_argument('--compare', type=str, help='Comparer les résultats à cette référence')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Ralentissement relatif toléré avant de signaler une régression (0.25 = +25 %%)')
+    return parser.parse_args()
+
+def main() -> int:
+    """Point d'entrée : retourne 1 si une régression est détectée"""
+    args = parse_arguments()
+    current = run_benchmarks(args.sizes, args.repeat)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+            print(f"Résultats enregistrés dans {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} mesure(s) en régression au-delà de {args.threshold:.0%}")
+            return 1
+        print("Aucune régression détectée.")
+    elif not (args.output or args.save_baseline):
+        print(json.dumps(current, indent=2))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Générateur d'utilisateurs synthétiques pour les mesures de performance
+Produit des fichiers au format de data/<hash>.json (comptes, transactions, transactions récurrentes,
+préférences), écrits par morceaux pour pouvoir monter jusqu'à plusieurs millions de transactions
+"""
+
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+import numpy as np
+
+# Taille des morceaux de transactions générés puis écrits d'un bloc
+_CHUNK_SIZE = 100000
+
+_CATEGORIES = ['fixed', 'recurring', 'exceptional', 'courses', 'loisirs', 'transport', 'santé', 'logement']
+_FREQUENCIES = ['daily', 'weekly', 'biweekly', 'monthly', 'quarterly', 'yearly']
+
+def _iso(day: np.datetime64, seconds: int = 0) -> str:
+    """Date ISO au format de l'application ('YYYY-MM-DDTHH:MM:SS.000Z')"""
+    return f"{np.datetime_as_string(day.astype('datetime64[s]') + np.timedelta64(int(seconds), 's'))}.000Z"
+
+def _accounts(account_count: int, start: np.datetime64, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    created = _iso(start)
+    return [{
+        "id": account_id,
+        "name": f"Compte {account_id}",
+        "type": "checking" if account_id == 1 else "savings",
+        "initialBalance": round(float(rng.uniform(0, 5000)), 2),
+        "currency": "EUR",
+        "createdAt": created,
+        "updatedAt": created
+    } for account_id in range(1, account_count + 1)]
+
+def _recurring(rule_count: int, account_count: int, start: np.datetime64, days: int,
+               rng: np.random.Generator) -> List[Dict[str, Any]]:
+    rules = []
+    for rule_id in range(1, rule_count + 1):
+        rule_start = start + np.timedelta64(int(rng.integers(0, max(days // 2, 1))), 'D')
+        rule_type = str(rng.choice(['income', 'expense', 'expense', 'transfer']))
+        account_id = int(rng.integers(1, account_count + 1))
+        rule = {
+            "id": rule_id,
+            "accountId": account_id,
+            "amount": round(float(rng.uniform(5, 2500)), 2),
+            "type": rule_type,
+            "category": str(rng.choice(_CATEGORIES)),
+            "description": f"Règle {rule_id}",
+            "frequency": str(rng.choice(_FREQUENCIES)),
+            "startDate": _iso(rule_start),
+            "nextExecution": _iso(rule_start),
+            "createdAt": _iso(rule_start),
+            "updatedAt": _iso(rule_start)
+        }
+        if rule_type == 'transfer' and account_count > 1:
+            rule["toAccountId"] = account_id % account_count + 1
+        if rng.random() < 0.3:
+            rule["endDate"] = _iso(rule_start + np.timedelta64(int(rng.integers(30, days + 1)), 'D'))
+        rules.append(rule)
+    return rules
+
+def _transaction_lines(first_id: int, size: int, account_count: int, start: np.datetime64, days: int,
+                       transfer_ratio: float, rng: np.random.Generator) -> List[str]:
+    """Génère un morceau de transactions déjà sérialisées en JSON (une chaîne par transaction)"""
+    day_offsets = rng.integers(0, days, size)
+    seconds = rng.integers(0, 86400, size)
+    amounts = np.round(rng.lognormal(3.5, 1.2, size), 2)
+    draws = rng.random(size)
+    types = np.where(draws < transfer_ratio, 'transfer', np.where(draws < transfer_ratio + (1 - transfer_ratio) * 0.3, 'income', 'expense'))
+    account_ids = rng.integers(1, account_count + 1, size)
+    # Compte destination différent du compte source
+    to_account_ids = (account_ids + rng.integers(1, max(account_count, 2), size) - 1) % account_count + 1
+    categories = rng.integers(0, len(_CATEGORIES), size)
+    dates = (start + day_offsets.astype('timedelta64[D]')).astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+    date_strings = np.datetime_as_string(dates)
+
+    lines = []
+    for i in range(size):
+        transaction = {
+            "id": first_id + i,
+            "accountId": int(account_ids[i]),
+            "amount": float(amounts[i]),
+            "type": str(types[i]),
+            "category": _CATEGORIES[categories[i]],
+            "description": f"Opération {first_id + i}",
+            "date": f"{date_strings[i]}.000Z",
+            "createdAt": f"{date_strings[i]}.000Z",
+            "updatedAt": f"{date_strings[i]}.000Z"
+        }
+        if types[i] == 'transfer' and account_count > 1:
+            transaction["toAccountId"] = int(to_account_ids[i])
+        lines.append(json.dumps(transaction, ensure_ascii=False))
+    return lines
+
+def write_user_file(path: str,
+                    transactions: int = 10000,
+                    accounts: int = 3,
+                    recurring: int = 20,
+                    transfer_ratio: float = 0.1,
+                    start_date: str = '2015-01-01',
+                    years: int = 10,
+                    use_financial_month: bool = False,
+                    financial_start_day: int = 1,
+                    seed: int = 0) -> str:
+    """
+    Écrit un fichier utilisateur synthétique au format de data/<hash>.json.
+
+    Les transactions sont générées et écrites par morceaux : la mémoire utilisée ne dépend pas
+    de leur nombre. Le même seed produit toujours le même fichier.
+
+    Args:
+        path: Chemin du fichier à écrire
+        transactions: Nombre de transactions
+        accounts: Nombre de comptes
+        recurring: Nombre de transactions récurrentes
+        transfer_ratio: Proportion de transferts entre comptes
+        start_date: Date de création des comptes et de la première transaction possible
+        years: Durée couverte par les transactions
+        use_financial_month: Préférence mois financier de l'utilisateur
+        financial_start_day: Jour de début du mois financier (1-31)
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Le chemin du fichier écrit
+    """
+    if accounts < 1:
+        raise ValueError("Il faut au moins un compte")
+
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(start_date, 'D')
+    days = int(((start.astype('datetime64[M]') + 12 * years).astype('datetime64[D]') - start) // np.timedelta64(1, 'D'))
+    username = f"bench_{transactions}_{seed}"
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    header = {
+        "username": username,
+        "passwordHash": hashlib.sha256(username.encode('utf-8')).hexdigest(),
+        "salt": "benchmark",
+        "createdAt": _iso(start),
+        "lastLogin": now
+    }
+    data = {
+        "accounts": _accounts(accounts, start, rng),
+        "recurringTransactions": _recurring(recurring, accounts, start, days, rng),
+        "preferences": {
+            "defaultCurrency": "EUR",
+            "theme": "light",
+            "dateFormat": "dd/MM/yyyy",
+            "useFinancialMonth": use_financial_month,
+            "financialMonthStartDay": financial_start_day,
+            "createdAt": _iso(start),
+            "updatedAt": _iso(start)
+        },
+        "lastSyncTime": now
+    }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, ensure_ascii=False)[:-1])
+        f.write(', "data": {')
+        for key, value in data.items():
+            f.write(f"{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}, ")
+        f.write('"transactions": [')
+        for first in range(0, transactions, _CHUNK_SIZE):
+            size = min(_CHUNK_SIZE, transactions - first)
+            lines = _transaction_lines(first + 1, size, accounts, start, days, transfer_ratio, rng)
+            f.write((',\n' if first else '\n') + ',\n'.join(lines))
+        f.write('\n]}}\n')
+
+    return path
+
+def user_file_name(username: str) -> str:
+    """Nom du fichier d'un utilisateur dans data/ (empreinte MD5 du nom, comme fileStorage.js)"""
+    return hashlib.md5(username.encode('utf-8')).hexdigest() + '.json'
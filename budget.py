@@ -2,44 +2,104 @@
 # -*- coding: utf-8 -*-
 
 from datetime import date, datetime
-from utils_date import calculate_period_dates
+import numpy as np
+import pandas as pd
+from utils_date import calculate_period_dates_range
+from functions.balance_calculator import transaction_columns, signed_amounts, type_masks, to_cents
+from functions.recurring_expansion import expand_recurring_transactions, merge_with_transactions
 
-def calculate_forecast_balance(target_month: int, target_year: int, mode: str = 'calendaire', financial_start_day: int = 1):
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """Retourne les sommes cumulées précédées d'un zéro (somme d'une plage [i, j) = c[j] - c[i])"""
+    return np.concatenate((np.zeros(1, dtype=values.dtype), np.cumsum(values)))
+
+def calculate_forecast_balance(target_month: int, target_year: int, mode: str = 'calendaire', financial_start_day: int = 1,
+                               months: int = 1, transactions=None, initial_balance: float = 0.0,
+                               account_id: int = None, recurring_transactions: list = None,
+                               fixed_point: bool = False) -> pd.DataFrame:
     """
-    Calcule le solde prévisionnel pour un mois donné en utilisant le mode spécifié.
-    
+    Calcule le solde prévisionnel d'une série de mois en utilisant le mode spécifié.
+
+    Les transactions (et les échéances des transactions récurrentes) sont triées une fois par date
+    et cumulées : le solde initial, les revenus et les dépenses de chaque mois se lisent ensuite
+    par différence de sommes cumulées, quel que soit le nombre de mois demandés.
+
     Args:
-        target_month (int): Mois cible (1-12)
-        target_year (int): Année cible
+        target_month (int): Premier mois cible (1-12)
+        target_year (int): Année du premier mois cible
         mode (str): Mode de calcul ('calendaire' ou 'financier')
         financial_start_day (int): Jour de début du mois financier (1-31)
-    
+        months (int): Nombre de mois cibles consécutifs (ex: 60 pour cinq ans)
+        transactions (pd.DataFrame | TransactionStore, optional): Transactions connues
+        initial_balance (float): Solde du compte avant toute transaction
+        account_id (int, optional): Compte concerné, ou None pour tous les comptes
+        recurring_transactions (list, optional): Transactions récurrentes à déplier sur l'horizon
+        fixed_point (bool): Calculer en centimes int64 : toutes les colonnes de montant sont alors
+                            des centimes exacts, à convertir avec `from_cents` pour l'affichage
+
     Returns:
-        dict: Informations sur le solde prévisionnel
+        pd.DataFrame: Une ligne par mois cible (index 'YYYY-MM') avec les colonnes period_start,
+                      period_end, initial_balance, incomes, expenses, transfers et final_balance.
+                      Le mode est conservé dans `attrs['mode']`.
     """
-    # Utilisation de la fonction calculate_period_dates pour obtenir les dates de début et fin
-    start_date, end_date = calculate_period_dates(target_month, target_year, mode, financial_start_day)
-    
-    print(f"Calcul du solde prévisionnel pour la période: {start_date} au {end_date}")
-    
-    # Ici, vous implémenteriez la logique de calcul du solde prévisionnel
-    # en vous basant sur les transactions de la période
-    
-    # Exemple simple pour démonstration
-    initial_balance = 1000  # À remplacer par la logique réelle
-    incomes = 500           # À calculer à partir des transactions de la période
-    expenses = 300          # À calculer à partir des transactions de la période
-    final_balance = initial_balance + incomes - expenses
-    
-    return {
-        'period_start': start_date,
-        'period_end': end_date,
-        'mode': mode,
-        'initial_balance': initial_balance,
-        'incomes': incomes,
-        'expenses': expenses,
-        'final_balance': final_balance
-    }
+    # Utilisation de calculate_period_dates_range pour obtenir les dates de début et fin de tous les mois
+    start_dates, end_dates = calculate_period_dates_range(target_month, target_year, months, mode, financial_start_day)
+
+    if recurring_transactions:
+        occurrences = expand_recurring_transactions(recurring_transactions, date.min, end_dates[-1])
+        if transactions is None:
+            transactions = occurrences
+        else:
+            transactions = merge_with_transactions(transactions, occurrences)
+
+    if transactions is None:
+        transaction_dates = np.array([], dtype='datetime64[D]')
+        incomes = expenses = transfers = np.array([], dtype=np.int64 if fixed_point else float)
+    else:
+        transaction_dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions, fixed_point)
+        if not fixed_point:
+            amounts = np.nan_to_num(np.asarray(amounts, dtype=float))
+        signed = signed_amounts(amounts, types, account_ids, to_account_ids, account_id)
+
+        # Revenus et dépenses du compte ; le reste du montant signé correspond aux transferts
+        is_income, is_expense, _ = type_masks(types)
+        concerned = signed != 0
+        incomes = np.where(is_income & concerned, amounts, 0)
+        expenses = np.where(is_expense & concerned, amounts, 0)
+        transfers = signed - incomes + expenses
+
+        order = np.argsort(transaction_dates, kind='stable')
+        transaction_dates = transaction_dates[order]
+        incomes, expenses, transfers = incomes[order], expenses[order], transfers[order]
+
+    if fixed_point:
+        initial_balance = to_cents(initial_balance)
+
+    cumulative_incomes = _cumulative(incomes)
+    cumulative_expenses = _cumulative(expenses)
+    cumulative_transfers = _cumulative(transfers)
+
+    # Bornes de chaque mois dans les transactions triées : [premier jour, lendemain du dernier jour)
+    first = np.searchsorted(transaction_dates, start_dates.astype(transaction_dates.dtype), side='left')
+    last = np.searchsorted(transaction_dates, (end_dates + np.timedelta64(1, 'D')).astype(transaction_dates.dtype), side='left')
+
+    period_incomes = cumulative_incomes[last] - cumulative_incomes[first]
+    period_expenses = cumulative_expenses[last] - cumulative_expenses[first]
+    period_transfers = cumulative_transfers[last] - cumulative_transfers[first]
+    opening_balances = initial_balance + cumulative_incomes[first] - cumulative_expenses[first] + cumulative_transfers[first]
+
+    target_months = (np.datetime64(f"{target_year:04d}-{target_month:02d}", 'M') + np.arange(months)).astype(str)
+    forecast = pd.DataFrame({
+        'period_start': start_dates,
+        'period_end': end_dates,
+        'initial_balance': opening_balances,
+        'incomes': period_incomes,
+        'expenses': period_expenses,
+        'transfers': period_transfers,
+        'final_balance': opening_balances + period_incomes - period_expenses + period_transfers
+    }, index=target_months)
+    forecast.attrs['mode'] = mode
+
+    return forecast
 
 def main():
     """
@@ -48,18 +108,16 @@ def main():
     # Mois courant
     current_month = datetime.now().month
     current_year = datetime.now().year
-    
-    # Exemple en mode calendaire
-    result_calendaire = calculate_forecast_balance(current_month, current_year, 'calendaire')
+
+    # Exemple en mode calendaire sur les six prochains mois
+    result_calendaire = calculate_forecast_balance(current_month, current_year, 'calendaire', months=6)
     print("\nRésultat en mode calendaire:")
-    for key, value in result_calendaire.items():
-        print(f"  {key}: {value}")
-    
+    print(result_calendaire.to_string())
+
     # Exemple en mode financier avec début au 15
-    result_financier = calculate_forecast_balance(current_month, current_year, 'financier', 15)
+    result_financier = calculate_forecast_balance(current_month, current_year, 'financier', 15, months=6)
     print("\nRésultat en mode financier (début au 15):")
-    for key, value in result_financier.items():
-        print(f"  {key}: {value}")
+    print(result_financier.to_string())
 
 if __name__ == "__main__":
     main()
@@ -1,36 +1,230 @@
 # cache.py
-# Ce module sert de simple cache en mémoire pour partager des données entre différentes parties de l'application.
+# Ce module sert de cache en mémoire pour partager des données entre différentes parties de l'application.
 
-import sys
-import os
+import threading
+from collections import OrderedDict
 
-# Ajouter le répertoire parent au chemin d'importation pour pouvoir importer le module de journalisation
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from logging import info, debug
+from profiling import profiled
 
-# Cache pour stocker les soldes finaux mensuels calculés par la page Statistiques.
-# La clé sera le mois au format 'YYYY-MM', la valeur sera le solde final (float).
-monthly_balance_cache = {}
+# Nombre maximal de soldes conservés avant éviction des moins récemment utilisés
+DEFAULT_MAX_ENTRIES = 10000
+
+# Nombre maximal de ventilations par catégorie conservées (une par compte, mode de mois et version des données)
+DEFAULT_PIVOT_ENTRIES = 256
+
+class BalanceCache:
+    """
+    Cache LRU borné des soldes mensuels calculés par la page Statistiques.
+
+    Les clés combinent utilisateur, compte, mode de mois, jour de début du mois financier
+    et mois ('YYYY-MM'), pour que des soldes de contextes différents ne se mélangent pas.
+    Chaque entrée retient la version des données de son utilisateur et de son compte au moment
+    de sa mise en cache : modifier un compte incrémente sa version et rend ses entrées
+    obsolètes sans toucher aux autres comptes.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Nombre maximal d'entrées conservées
+        """
+        if max_entries < 1:
+            raise ValueError("La taille du cache doit être d'au moins une entrée")
+
+        self.max_entries = max_entries
+        # Clé -> (version utilisateur, version compte, solde), de la moins à la plus récemment utilisée
+        self._entries = OrderedDict()
+        self._user_versions = {}
+        self._account_versions = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(month_key: str, user_id=None, account_id=None,
+                 month_mode: str = 'calendar', financial_month_day: int = 1) -> tuple:
+        """
+        Construit la clé de cache d'un solde mensuel
+
+        Args:
+            month_key: Mois au format 'YYYY-MM'
+            user_id: Identifiant de l'utilisateur (None pour l'utilisateur courant)
+            account_id: Identifiant du compte (None pour la vue tous comptes)
+            month_mode: 'calendar' ou 'financial'
+            financial_month_day: Jour du début du mois financier
+
+        Returns:
+            Clé de cache
+        """
+        # En mode calendaire le jour financier n'a pas d'effet : on ne le laisse pas fragmenter les clés
+        if month_mode in ('calendar', 'calendaire'):
+            month_mode = 'calendar'
+            financial_month_day = 1
+        elif month_mode == 'financier':
+            month_mode = 'financial'
+
+        return (user_id, account_id, month_mode, financial_month_day, month_key)
+
+    def _current_versions(self, user_id, account_id) -> tuple:
+        """Retourne les versions courantes des données d'un utilisateur et d'un compte"""
+        return (self._user_versions.get(user_id, 0), self._account_versions.get((user_id, account_id), 0))
+
+    def get(self, key: tuple):
+        """
+        Récupère un solde du cache
+
+        Args:
+            key: Clé construite par `make_key`
+
+        Returns:
+            Le solde mis en cache, ou None s'il est absent ou obsolète
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[:2] != self._current_versions(key[0], key[1]):
+                # Données du compte modifiées depuis la mise en cache
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: tuple, value) -> None:
+        """
+        Enregistre un solde dans le cache, en évinçant les entrées les moins récemment utilisées
+
+        Args:
+            key: Clé construite par `make_key`
+            value: Solde à mettre en cache
+        """
+        with self._lock:
+            self._entries[key] = self._current_versions(key[0], key[1]) + (value,)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                debug("Éviction du cache: %s", evicted_key, module="cache")
+
+    def invalidate_account(self, user_id, account_id=None) -> None:
+        """
+        Rend obsolètes les soldes d'un compte
+
+        La vue tous comptes de l'utilisateur dépend de chacun de ses comptes : elle est
+        invalidée en même temps. Sans account_id, tous les soldes de l'utilisateur sont invalidés.
+
+        Args:
+            user_id: Identifiant de l'utilisateur
+            account_id: Identifiant du compte modifié, ou None pour tous les comptes
+        """
+        with self._lock:
+            if account_id is None:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+            else:
+                for key in ((user_id, account_id), (user_id, None)):
+                    self._account_versions[key] = self._account_versions.get(key, 0) + 1
+            self.invalidations += 1
+
+    def resize(self, max_entries: int) -> None:
+        """
+        Modifie la taille maximale du cache
+
+        Args:
+            max_entries: Nouveau nombre maximal d'entrées
+        """
+        if max_entries < 1:
+            raise ValueError("La taille du cache doit être d'au moins une entrée")
+
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Efface toutes les entrées et remet les compteurs à zéro"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Retourne les statistiques d'utilisation du cache
+
+        Returns:
+            Dictionnaire avec les succès, échecs, évictions, invalidations, la taille et le taux de succès
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Cache des soldes finaux mensuels calculés par la page Statistiques.
+balance_cache = BalanceCache()
+
+# Ventilations par catégorie de la page Statistiques (voir functions/category_breakdown.py) ;
+# elles suivent les mêmes versions de comptes que les soldes
+category_pivot_cache = BalanceCache(max_entries=DEFAULT_PIVOT_ENTRIES)
 
 # Fonctions d'accès au cache avec journalisation
-def get_cached_balance(month_key):
+@profiled()
+def get_cached_balance(month_key, user_id=None, account_id=None, month_mode='calendar', financial_month_day=1):
     """Récupère une valeur du cache avec journalisation"""
-    value = monthly_balance_cache.get(month_key)
+    value = balance_cache.get(BalanceCache.make_key(month_key, user_id, account_id, month_mode, financial_month_day))
     if value is not None:
-        debug(f"Cache hit pour le mois {month_key}: {value}", module="cache")
+        debug("Cache hit pour le mois %s: %s", month_key, value, module="cache")
     else:
-        debug(f"Cache miss pour le mois {month_key}", module="cache")
+        debug("Cache miss pour le mois %s", month_key, module="cache")
     return value
 
-def set_cached_balance(month_key, value):
+@profiled()
+def set_cached_balance(month_key, value, user_id=None, account_id=None, month_mode='calendar', financial_month_day=1):
     """Enregistre une valeur dans le cache avec journalisation"""
-    monthly_balance_cache[month_key] = value
-    debug(f"Mise en cache du solde pour le mois {month_key}: {value}", module="cache")
+    balance_cache.set(BalanceCache.make_key(month_key, user_id, account_id, month_mode, financial_month_day), value)
+    debug("Mise en cache du solde pour le mois %s: %s", month_key, value, module="cache")
+
+@profiled()
+def invalidate_account(user_id, account_id=None):
+    """Invalide les soldes en cache d'un compte (ou de tous les comptes d'un utilisateur)"""
+    balance_cache.invalidate_account(user_id, account_id)
+    category_pivot_cache.invalidate_account(user_id, account_id)
+    info("Cache invalidé pour l'utilisateur %s, compte %s", user_id, account_id if account_id is not None else 'tous', module="cache")
+
+def configure_cache(max_entries):
+    """Modifie la taille maximale du cache"""
+    balance_cache.resize(max_entries)
+    info("Taille maximale du cache fixée à %s entrées", max_entries, module="cache")
+
+def get_cache_stats():
+    """Retourne les compteurs d'utilisation du cache (succès, échecs, évictions...)"""
+    return balance_cache.stats()
 
 def clear_cache():
     """Efface le cache"""
-    monthly_balance_cache.clear()
+    balance_cache.clear()
+    category_pivot_cache.clear()
     info("Cache de soldes mensuels effacé", module="cache")
 
 # Vous pouvez ajouter d'autres variables de cache ici si nécessaire à l'avenir.
-info("Module cache.py chargé", module="cache")
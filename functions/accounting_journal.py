@@ -0,0 +1,232 @@
+import csv
+import gzip
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from logging import debug, info
+from functions.balance_calculator import (build_period_grid, assign_periods, type_masks,
+                                          signed_amounts, transaction_columns, sum_by_index, to_cents, from_cents)
+from functions.category_breakdown import transaction_category_codes
+from profiling import profiled
+
+class JournalCategory:
+    """Catégories des entrées du journal comptable (JournalCategory de src/lib/types.ts)"""
+    BALANCE = "Solde"
+    INCOME = "Revenu"
+    FIXED_EXPENSE = "Dépenses Fixes"
+    CURRENT_EXPENSE = "Dépenses Courantes"
+    EXCEPTIONAL_EXPENSE = "Dépenses Exceptionnelles"
+    SUMMARY = "Résumé"
+
+class JournalEntryName:
+    """Noms des entrées calculées du journal (JournalEntryName de src/lib/types.ts)"""
+    INITIAL_BALANCE = "Solde Initial"
+    MONTHLY_INCOME_TOTAL = "Total Revenus du Mois"
+    MONTHLY_EXPENSE_TOTAL = "Total Dépenses du Mois"
+    MONTHLY_BALANCE = "Balance du Mois"
+    EXPECTED_BALANCE = "Solde Prévu Fin de Mois"
+
+# Colonnes des lignes du journal, dans l'ordre des tuples produits par iter_journal_rows
+JOURNAL_COLUMNS = ('YearMonth', 'Date', 'Category', 'Name', 'Amount', 'Balance', 'IsCalculated', 'AccountId', 'TransactionId')
+
+def _expense_category(label) -> str:
+    """
+    Classe une dépense dans une catégorie du journal d'après sa catégorie de transaction.
+
+    Reconnaît les catégories de l'application ('fixed', 'exceptional') comme les libellés
+    français testés par AccountingJournalService ('Fixe', 'Exceptionnelle').
+    """
+    label = str(label)
+    if label == 'fixed' or 'Fixe' in label:
+        return JournalCategory.FIXED_EXPENSE
+    if label == 'exceptional' or 'Exceptionnelle' in label:
+        return JournalCategory.EXCEPTIONAL_EXPENSE
+    return JournalCategory.CURRENT_EXPENSE
+
+def _day_strings(dates: np.ndarray) -> list:
+    """Dates au format ISO, à la seconde au plus"""
+    if np.datetime_data(dates.dtype)[0] not in ('D', 's'):
+        dates = dates.astype('datetime64[s]')
+    return np.datetime_as_string(dates).tolist()
+
+def iter_journal_rows(transactions,
+                      account_creation_date: datetime,
+                      initial_balance: float,
+                      month_mode: str = 'calendar',
+                      financial_month_day: int = 1,
+                      end_date: datetime = None,
+                      account_id: int = None):
+    """
+    Produit le journal comptable d'un compte (ou consolidé), période par période, ligne par ligne.
+
+    Pour chaque période : le solde initial, les mouvements par date croissante avec le solde courant
+    après chacun, les totaux des revenus et des dépenses, la balance du mois et le solde prévu en fin
+    de mois. Les montants suivent les règles de `calculate_monthly_balances` (le solde prévu de chaque
+    période est le solde qu'il calcule) ; ils sont sommés en centimes pour rester exacts.
+
+    Les transactions sont classées une seule fois ; seules les lignes de la période en cours sont
+    construites à la fois, de sorte qu'un journal de plusieurs années n'est jamais entièrement en mémoire.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions ('Date', 'Amount', 'Type', 'AccountId',
+                                                        'ToAccountId', 'Category' et, si présents, 'Id' et 'Description')
+        account_creation_date (datetime): Date de création du compte (début de la première période)
+        initial_balance (float): Solde initial du compte
+        month_mode (str): 'calendar' ou 'financial'
+        financial_month_day (int): Jour du début du mois financier
+        end_date (datetime, optional): Date comprise dans la dernière période, celle de la dernière transaction par défaut
+        account_id (int, optional): Compte concerné, ou None pour le journal consolidé (transferts exclus)
+
+    Yields:
+        tuple: Une ligne dans l'ordre de JOURNAL_COLUMNS
+    """
+    dates, cents, types, account_ids, to_account_ids = transaction_columns(transactions, fixed_point=True)
+    signed = signed_amounts(cents, types, account_ids, to_account_ids, account_id)
+    category_codes, category_labels = transaction_category_codes(transactions)
+
+    if end_date is None:
+        end_date = pd.Timestamp(dates.max()) if len(dates) else account_creation_date
+    period_starts, period_ends, month_keys = build_period_grid(account_creation_date, month_mode,
+                                                                financial_month_day, end_date)
+
+    # Un seul classement par date (les TransactionStore sont déjà triés), stable pour garder l'ordre de saisie
+    order = np.argsort(dates, kind='stable') if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all() else np.arange(len(dates))
+    period_index = assign_periods(dates[order], period_starts, period_ends)
+    kept = (period_index >= 0) & (signed[order] != 0)
+    rows = order[kept]
+    row_periods = period_index[kept]
+
+    # Solde courant après chaque mouvement ; le solde initial d'une période est celui qui précède son premier mouvement
+    initial_cents = int(to_cents(initial_balance))
+    row_signed = signed[rows]
+    running = initial_cents + np.cumsum(row_signed)
+    flows = sum_by_index(row_periods, row_signed, len(month_keys))
+    closings = initial_cents + np.cumsum(flows)
+    openings = closings - flows
+    bounds = np.searchsorted(row_periods, np.arange(len(month_keys) + 1))
+
+    # Catégorie du journal de chaque mouvement
+    is_income, is_expense, is_transfer = type_masks(types[rows])
+    expense_categories = np.array([_expense_category(label) for label in category_labels], dtype=object)
+    journal_categories = np.where(is_expense, expense_categories[category_codes[rows]],
+                                  np.where(is_transfer & (row_signed < 0), JournalCategory.CURRENT_EXPENSE,
+                                           JournalCategory.INCOME))
+
+    # Nom des mouvements : description, à défaut catégorie de la transaction
+    if isinstance(transactions, pd.DataFrame):
+        ids = transactions['Id'].to_numpy()[rows] if 'Id' in transactions.columns else np.full(len(rows), None)
+        if 'Description' in transactions.columns:
+            names = transactions['Description'].fillna('').to_numpy()[rows]
+        else:
+            names = np.array(category_labels, dtype=object)[category_codes[rows]]
+    else:
+        ids = transactions.ids[rows]
+        names = np.array(category_labels, dtype=object)[category_codes[rows]]
+
+    start_days = _day_strings(period_starts.astype('datetime64[D]'))
+    end_days = _day_strings(period_ends.astype('datetime64[D]'))
+
+    debug("Journal: %s périodes, %s mouvements pour le compte %s", len(month_keys), len(rows), account_id,
+          module="accounting_journal")
+
+    for period, month_key in enumerate(month_keys):
+        first, last = bounds[period], bounds[period + 1]
+        opening = from_cents(openings[period]).item()
+        closing = from_cents(closings[period]).item()
+
+        yield (month_key, start_days[period], JournalCategory.BALANCE, JournalEntryName.INITIAL_BALANCE,
+               opening, opening, True, account_id, None)
+
+        period_signed = row_signed[first:last]
+        for row in zip(_day_strings(dates[rows[first:last]]), journal_categories[first:last].tolist(),
+                       names[first:last].tolist(), from_cents(period_signed).tolist(),
+                       from_cents(running[first:last]).tolist(), ids[first:last].tolist()):
+            yield (month_key, row[0], row[1], row[2], row[3], row[4], False, account_id, row[5])
+
+        income_total = from_cents(period_signed[period_signed > 0].sum()).item()
+        expense_total = from_cents(period_signed[period_signed < 0].sum()).item()
+        monthly_balance = from_cents(flows[period]).item()
+        yield (month_key, end_days[period], JournalCategory.SUMMARY, JournalEntryName.MONTHLY_INCOME_TOTAL,
+               income_total, None, True, account_id, None)
+        yield (month_key, end_days[period], JournalCategory.SUMMARY, JournalEntryName.MONTHLY_EXPENSE_TOTAL,
+               expense_total, None, True, account_id, None)
+        yield (month_key, end_days[period], JournalCategory.SUMMARY, JournalEntryName.MONTHLY_BALANCE,
+               monthly_balance, None, True, account_id, None)
+        yield (month_key, end_days[period], JournalCategory.BALANCE, JournalEntryName.EXPECTED_BALANCE,
+               closing, closing, True, account_id, None)
+
+def _open_output(path: str, newline=None):
+    """Ouvre un fichier d'export en écriture, compressé en gzip si son nom se termine par .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8', newline=newline)
+    return open(path, 'w', encoding='utf-8', newline=newline)
+
+@profiled()
+def write_journal_csv(rows, path: str) -> int:
+    """
+    Écrit des lignes de journal dans un fichier CSV, au fur et à mesure de leur production.
+
+    Args:
+        rows: Lignes produites par `iter_journal_rows`
+        path: Chemin du fichier (compressé en gzip si son nom se termine par .gz)
+
+    Returns:
+        int: Nombre de lignes écrites (hors en-tête)
+    """
+    count = 0
+    with _open_output(path, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(JOURNAL_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+@profiled()
+def write_journal_ndjson(rows, path: str) -> int:
+    """
+    Écrit des lignes de journal au format JSON par ligne (un objet par ligne), au fur et à mesure.
+
+    Args:
+        rows: Lignes produites par `iter_journal_rows`
+        path: Chemin du fichier (compressé en gzip si son nom se termine par .gz)
+
+    Returns:
+        int: Nombre de lignes écrites
+    """
+    count = 0
+    with _open_output(path) as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(JOURNAL_COLUMNS, row)), ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def export_journal(path: str, transactions, account_creation_date: datetime, initial_balance: float,
+                   month_mode: str = 'calendar', financial_month_day: int = 1, end_date: datetime = None,
+                   account_id: int = None, format: str = None) -> int:
+    """
+    Construit le journal comptable d'un compte et l'écrit directement dans un fichier.
+
+    Args:
+        path: Chemin du fichier
+        format: 'csv' ou 'ndjson' ; déduit de l'extension du fichier par défaut
+        (autres arguments : voir `iter_journal_rows`)
+
+    Returns:
+        int: Nombre de lignes écrites
+    """
+    if format is None:
+        format = 'ndjson' if path.endswith(('.ndjson', '.ndjson.gz', '.jsonl', '.jsonl.gz')) else 'csv'
+    writers = {'csv': write_journal_csv, 'ndjson': write_journal_ndjson}
+    if format not in writers:
+        raise ValueError(f"Format de journal non supporté: {format}")
+
+    rows = iter_journal_rows(transactions, account_creation_date, initial_balance, month_mode,
+                             financial_month_day, end_date, account_id)
+    count = writers[format](rows, path)
+    info("Journal du compte %s écrit dans %s (%s lignes)", account_id if account_id is not None else 'consolidé',
+         path, count, module="accounting_journal")
+    return count
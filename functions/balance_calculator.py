@@ -1,14 +1,37 @@
 import pandas as pd
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 import numpy as np
-import calendar
-import sys
-import os
 
-# Ajouter le répertoire parent au chemin d'importation pour pouvoir importer le module de journalisation
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from logging import debug, info, warning, error
+from period_boundaries import get_period_boundaries_for_range, get_period_containing
+from functions.downsampling import downsample_indices
+from profiling import profiled
+
+# Types de transaction ; leur position sert de code dans les stockages en colonnes (voir TransactionStore)
+TRANSACTION_TYPES = ('income', 'expense', 'transfer')
+
+# Mode virgule fixe : les montants sont convertis une fois en centimes (int64) et les sommes restent exactes
+CENTS_PER_UNIT = 100
+
+def to_cents(amounts):
+    """
+    Convertit des montants (scalaire ou tableau) en centimes entiers, arrondis au centime le plus proche.
+
+    Les montants manquants (NaN) valent 0, comme dans le calcul des soldes.
+
+    Returns:
+        np.int64 ou np.ndarray (int64): Montants en centimes
+    """
+    return np.rint(np.nan_to_num(np.asarray(amounts, dtype=float)) * CENTS_PER_UNIT).astype(np.int64)
+
+def from_cents(cents):
+    """
+    Convertit des centimes entiers en montants décimaux, pour l'affichage ou l'export.
+
+    Returns:
+        float ou np.ndarray (float64): Montants en unités monétaires
+    """
+    return np.asarray(cents, dtype=float) / CENTS_PER_UNIT
 
 def get_month_boundaries(date: datetime, month_mode: str, financial_month_day: int, account_id: int = None) -> tuple:
     """
@@ -23,30 +46,11 @@ def get_month_boundaries(date: datetime, month_mode: str, financial_month_day: i
     Returns:
         tuple: (start_date, end_date) pour le mois contenant la date
     """
-    year = date.year
-    month = date.month
+    # Le jour financier est ramené au dernier jour des mois trop courts (voir period_boundaries)
+    start_day, end_day = get_period_containing(date, month_mode, financial_month_day)
     
-    if month_mode == 'calendar':
-        # Mois calendaire standard (1er jour au dernier jour du mois)
-        start_date = datetime(year, month, 1)
-        # Calculer le dernier jour du mois
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = datetime(year, month, last_day, 23, 59, 59)
-    else:
-        # Mois financier (du jour financier au jour financier-1 du mois suivant)
-        day = date.day
-        
-        # Si nous sommes avant le jour financier du mois, nous sommes dans le mois financier précédent
-        if day < financial_month_day:
-            # Mois financier précédent
-            prev_month_date = date - relativedelta(months=1)
-            start_date = datetime(prev_month_date.year, prev_month_date.month, financial_month_day)
-            end_date = datetime(year, month, financial_month_day - 1, 23, 59, 59)
-        else:
-            # Mois financier actuel
-            start_date = datetime(year, month, financial_month_day)
-            next_month_date = date + relativedelta(months=1)
-            end_date = datetime(next_month_date.year, next_month_date.month, financial_month_day - 1, 23, 59, 59)
+    start_date = datetime(start_day.year, start_day.month, start_day.day)
+    end_date = datetime(end_day.year, end_day.month, end_day.day, 23, 59, 59)
     
     return (start_date, end_date)
 
@@ -62,23 +66,10 @@ def get_next_month_start(date: datetime, month_mode: str, financial_month_day: i
     Returns:
         datetime: Date de début du mois suivant
     """
-    if month_mode == 'calendar':
-        # Pour le mode calendaire, c'est le 1er du mois suivant
-        next_month = date + relativedelta(months=1)
-        return datetime(next_month.year, next_month.month, 1)
-    else:
-        # Pour le mode financier, c'est le jour financier du mois actuel ou suivant
-        year = date.year
-        month = date.month
-        day = date.day
-        
-        if day < financial_month_day:
-            # Si nous sommes avant le jour financier, le prochain mois financier commence ce mois-ci
-            return datetime(year, month, financial_month_day)
-        else:
-            # Sinon, il commence le mois prochain
-            next_month = date + relativedelta(months=1)
-            return datetime(next_month.year, next_month.month, financial_month_day)
+    # Le mois suivant commence le lendemain de la fin du mois contenant la date
+    _, end_day = get_period_containing(date, month_mode, financial_month_day)
+    
+    return datetime(end_day.year, end_day.month, end_day.day) + timedelta(days=1)
 
 def format_month_key(date: datetime) -> str:
     """
@@ -92,16 +83,374 @@ def format_month_key(date: datetime) -> str:
     """
     return f"{date.year}-{date.month:02d}"
 
-def calculate_monthly_balances(transactions_df: pd.DataFrame, 
-                              account_creation_date: datetime, 
-                              initial_balance: float, 
+@profiled()
+def build_period_grid(account_creation_date: datetime,
+                       month_mode: str,
+                       financial_month_day: int,
+                       end_date: datetime) -> tuple:
+    """
+    Construit les bornes de toutes les périodes entre la date de création et la date de fin.
+
+    Les périodes sont les mêmes que celles parcourues par `calculate_monthly_balances_reference`.
+
+    Args:
+        account_creation_date (datetime): Date de création du compte (début de la première période)
+        month_mode (str): 'calendar' pour les mois calendaires, 'financial' pour les mois financiers
+        financial_month_day (int): Jour de début du mois financier
+        end_date (datetime): Date de fin (la période qui la contient est la dernière)
+
+    Returns:
+        tuple: (starts, ends, keys) où starts/ends sont des tableaux datetime64 triés
+               et keys la liste des clés 'YYYY-MM'
+    """
+    starts, ends = get_period_boundaries_for_range(month_mode, financial_month_day, account_creation_date, end_date)
+
+    # Les fins de période sont à 23:59:59, comme dans get_month_boundaries
+    period_starts = starts.astype('datetime64[s]')
+    period_ends = (ends + np.timedelta64(1, 'D')).astype('datetime64[s]') - np.timedelta64(1, 's')
+    month_keys = starts.astype('datetime64[M]').astype(str).tolist()
+
+    return (period_starts, period_ends, month_keys)
+
+@profiled()
+def assign_periods(dates: np.ndarray, period_starts: np.ndarray, period_ends: np.ndarray) -> np.ndarray:
+    """
+    Associe chaque date à l'indice de sa période par recherche dichotomique.
+
+    Args:
+        dates (np.ndarray): Dates des transactions (datetime64, dans n'importe quel ordre)
+        period_starts (np.ndarray): Débuts de période triés (datetime64)
+        period_ends (np.ndarray): Fins de période correspondantes (datetime64)
+
+    Returns:
+        np.ndarray: Indice de période de chaque date, -1 si la date n'appartient à aucune période
+    """
+    # Aligner l'unité des bornes sur celle des dates pour que searchsorted compare des valeurs homogènes
+    period_starts = period_starts.astype(dates.dtype)
+    period_ends = period_ends.astype(dates.dtype)
+
+    period_index = np.searchsorted(period_starts, dates, side='right') - 1
+    in_period = period_index >= 0
+    # Les fins de période sont à 23:59:59 : une date peut tomber après la fin mais avant le début suivant
+    in_period[in_period] = dates[in_period] <= period_ends[period_index[in_period]]
+
+    return np.where(in_period, period_index, -1)
+
+def type_masks(types: np.ndarray) -> tuple:
+    """
+    Retourne les masques (revenus, dépenses, transferts) d'un tableau de types.
+
+    Les types peuvent être des chaînes ('income', ...) ou des codes entiers (position dans TRANSACTION_TYPES).
+
+    Args:
+        types (np.ndarray): Types des transactions
+
+    Returns:
+        tuple: (is_income, is_expense, is_transfer), tableaux booléens
+    """
+    if types.dtype.kind in 'iu':
+        return tuple(types == code for code in range(len(TRANSACTION_TYPES)))
+    return tuple(types == name for name in TRANSACTION_TYPES)
+
+def signed_amounts(amounts: np.ndarray,
+                    types: np.ndarray,
+                    account_ids: np.ndarray,
+                    to_account_ids: np.ndarray,
+                    account_id: int = None) -> np.ndarray:
+    """
+    Calcule l'effet de chaque transaction sur le solde (revenus +, dépenses -, transferts selon le sens).
+
+    Reprend les règles de `calculate_monthly_balances_reference` :
+    - sans account_id, tous les revenus et dépenses comptent et les transferts s'annulent ;
+    - avec account_id, seules les transactions dont AccountId ou ToAccountId vaut account_id comptent,
+      et un transfert est débité sur le compte source et crédité sur le compte destination.
+
+    Args:
+        amounts (np.ndarray): Montants des transactions
+        types (np.ndarray): Types des transactions ('income', 'expense', 'transfer' ou leurs codes)
+        account_ids (np.ndarray): Comptes source, ou None si la colonne est absente
+        to_account_ids (np.ndarray): Comptes destination, ou None si la colonne est absente
+        account_id (int, optional): Compte pour lequel calculer les effets, ou None pour tous les comptes
+
+    Returns:
+        np.ndarray: Montant signé de chaque transaction (0 pour celles qui ne concernent pas le compte),
+                    en centimes int64 si les montants sont des centimes (voir `to_cents`)
+    """
+    amounts = np.asarray(amounts)
+    if amounts.dtype.kind not in 'iu':
+        amounts = np.nan_to_num(amounts.astype(float))
+    is_income, is_expense, is_transfer = type_masks(types)
+    signed = np.where(is_income, amounts, 0) - np.where(is_expense, amounts, 0)
+
+    if account_id is None:
+        return signed
+
+    from_account = account_ids == account_id if account_ids is not None else np.zeros(len(amounts), dtype=bool)
+    to_account = to_account_ids == account_id if to_account_ids is not None else np.zeros(len(amounts), dtype=bool)
+
+    signed = np.where(from_account | to_account, signed, 0)
+
+    # Les transferts ne sont comptés que si les deux colonnes de compte sont présentes
+    if account_ids is not None and to_account_ids is not None:
+        transfer_amounts = np.where(is_transfer, amounts, 0)
+        signed = signed - np.where(from_account, transfer_amounts, 0) + np.where(to_account, transfer_amounts, 0)
+
+    return signed
+
+def transaction_columns(transactions_df, fixed_point: bool = False) -> tuple:
+    """
+    Extrait les colonnes utiles des transactions sous forme de tableaux NumPy.
+
+    Accepte un DataFrame, qui n'est pas modifié, ou un TransactionStore, dont les tableaux
+    sont transmis sans copie ni conversion.
+
+    Args:
+        transactions_df (pd.DataFrame | TransactionStore): Transactions
+        fixed_point (bool): Retourner les montants en centimes int64 plutôt qu'en float
+
+    Returns:
+        tuple: (dates, amounts, types, account_ids, to_account_ids), les deux derniers valant None
+               si la colonne correspondante est absente
+    """
+    if not isinstance(transactions_df, pd.DataFrame):
+        return transactions_df.as_columns(fixed_point)
+
+    dates = pd.to_datetime(transactions_df['Date']).to_numpy()
+    amounts = transactions_df['Amount'].to_numpy()
+    if fixed_point:
+        amounts = to_cents(amounts)
+    types = transactions_df['Type'].to_numpy()
+    account_ids = transactions_df['AccountId'].to_numpy() if 'AccountId' in transactions_df.columns else None
+    to_account_ids = transactions_df['ToAccountId'].to_numpy() if 'ToAccountId' in transactions_df.columns else None
+
+    return (dates, amounts, types, account_ids, to_account_ids)
+
+def sum_by_index(index: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Somme des valeurs par indice (les indices négatifs sont ignorés).
+
+    Les centimes int64 sont sommés en entiers (np.add.at) pour rester exacts ;
+    les montants float passent par np.bincount.
+
+    Args:
+        index (np.ndarray): Indice (période, compte...) de chaque valeur, -1 pour l'ignorer
+        values (np.ndarray): Valeurs à sommer (float ou centimes int64)
+        length (int): Nombre d'indices possibles
+
+    Returns:
+        np.ndarray: Somme par indice, de longueur `length`
+    """
+    valid = index >= 0
+    if values.dtype.kind in 'iu':
+        sums = np.zeros(length, dtype=np.int64)
+        np.add.at(sums, index[valid], values[valid])
+        return sums
+    return np.bincount(index[valid], weights=values[valid], minlength=length)
+
+@profiled()
+def _period_net_flows(transactions, period_starts: np.ndarray, period_ends: np.ndarray, account_id: int = None,
+                      fixed_point: bool = False) -> np.ndarray:
+    """
+    Somme les montants signés des transactions par période.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions à ventiler
+        period_starts (np.ndarray): Débuts de période triés
+        period_ends (np.ndarray): Fins de période correspondantes
+        account_id (int, optional): Compte concerné, ou None pour tous les comptes
+        fixed_point (bool): Sommer en centimes int64
+
+    Returns:
+        np.ndarray: Flux net de chaque période
+    """
+    dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions, fixed_point)
+    signed = signed_amounts(amounts, types, account_ids, to_account_ids, account_id)
+
+    period_index = assign_periods(dates, period_starts, period_ends)
+
+    return sum_by_index(period_index, signed, len(period_starts))
+
+@profiled()
+def calculate_monthly_balances(transactions_df: pd.DataFrame,
+                              account_creation_date: datetime,
+                              initial_balance: float,
                               month_mode: str, # 'calendar' or 'financial'
                               financial_month_day: int, # Day of the month for financial mode boundaries
                               end_date: datetime,
-                              account_id: int = None) -> pd.Series: # Ou dict
+                              account_id: int = None,
+                              fixed_point: bool = False) -> pd.Series: # Ou dict
     """
     Calculates the end-of-month balances from the account creation date up to the end_date.
 
+    Single pass over the transactions: each one is assigned to its period by binary search
+    over the sorted period boundaries, signed amounts are summed per period, and the running
+    balance is their cumulative sum. Gives the same result as `calculate_monthly_balances_reference`.
+
+    Args:
+        transactions_df (pd.DataFrame): DataFrame containing transactions with 'Date', 'Amount', 'Type' columns,
+                                        or a TransactionStore.
+        account_creation_date (datetime): The starting date for calculations.
+        initial_balance (float): The balance at the account_creation_date.
+        month_mode (str): 'calendar' for standard months, 'financial' for custom day boundaries.
+        financial_month_day (int): The day defining the start/end of a financial month (e.g., 15).
+        end_date (datetime): The date up to which balances should be pre-calculated.
+        account_id (int, optional): The account ID to filter transactions, or None for all accounts.
+        fixed_point (bool): Convert amounts and the initial balance once to int64 cents and keep every
+                            sum exact; the balances are then returned in cents (see `from_cents`).
+
+    Returns:
+        pd.Series: A Series indexed by month ('YYYY-MM') with the final balance for each month.
+    """
+
+    debug("Calculating monthly balances - Mode: %s, Fin Day: %s, Start: %s, End: %s", month_mode, financial_month_day, account_creation_date, end_date, module="balance_calculator")
+
+    # Vérifions d'abord que le DataFrame a les colonnes requises
+    if isinstance(transactions_df, pd.DataFrame):
+        required_columns = ['Date', 'Amount', 'Type']
+        for col in required_columns:
+            if col not in transactions_df.columns:
+                raise ValueError(f"La colonne {col} est manquante dans le DataFrame des transactions")
+
+    # Assurons-nous que account_creation_date et end_date sont des objets datetime
+    if isinstance(account_creation_date, str):
+        account_creation_date = datetime.fromisoformat(account_creation_date)
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date)
+
+    period_starts, period_ends, month_keys = build_period_grid(account_creation_date, month_mode, financial_month_day, end_date)
+
+    # Regrouper les montants signés par période puis cumuler
+    net_flows = _period_net_flows(transactions_df, period_starts, period_ends, account_id, fixed_point)
+    if fixed_point:
+        initial_balance = to_cents(initial_balance)
+
+    calculated_balances = pd.Series(initial_balance + np.cumsum(net_flows), index=month_keys)
+
+    debug("Returning calculated balances: %s", calculated_balances, module="balance_calculator")
+
+    return calculated_balances
+
+@profiled()
+def calculate_monthly_balances_from_chunks(transaction_chunks,
+                                          account_creation_date: datetime,
+                                          initial_balance: float,
+                                          month_mode: str,
+                                          financial_month_day: int,
+                                          end_date: datetime,
+                                          account_id: int = None,
+                                          fixed_point: bool = False) -> pd.Series:
+    """
+    Calcule les soldes mensuels à partir de transactions fournies par morceaux.
+
+    Seuls les flux nets par période sont conservés entre deux morceaux : la mémoire utilisée
+    ne dépend pas du nombre total de transactions (voir functions/user_data_reader).
+
+    Args:
+        transaction_chunks (iterable): Morceaux de transactions (DataFrame ou TransactionStore)
+        account_creation_date (datetime): Date de création du compte
+        initial_balance (float): Solde initial
+        month_mode (str): Mode de mois ('calendar' ou 'financial')
+        financial_month_day (int): Jour du début du mois financier
+        end_date (datetime): Date de fin pour les calculs
+        account_id (int, optional): ID du compte pour filtrer les transactions
+        fixed_point (bool): Calculer en centimes int64 (voir `calculate_monthly_balances`)
+
+    Returns:
+        pd.Series: Soldes indexés par mois ('YYYY-MM'), identiques à `calculate_monthly_balances`
+    """
+    if isinstance(account_creation_date, str):
+        account_creation_date = datetime.fromisoformat(account_creation_date)
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date)
+
+    period_starts, period_ends, month_keys = build_period_grid(account_creation_date, month_mode, financial_month_day, end_date)
+
+    net_flows = np.zeros(len(month_keys), dtype=np.int64 if fixed_point else float)
+    chunk_count = 0
+    for chunk in transaction_chunks:
+        net_flows += _period_net_flows(chunk, period_starts, period_ends, account_id, fixed_point)
+        chunk_count += 1
+
+    debug("Calculated monthly balances from %s chunks", chunk_count, module="balance_calculator")
+
+    if fixed_point:
+        initial_balance = to_cents(initial_balance)
+
+    return pd.Series(initial_balance + np.cumsum(net_flows), index=month_keys)
+
+@profiled()
+def calculate_daily_balances(transactions_df: pd.DataFrame,
+                             account_creation_date: datetime,
+                             initial_balance: float,
+                             end_date: datetime,
+                             account_id: int = None,
+                             max_points: int = None,
+                             downsampling: str = 'lttb',
+                             fixed_point: bool = False) -> pd.Series:
+    """
+    Calcule le solde de fin de journée de chaque jour, de la création du compte à la date de fin.
+
+    Les montants signés sont sommés par jour puis cumulés, selon les règles de
+    `calculate_monthly_balances`. Les transactions antérieures au jour de création sont ignorées :
+    le solde de ce jour est le solde initial augmenté de ses propres transactions.
+
+    Avec max_points, la série est réduite à au plus max_points jours pour les graphiques :
+    'lttb' garde la forme de la courbe, 'minmax' garde le plus bas et le plus haut de chaque
+    tranche (et donc les extrêmes de la série). Le premier et le dernier jour sont toujours conservés.
+
+    Args:
+        transactions_df (pd.DataFrame | TransactionStore): Transactions
+        account_creation_date (datetime): Date de création du compte (premier jour de la série)
+        initial_balance (float): Solde initial
+        end_date (datetime): Dernier jour de la série
+        account_id (int, optional): ID du compte pour filtrer les transactions
+        max_points (int, optional): Nombre maximal de points retournés
+        downsampling (str): Méthode de réduction, 'lttb' ou 'minmax'
+        fixed_point (bool): Calculer en centimes int64 (voir `calculate_monthly_balances`)
+
+    Returns:
+        pd.Series: Soldes indexés par jour (DatetimeIndex nommé 'Date')
+    """
+    if isinstance(account_creation_date, str):
+        account_creation_date = datetime.fromisoformat(account_creation_date)
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date)
+
+    first_day = np.datetime64(account_creation_date.date(), 'D')
+    day_count = max(int((np.datetime64(end_date.date(), 'D') - first_day) // np.timedelta64(1, 'D')) + 1, 0)
+
+    dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions_df, fixed_point)
+    signed = signed_amounts(amounts, types, account_ids, to_account_ids, account_id)
+
+    # Indice du jour de chaque transaction, -1 hors de la série
+    day_index = (dates.astype('datetime64[D]') - first_day) // np.timedelta64(1, 'D')
+    day_index = np.where((day_index >= 0) & (day_index < day_count), day_index, -1)
+
+    if fixed_point:
+        initial_balance = to_cents(initial_balance)
+    balances = initial_balance + np.cumsum(sum_by_index(day_index, signed, day_count))
+    days = first_day + np.arange(day_count)
+
+    if max_points is not None and day_count > max_points:
+        selected = downsample_indices(np.arange(day_count), balances, max_points, downsampling)
+        days, balances = days[selected], balances[selected]
+        debug("Daily balances downsampled from %s to %s points (%s)", day_count, len(selected), downsampling,
+              module="balance_calculator")
+
+    return pd.Series(balances, index=pd.DatetimeIndex(days, name='Date'))
+
+def calculate_monthly_balances_reference(transactions_df: pd.DataFrame, 
+                                        account_creation_date: datetime, 
+                                        initial_balance: float, 
+                                        month_mode: str, # 'calendar' or 'financial'
+                                        financial_month_day: int, # Day of the month for financial mode boundaries
+                                        end_date: datetime,
+                                        account_id: int = None) -> pd.Series: # Ou dict
+    """
+    Reference implementation: walks month by month and filters the whole DataFrame for each month.
+
+    Kept to cross-check `calculate_monthly_balances`, which gives the same result in a single pass.
+
     Args:
         transactions_df (pd.DataFrame): DataFrame containing transactions with 'Date', 'Amount', 'Type' columns.
         account_creation_date (datetime): The starting date for calculations.
@@ -115,7 +464,7 @@ def calculate_monthly_balances(transactions_df: pd.DataFrame,
         pd.Series: A Series indexed by month ('YYYY-MM') with the final balance for each month.
     """
     
-    debug(f"Calculating monthly balances - Mode: {month_mode}, Fin Day: {financial_month_day}, Start: {account_creation_date}, End: {end_date}", module="balance_calculator")
+    debug("Calculating monthly balances (reference) - Mode: %s, Fin Day: %s, Start: %s, End: %s", month_mode, financial_month_day, account_creation_date, end_date, module="balance_calculator")
     
     # Vérifions d'abord que le DataFrame a les colonnes requises
     required_columns = ['Date', 'Amount', 'Type']
@@ -123,9 +472,9 @@ def calculate_monthly_balances(transactions_df: pd.DataFrame,
         if col not in transactions_df.columns:
             raise ValueError(f"La colonne {col} est manquante dans le DataFrame des transactions")
     
-    # Convertir toutes les dates en type datetime si elles ne le sont pas déjà
+    # Convertir toutes les dates en type datetime si elles ne le sont pas déjà (sans modifier l'appelant)
     if not pd.api.types.is_datetime64_dtype(transactions_df['Date']):
-        transactions_df['Date'] = pd.to_datetime(transactions_df['Date'])
+        transactions_df = transactions_df.assign(Date=pd.to_datetime(transactions_df['Date']))
     
     # Assurons-nous que account_creation_date et end_date sont des objets datetime
     if isinstance(account_creation_date, str):
@@ -216,10 +565,73 @@ def calculate_monthly_balances(transactions_df: pd.DataFrame,
     # Convertir le dictionnaire en Series pandas pour un accès plus facile
     calculated_balances = pd.Series(monthly_balances)
     
-    debug(f"Returning calculated balances: {calculated_balances}", module="balance_calculator")
+    debug("Returning calculated balances: %s", calculated_balances, module="balance_calculator")
     
     return calculated_balances
 
+@profiled()
+def _apply_balance_adjustments(balances: np.ndarray,
+                               month_keys,
+                               account_index: pd.Index,
+                               balance_adjustments: pd.DataFrame,
+                               before_creation: np.ndarray = None) -> np.ndarray:
+    """
+    Applique les ajustements de solde manuels comme des points de recalage.
+
+    Chaque ajustement fixe le solde de son mois (YearMonth) et décale d'autant tous les mois
+    suivants du même compte, jusqu'à l'ajustement suivant qui recale à nouveau la série. Le
+    décalage de chaque ajustement (AdjustedBalance - solde calculé) est posé dans une matrice
+    mois × compte puis propagé vers l'avant par colonne, en un seul passage quel que soit le
+    nombre d'ajustements. Pour un même mois et un même compte, le dernier ajustement l'emporte.
+
+    Args:
+        balances (np.ndarray): Soldes calculés, une ligne par mois et une colonne par compte
+        month_keys: Mois ('YYYY-MM') correspondant aux lignes
+        account_index (pd.Index): Identifiants de compte correspondant aux colonnes
+        balance_adjustments (pd.DataFrame): Ajustements ('YearMonth', 'AccountId', 'AdjustedBalance')
+        before_creation (np.ndarray, optional): Masque des mois antérieurs à la création de chaque compte
+
+    Returns:
+        np.ndarray: Soldes ajustés (nouveau tableau, de même forme et de même type que `balances` :
+                    les AdjustedBalance sont convertis en centimes si les soldes sont en centimes)
+    """
+    required_columns = ['YearMonth', 'AccountId', 'AdjustedBalance']
+    for col in required_columns:
+        if col not in balance_adjustments.columns:
+            warning("La colonne %s est manquante dans le DataFrame des ajustements", col, module="balance_calculator")
+            return balances.copy()
+
+    adjustments = balance_adjustments.drop_duplicates(['YearMonth', 'AccountId'], keep='last')
+    rows = pd.Index(month_keys).get_indexer(adjustments['YearMonth'].astype(str))
+    columns = account_index.get_indexer(adjustments['AccountId'])
+    adjusted_values = adjustments['AdjustedBalance'].to_numpy(dtype=float)
+    if balances.dtype.kind in 'iu':
+        adjusted_values = to_cents(adjusted_values)
+
+    # Ignorer les ajustements hors de la grille, d'un compte inconnu ou antérieurs à la création du compte
+    valid = (rows >= 0) & (columns >= 0)
+    if before_creation is not None:
+        valid[valid] = ~before_creation[rows[valid], columns[valid]]
+    rows, columns, adjusted_values = rows[valid], columns[valid], adjusted_values[valid]
+
+    if len(rows) == 0:
+        return balances.copy()
+
+    debug("Applying %s balance adjustments", len(rows), module="balance_calculator")
+
+    # Décalage posé sur le mois de chaque ajustement, puis reporté sur les mois suivants
+    is_anchor = np.zeros(balances.shape, dtype=bool)
+    is_anchor[rows, columns] = True
+    offsets = np.zeros(balances.shape, dtype=balances.dtype)
+    offsets[rows, columns] = adjusted_values - balances[rows, columns]
+
+    last_anchor = np.where(is_anchor, np.arange(balances.shape[0])[:, None], -1)
+    np.maximum.accumulate(last_anchor, axis=0, out=last_anchor)
+    propagated = np.where(last_anchor >= 0, offsets[np.maximum(last_anchor, 0), np.arange(balances.shape[1])], 0)
+
+    return balances + propagated
+
+@profiled()
 def calculate_monthly_balances_with_adjustments(
     transactions_df: pd.DataFrame,
     account_creation_date: datetime,
@@ -228,10 +640,14 @@ def calculate_monthly_balances_with_adjustments(
     financial_month_day: int,
     end_date: datetime,
     account_id: int = None,
-    balance_adjustments: pd.DataFrame = None
+    balance_adjustments: pd.DataFrame = None,
+    fixed_point: bool = False
 ) -> pd.Series:
     """
     Version améliorée qui prend en compte les ajustements de solde manuels.
+
+    Chaque ajustement recale le solde de son mois et décale les mois suivants (voir
+    `_apply_balance_adjustments`).
     
     Args:
         transactions_df (pd.DataFrame): DataFrame des transactions
@@ -242,6 +658,7 @@ def calculate_monthly_balances_with_adjustments(
         end_date (datetime): Date de fin pour les calculs
         account_id (int, optional): ID du compte pour filtrer les transactions
         balance_adjustments (pd.DataFrame, optional): DataFrame des ajustements de solde
+        fixed_point (bool): Calculer en centimes int64 (voir `calculate_monthly_balances`)
         
     Returns:
         pd.Series: Series des soldes mensuels avec prise en compte des ajustements
@@ -254,43 +671,151 @@ def calculate_monthly_balances_with_adjustments(
         month_mode,
         financial_month_day,
         end_date,
-        account_id
+        account_id,
+        fixed_point
     )
     
     # Si pas d'ajustements ou pas d'ID de compte, retourner les soldes normaux
     if balance_adjustments is None or account_id is None:
         return monthly_balances
-    
-    # Vérifier que le DataFrame des ajustements a les colonnes requises
-    required_columns = ['YearMonth', 'AccountId', 'AdjustedBalance']
-    for col in required_columns:
-        if col not in balance_adjustments.columns:
-            warning(f"La colonne {col} est manquante dans le DataFrame des ajustements", module="balance_calculator")
-            return monthly_balances
-    
-    # Filtrer les ajustements pour ce compte
-    account_adjustments = balance_adjustments[
-        balance_adjustments['AccountId'] == account_id
-    ]
-    
-    # Si pas d'ajustements pour ce compte, retourner les soldes normaux
-    if account_adjustments.empty:
-        return monthly_balances
-    
-    # Créer un dictionnaire depuis les soldes calculés
-    balances_dict = monthly_balances.to_dict()
-    
-    # Appliquer les ajustements
-    for _, adjustment in account_adjustments.iterrows():
-        year_month = adjustment['YearMonth']
-        adjusted_balance = adjustment['AdjustedBalance']
-        
-        # Si ce mois existe dans nos calculs, appliquer l'ajustement
-        if year_month in balances_dict:
-            debug(f"Applying adjustment for {year_month}: {adjusted_balance}", module="balance_calculator")
-            balances_dict[year_month] = adjusted_balance
-    
-    # Reconvertir en Series
-    adjusted_balances = pd.Series(balances_dict)
-    
-    return adjusted_balances
+
+    adjusted_balances = _apply_balance_adjustments(
+        monthly_balances.to_numpy()[:, None],
+        monthly_balances.index,
+        pd.Index([account_id]),
+        balance_adjustments
+    )
+
+    return pd.Series(adjusted_balances[:, 0], index=monthly_balances.index)
+
+@profiled()
+def calculate_all_accounts_balances(transactions_df: pd.DataFrame,
+                                    accounts_df: pd.DataFrame,
+                                    month_mode: str,
+                                    financial_month_day: int,
+                                    end_date: datetime,
+                                    balance_adjustments: pd.DataFrame = None,
+                                    fixed_point: bool = False) -> pd.DataFrame:
+    """
+    Calcule en un seul passage les soldes mensuels de tous les comptes.
+
+    Chaque transaction est ventilée sur son compte source (AccountId) et, le cas échéant,
+    sur son compte destination (ToAccountId) : un transfert est débité sur la source et
+    crédité sur la destination. Les montants signés sont ensuite agrégés dans une matrice
+    période × compte puis cumulés par colonne. Chaque colonne est identique au résultat de
+    `calculate_monthly_balances` appelé avec l'account_id correspondant.
+
+    Args:
+        transactions_df (pd.DataFrame): DataFrame des transactions ('Date', 'Amount', 'Type',
+                                        'AccountId' et éventuellement 'ToAccountId') ou TransactionStore
+        accounts_df (pd.DataFrame): DataFrame des comptes ('AccountId', 'CreationDate', 'InitialBalance')
+        month_mode (str): Mode de mois ('calendar' ou 'financial')
+        financial_month_day (int): Jour du début du mois financier
+        end_date (datetime): Date de fin pour les calculs
+        balance_adjustments (pd.DataFrame, optional): Ajustements de solde ('YearMonth', 'AccountId',
+                                                      'AdjustedBalance'), appliqués comme des points de
+                                                      recalage propagés aux mois suivants
+        fixed_point (bool): Calculer en centimes int64 (voir `calculate_monthly_balances`)
+
+    Returns:
+        pd.DataFrame: Soldes indexés par mois ('YYYY-MM') avec une colonne par compte.
+                      Les mois antérieurs à la création d'un compte valent NaN (<NA> en centimes,
+                      les colonnes étant alors de type Int64).
+    """
+    debug("Calculating balances for %s accounts - Mode: %s, Fin Day: %s, End: %s", len(accounts_df), month_mode, financial_month_day, end_date, module="balance_calculator")
+
+    if isinstance(transactions_df, pd.DataFrame):
+        required_columns = ['Date', 'Amount', 'Type', 'AccountId']
+        for col in required_columns:
+            if col not in transactions_df.columns:
+                raise ValueError(f"La colonne {col} est manquante dans le DataFrame des transactions")
+
+    required_account_columns = ['AccountId', 'CreationDate', 'InitialBalance']
+    for col in required_account_columns:
+        if col not in accounts_df.columns:
+            raise ValueError(f"La colonne {col} est manquante dans le DataFrame des comptes")
+
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date)
+
+    account_index = pd.Index(accounts_df['AccountId'])
+    creation_dates = pd.to_datetime(accounts_df['CreationDate']).to_numpy()
+    initial_balances = accounts_df['InitialBalance'].to_numpy(dtype=float)
+    if fixed_point:
+        initial_balances = to_cents(initial_balances)
+
+    if account_index.empty:
+        return pd.DataFrame(columns=account_index, dtype=float)
+
+    # Une seule grille de périodes, depuis le compte le plus ancien
+    first_creation_date = pd.Timestamp(creation_dates.min()).to_pydatetime()
+    period_starts, period_ends, month_keys = build_period_grid(first_creation_date, month_mode, financial_month_day, end_date)
+    period_count = len(month_keys)
+    account_count = len(account_index)
+
+    # Première période de chaque compte (aucune si le compte est créé après end_date)
+    first_periods = np.searchsorted(period_starts.astype(creation_dates.dtype), creation_dates, side='right') - 1
+    first_periods = np.where(creation_dates <= np.datetime64(end_date), first_periods, period_count)
+
+    dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions_df, fixed_point)
+    if not fixed_point:
+        amounts = np.nan_to_num(np.asarray(amounts, dtype=float))
+    period_index = assign_periods(dates, period_starts, period_ends)
+    is_income, is_expense, is_transfer = type_masks(types)
+    base_amounts = np.where(is_income, amounts, 0) - np.where(is_expense, amounts, 0)
+
+    # Jambe source : revenus, dépenses et débit des transferts
+    leg_periods = [period_index]
+    leg_columns = [account_index.get_indexer(account_ids)]
+    leg_amounts = [base_amounts]
+
+    # Jambe destination : crédit des transferts, et revenus/dépenses rattachés à un autre compte
+    if to_account_ids is not None:
+        transfer_amounts = np.where(is_transfer, amounts, 0)
+        to_other_account = ~(to_account_ids == account_ids)
+        leg_amounts[0] = base_amounts - transfer_amounts
+        leg_periods.append(period_index)
+        leg_columns.append(account_index.get_indexer(to_account_ids))
+        leg_amounts.append(np.where(to_other_account, base_amounts, 0) + transfer_amounts)
+
+    leg_periods = np.concatenate(leg_periods)
+    leg_columns = np.concatenate(leg_columns)
+    leg_amounts = np.concatenate(leg_amounts)
+
+    valid = (leg_periods >= 0) & (leg_columns >= 0)
+    valid[valid] = leg_periods[valid] >= first_periods[leg_columns[valid]]
+
+    flat_index = np.where(valid, leg_periods * account_count + leg_columns, -1)
+    net_flows = sum_by_index(flat_index, leg_amounts, period_count * account_count)
+    balances = initial_balances + np.cumsum(net_flows.reshape(period_count, account_count), axis=0)
+
+    before_creation = np.arange(period_count)[:, None] < first_periods[None, :]
+
+    if balance_adjustments is not None:
+        balances = _apply_balance_adjustments(balances, month_keys, account_index, balance_adjustments, before_creation)
+
+    # Masquer les mois antérieurs à la création de chaque compte
+    if fixed_point:
+        balance_matrix = pd.DataFrame(balances, index=month_keys, columns=account_index).astype('Int64').mask(before_creation)
+    else:
+        balances[before_creation] = np.nan
+        balance_matrix = pd.DataFrame(balances, index=month_keys, columns=account_index)
+
+    debug("Returning balance matrix: %s months x %s accounts", period_count, account_count, module="balance_calculator")
+
+    return balance_matrix
+
+def consolidate_account_balances(balance_matrix: pd.DataFrame) -> pd.Series:
+    """
+    Dérive la vue consolidée « tous les comptes » de la matrice des soldes par compte.
+
+    Les comptes pas encore créés (NaN) ne contribuent pas au total ; les transferts entre
+    comptes s'annulent naturellement dans la somme.
+
+    Args:
+        balance_matrix (pd.DataFrame): Résultat de `calculate_all_accounts_balances`
+
+    Returns:
+        pd.Series: Solde consolidé indexé par mois ('YYYY-MM')
+    """
+    return balance_matrix.sum(axis=1, min_count=1)
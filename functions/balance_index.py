@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+from logging import debug
+from functions.balance_calculator import transaction_columns, type_masks, to_cents
+from profiling import profiled
+
+class BalanceIndex:
+    """
+    Index des soldes de plusieurs comptes, interrogeable à n'importe quelle date.
+
+    Pour chaque compte (et pour la vue tous comptes), les mouvements sont classés par jour et leurs
+    montants signés cumulés. Le solde à une date et le flux net entre deux dates se lisent alors par
+    recherche dichotomique sur les jours, en O(log n), pour une date ou un tableau de dates à la fois.
+
+    Les montants suivent les règles de `calculate_all_accounts_balances` : un transfert est débité sur
+    son compte source et crédité sur son compte destination, et les mouvements antérieurs au jour de
+    création d'un compte sont ignorés. La vue tous comptes suit celle de `calculate_monthly_balances`
+    sans account_id : revenus et dépenses de tous les comptes, depuis le compte le plus ancien, avec
+    la somme des soldes initiaux. En mode virgule fixe, montants et soldes sont tenus en centimes int64.
+    """
+
+    def __init__(self, accounts_df: pd.DataFrame, fixed_point: bool = False):
+        """
+        Initialise un index sans transaction.
+
+        Args:
+            accounts_df (pd.DataFrame): DataFrame des comptes ('AccountId', 'CreationDate', 'InitialBalance')
+            fixed_point (bool): Tenir les montants et les soldes en centimes int64
+        """
+        for col in ['AccountId', 'CreationDate', 'InitialBalance']:
+            if col not in accounts_df.columns:
+                raise ValueError(f"La colonne {col} est manquante dans le DataFrame des comptes")
+
+        self.fixed_point = fixed_point
+        self.account_index = pd.Index(accounts_df['AccountId'])
+        if self.account_index.has_duplicates:
+            raise ValueError("Les identifiants de compte doivent être uniques")
+
+        initial_balances = accounts_df['InitialBalance'].to_numpy(dtype=float)
+        initial_balances = to_cents(initial_balances) if fixed_point else np.nan_to_num(initial_balances)
+        creation_days = pd.to_datetime(accounts_df['CreationDate']).to_numpy().astype('datetime64[D]')
+
+        # Un emplacement par compte, puis un dernier pour la vue tous comptes
+        if len(creation_days):
+            self.creation_days = np.append(creation_days, creation_days.min())
+        else:
+            self.creation_days = np.array([np.datetime64('NaT')], dtype='datetime64[D]')
+        self.initial_balances = np.append(initial_balances, initial_balances.sum())
+
+        dtype = np.int64 if fixed_point else float
+        slot_count = len(self.creation_days)
+        # Jours des mouvements de chaque emplacement, et montants cumulés précédés de 0
+        self._days = [np.array([], dtype='datetime64[D]') for _ in range(slot_count)]
+        self._cumulative = [np.zeros(1, dtype=dtype) for _ in range(slot_count)]
+
+    @classmethod
+    @profiled()
+    def from_transactions(cls, transactions_df, accounts_df: pd.DataFrame, fixed_point: bool = False) -> "BalanceIndex":
+        """
+        Construit l'index en un seul passage.
+
+        Args:
+            transactions_df (pd.DataFrame | TransactionStore): Transactions ('Date', 'Amount', 'Type',
+                                                              'AccountId' et éventuellement 'ToAccountId')
+            accounts_df (pd.DataFrame): DataFrame des comptes ('AccountId', 'CreationDate', 'InitialBalance')
+            fixed_point (bool): Tenir les montants et les soldes en centimes int64
+
+        Returns:
+            BalanceIndex: Index initialisé
+        """
+        index = cls(accounts_df, fixed_point)
+        index.append(transactions_df)
+        return index
+
+    def __len__(self) -> int:
+        """Nombre de mouvements indexés, toutes jambes de comptes confondues (hors vue tous comptes)"""
+        return sum(len(days) for days in self._days[:-1])
+
+    def _events(self, transactions_df) -> tuple:
+        """
+        Décompose des transactions en mouvements (emplacement, jour, montant signé).
+
+        Chaque transaction donne une jambe sur son compte source, une jambe sur son compte destination
+        le cas échéant, et une jambe sur la vue tous comptes. Les jambes sans compte connu et les
+        mouvements antérieurs à la création de leur compte sont écartés.
+        """
+        dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions_df, self.fixed_point)
+        if not self.fixed_point:
+            amounts = np.nan_to_num(np.asarray(amounts, dtype=float))
+        days = dates.astype('datetime64[D]')
+        is_income, is_expense, is_transfer = type_masks(types)
+        base_amounts = np.where(is_income, amounts, 0) - np.where(is_expense, amounts, 0)
+        total_slot = len(self.creation_days) - 1
+
+        # Jambe source, et vue tous comptes (où les transferts s'annulent)
+        leg_slots = [self.account_index.get_indexer(account_ids) if account_ids is not None
+                     else np.full(len(days), -1), np.full(len(days), total_slot)]
+        leg_amounts = [base_amounts, base_amounts]
+
+        # Jambe destination : crédit des transferts, et revenus/dépenses rattachés à un autre compte
+        if account_ids is not None and to_account_ids is not None:
+            transfer_amounts = np.where(is_transfer, amounts, 0)
+            to_other_account = ~(to_account_ids == account_ids)
+            leg_amounts[0] = base_amounts - transfer_amounts
+            leg_slots.append(self.account_index.get_indexer(to_account_ids))
+            leg_amounts.append(np.where(to_other_account, base_amounts, 0) + transfer_amounts)
+
+        leg_slots = np.concatenate(leg_slots)
+        leg_days = np.tile(days, len(leg_amounts))
+        leg_amounts = np.concatenate(leg_amounts)
+
+        valid = leg_slots >= 0
+        valid[valid] = leg_days[valid] >= self.creation_days[leg_slots[valid]]
+        return leg_slots[valid], leg_days[valid], leg_amounts[valid]
+
+    @profiled()
+    def append(self, transactions_df) -> None:
+        """
+        Ajoute des transactions à l'index.
+
+        Seuls les comptes concernés sont mis à jour, et pour chacun seuls les cumuls postérieurs au
+        premier jour ajouté sont recalculés : des transactions plus récentes que toutes les autres
+        (le cas courant) ne font qu'allonger les tableaux existants.
+
+        Args:
+            transactions_df (pd.DataFrame | TransactionStore): Transactions à ajouter
+        """
+        slots, days, amounts = self._events(transactions_df)
+        # Tri stable par emplacement puis par jour : l'ordre de saisie est conservé au sein d'un jour
+        order = np.lexsort((days, slots))
+        slots, days, amounts = slots[order], days[order], amounts[order]
+        bounds = np.searchsorted(slots, np.arange(len(self.creation_days) + 1))
+
+        for slot in np.flatnonzero(np.diff(bounds)):
+            new_days = days[bounds[slot]:bounds[slot + 1]]
+            new_amounts = amounts[bounds[slot]:bounds[slot + 1]]
+            old_days, old_cumulative = self._days[slot], self._cumulative[slot]
+
+            # Les mouvements déjà indexés jusqu'au premier jour ajouté gardent leurs cumuls
+            kept = np.searchsorted(old_days, new_days[0], side='right')
+            if kept < len(old_days):
+                tail_days = np.concatenate([old_days[kept:], new_days])
+                tail_amounts = np.concatenate([np.diff(old_cumulative[kept:]), new_amounts])
+                tail_order = np.argsort(tail_days, kind='stable')
+                new_days, new_amounts = tail_days[tail_order], tail_amounts[tail_order]
+
+            self._days[slot] = np.concatenate([old_days[:kept], new_days])
+            self._cumulative[slot] = np.concatenate([old_cumulative[:kept + 1],
+                                                     old_cumulative[kept] + np.cumsum(new_amounts)])
+
+        debug("BalanceIndex: %s mouvements ajoutés sur %s comptes", len(slots), int((np.diff(bounds) > 0).sum()),
+              module="balance_index")
+
+    def _slot(self, account_id) -> int:
+        """Emplacement d'un compte, ou de la vue tous comptes pour None"""
+        if account_id is None:
+            return len(self.creation_days) - 1
+        slot = self.account_index.get_indexer([account_id])[0]
+        if slot < 0:
+            raise ValueError(f"Compte inconnu: {account_id}")
+        return slot
+
+    @staticmethod
+    def _to_days(dates) -> np.ndarray:
+        """Convertit un tableau de dates en jours (datetime64[D]), sans passer par pandas s'il est déjà en datetime64"""
+        days = np.atleast_1d(dates)
+        if days.dtype.kind != 'M':
+            days = pd.to_datetime(days).to_numpy()
+        return days.astype('datetime64[D]')
+
+    @profiled()
+    def balances_at(self, dates, account_id: int = None):
+        """
+        Calcule le solde de fin de journée d'un compte à chacune des dates données.
+
+        Args:
+            dates: Tableau de dates (datetime, chaînes ISO, datetime64...), dans un ordre quelconque
+            account_id (int, optional): ID du compte, ou None pour la vue tous comptes
+
+        Returns:
+            np.ndarray: Solde à chaque date, NaN avant la création du compte ; en centimes en mode
+                        virgule fixe (pd.arrays.IntegerArray Int64, <NA> avant la création du compte)
+        """
+        slot = self._slot(account_id)
+        days = self._to_days(dates)
+        balances = self.initial_balances[slot] + self._cumulative[slot][np.searchsorted(self._days[slot], days, side='right')]
+        # NaT (aucun compte) n'est jamais atteint : la comparaison est fausse et le solde indéfini
+        created = days >= self.creation_days[slot]
+
+        if self.fixed_point:
+            return pd.arrays.IntegerArray(balances, ~created)
+        return np.where(created, balances, np.nan)
+
+    def balance_at(self, date, account_id: int = None):
+        """
+        Calcule le solde de fin de journée d'un compte à une date.
+
+        Args:
+            date: Date (datetime, chaîne ISO, datetime64...)
+            account_id (int, optional): ID du compte, ou None pour la vue tous comptes
+
+        Returns:
+            Solde (float, NaN avant la création du compte ; centimes int64 ou pd.NA en mode virgule fixe)
+        """
+        return self.balances_at([pd.Timestamp(date).to_datetime64()], account_id)[0]
+
+    @profiled()
+    def net_flows(self, start_dates, end_dates, account_id: int = None) -> np.ndarray:
+        """
+        Calcule le flux net d'un compte entre des paires de dates (jours de début et de fin inclus).
+
+        Args:
+            start_dates: Tableau des dates de début
+            end_dates: Tableau des dates de fin, de même longueur
+            account_id (int, optional): ID du compte, ou None pour la vue tous comptes
+
+        Returns:
+            np.ndarray: Somme des montants signés de chaque intervalle (0 si la fin précède le début),
+                        en centimes int64 en mode virgule fixe
+        """
+        slot = self._slot(account_id)
+        start_days = self._to_days(start_dates)
+        end_days = self._to_days(end_dates)
+        if len(start_days) != len(end_days):
+            raise ValueError("Les tableaux de dates de début et de fin doivent avoir la même longueur")
+
+        first = np.searchsorted(self._days[slot], start_days, side='left')
+        last = np.maximum(np.searchsorted(self._days[slot], end_days, side='right'), first)
+        return self._cumulative[slot][last] - self._cumulative[slot][first]
+
+    def net_flow(self, start_date, end_date, account_id: int = None):
+        """
+        Calcule le flux net d'un compte entre deux dates (incluses).
+
+        Args:
+            start_date: Date de début
+            end_date: Date de fin
+            account_id (int, optional): ID du compte, ou None pour la vue tous comptes
+
+        Returns:
+            Somme des montants signés de l'intervalle (float, ou centimes int64 en mode virgule fixe)
+        """
+        return self.net_flows([pd.Timestamp(start_date).to_datetime64()], [pd.Timestamp(end_date).to_datetime64()],
+                              account_id)[0].item()
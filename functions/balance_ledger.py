@@ -0,0 +1,195 @@
+import pandas as pd
+from datetime import datetime
+import numpy as np
+
+from logging import debug
+from functions.balance_calculator import build_period_grid, assign_periods, signed_amounts, sum_by_index, transaction_columns, to_cents
+
+class BalanceLedger:
+    """
+    Grand livre incrémental des soldes mensuels d'un compte.
+
+    Conserve le flux net de chaque période et les soldes cumulés. L'ajout, la modification ou
+    la suppression d'une transaction ne corrige que sa période et décale les soldes des périodes
+    suivantes, sans relire les autres transactions. En mode virgule fixe, flux et soldes sont
+    tenus en centimes int64.
+    """
+
+    def __init__(self,
+                 account_creation_date: datetime,
+                 initial_balance: float,
+                 month_mode: str,
+                 financial_month_day: int,
+                 end_date: datetime,
+                 account_id: int = None,
+                 fixed_point: bool = False):
+        """
+        Initialise un grand livre vide.
+
+        Args:
+            account_creation_date (datetime): Date de création du compte
+            initial_balance (float): Solde initial
+            month_mode (str): Mode de mois ('calendar' ou 'financial')
+            financial_month_day (int): Jour du début du mois financier
+            end_date (datetime): Date de fin pour les calculs
+            account_id (int, optional): ID du compte suivi, ou None pour tous les comptes
+            fixed_point (bool): Tenir les montants et les soldes en centimes int64
+        """
+        if isinstance(account_creation_date, str):
+            account_creation_date = datetime.fromisoformat(account_creation_date)
+        if isinstance(end_date, str):
+            end_date = datetime.fromisoformat(end_date)
+
+        self.account_id = account_id
+        self.fixed_point = fixed_point
+        self.initial_balance = to_cents(initial_balance) if fixed_point else initial_balance
+        self.period_starts, self.period_ends, self.month_keys = build_period_grid(
+            account_creation_date, month_mode, financial_month_day, end_date
+        )
+        dtype = np.int64 if fixed_point else float
+        self.net_flows = np.zeros(len(self.month_keys), dtype=dtype)
+        self.balances = np.full(len(self.month_keys), self.initial_balance, dtype=dtype)
+
+        # Contribution de chaque transaction : ID -> (indice de période, montant signé)
+        self._entries = {}
+
+    @classmethod
+    def from_dataframe(cls,
+                       transactions_df: pd.DataFrame,
+                       account_creation_date: datetime,
+                       initial_balance: float,
+                       month_mode: str,
+                       financial_month_day: int,
+                       end_date: datetime,
+                       account_id: int = None,
+                       fixed_point: bool = False) -> "BalanceLedger":
+        """
+        Construit le grand livre à partir d'un DataFrame de transactions en un seul passage.
+
+        Les transactions sont identifiées par la colonne 'Id' si elle existe, sinon par l'index
+        du DataFrame (ou par les identifiants d'un TransactionStore).
+
+        Args:
+            transactions_df (pd.DataFrame): DataFrame des transactions ('Date', 'Amount', 'Type', ...)
+                                            ou TransactionStore
+            account_creation_date (datetime): Date de création du compte
+            initial_balance (float): Solde initial
+            month_mode (str): Mode de mois ('calendar' ou 'financial')
+            financial_month_day (int): Jour du début du mois financier
+            end_date (datetime): Date de fin pour les calculs
+            account_id (int, optional): ID du compte suivi, ou None pour tous les comptes
+            fixed_point (bool): Tenir les montants et les soldes en centimes int64
+
+        Returns:
+            BalanceLedger: Grand livre initialisé
+        """
+        ledger = cls(account_creation_date, initial_balance, month_mode, financial_month_day, end_date, account_id, fixed_point)
+
+        dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions_df, fixed_point)
+        signed = signed_amounts(amounts, types, account_ids, to_account_ids, account_id)
+        period_index = assign_periods(dates, ledger.period_starts, ledger.period_ends)
+
+        if not isinstance(transactions_df, pd.DataFrame):
+            transaction_ids = transactions_df.ids
+        elif 'Id' in transactions_df.columns:
+            transaction_ids = transactions_df['Id']
+        else:
+            transaction_ids = transactions_df.index
+        ledger._entries = dict(zip(transaction_ids.tolist(), zip(period_index.tolist(), signed.tolist())))
+        if len(ledger._entries) != len(transactions_df):
+            raise ValueError("Les identifiants de transaction doivent être uniques")
+
+        ledger.net_flows = sum_by_index(period_index, signed, len(ledger.month_keys))
+        ledger.balances = ledger.initial_balance + np.cumsum(ledger.net_flows)
+
+        debug("BalanceLedger construit avec %s transactions sur %s mois", len(ledger._entries), len(ledger.month_keys), module="balance_ledger")
+
+        return ledger
+
+    def _locate(self, date, amount: float, type: str, account_id: int = None, to_account_id: int = None) -> tuple:
+        """Calcule la période et le montant signé d'une transaction selon les règles du calculateur"""
+        period_index = assign_periods(pd.to_datetime([date]).to_numpy(), self.period_starts, self.period_ends)
+        signed_amount = signed_amounts(
+            to_cents([amount]) if self.fixed_point else np.array([amount], dtype=float),
+            np.array([type], dtype=object),
+            np.array([np.nan if account_id is None else account_id], dtype=float),
+            np.array([np.nan if to_account_id is None else to_account_id], dtype=float),
+            self.account_id
+        )
+        return (int(period_index[0]), signed_amount[0].item())
+
+    def _apply(self, period_index: int, signed_amount) -> None:
+        """Reporte un montant signé sur une période et décale les soldes des périodes suivantes"""
+        if period_index < 0 or signed_amount == 0:
+            return
+        self.net_flows[period_index] += signed_amount
+        self.balances[period_index:] += signed_amount
+
+    def add_transaction(self, transaction_id, date, amount: float, type: str,
+                        account_id: int = None, to_account_id: int = None) -> None:
+        """
+        Ajoute une transaction au grand livre.
+
+        Args:
+            transaction_id: Identifiant unique de la transaction
+            date: Date de la transaction
+            amount (float): Montant
+            type (str): 'income', 'expense' ou 'transfer'
+            account_id (int, optional): Compte source
+            to_account_id (int, optional): Compte destination (transferts)
+        """
+        if transaction_id in self._entries:
+            raise ValueError(f"La transaction {transaction_id} existe déjà dans le grand livre")
+
+        period_index, signed_amount = self._locate(date, amount, type, account_id, to_account_id)
+        self._entries[transaction_id] = (period_index, signed_amount)
+        self._apply(period_index, signed_amount)
+
+    def update_transaction(self, transaction_id, date, amount: float, type: str,
+                           account_id: int = None, to_account_id: int = None) -> None:
+        """
+        Remplace une transaction existante par sa nouvelle version.
+
+        Args:
+            transaction_id: Identifiant de la transaction à modifier
+            date: Nouvelle date
+            amount (float): Nouveau montant
+            type (str): Nouveau type
+            account_id (int, optional): Nouveau compte source
+            to_account_id (int, optional): Nouveau compte destination
+        """
+        if transaction_id not in self._entries:
+            raise ValueError(f"La transaction {transaction_id} est absente du grand livre")
+
+        old_period_index, old_signed_amount = self._entries[transaction_id]
+        period_index, signed_amount = self._locate(date, amount, type, account_id, to_account_id)
+
+        if old_period_index == period_index:
+            self._apply(period_index, signed_amount - old_signed_amount)
+        else:
+            self._apply(old_period_index, -old_signed_amount)
+            self._apply(period_index, signed_amount)
+
+        self._entries[transaction_id] = (period_index, signed_amount)
+
+    def delete_transaction(self, transaction_id) -> None:
+        """
+        Retire une transaction du grand livre.
+
+        Args:
+            transaction_id: Identifiant de la transaction à supprimer
+        """
+        if transaction_id not in self._entries:
+            raise ValueError(f"La transaction {transaction_id} est absente du grand livre")
+
+        period_index, signed_amount = self._entries.pop(transaction_id)
+        self._apply(period_index, -signed_amount)
+
+    def to_series(self) -> pd.Series:
+        """
+        Retourne les soldes mensuels au même format que `calculate_monthly_balances`.
+
+        Returns:
+            pd.Series: Soldes indexés par mois ('YYYY-MM'), en centimes en mode virgule fixe
+        """
+        return pd.Series(self.balances.copy(), index=self.month_keys)
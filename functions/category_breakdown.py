@@ -0,0 +1,343 @@
+import bisect
+import hashlib
+import numpy as np
+import pandas as pd
+
+from logging import debug
+from functions.balance_calculator import (TRANSACTION_TYPES, build_period_grid, assign_periods, type_masks,
+                                          transaction_columns, sum_by_index)
+from cache import BalanceCache, category_pivot_cache
+from profiling import profiled
+
+# Libellés des transactions sans catégorie et du regroupement des petites catégories (comme l'interface)
+UNCATEGORIZED = "Non catégorisé"
+OTHER_CATEGORY = "Autres"
+
+# Colonnes d'un DataFrame de transactions prises en compte dans la version des données
+_VERSION_COLUMNS = ['Date', 'Amount', 'Type', 'AccountId', 'ToAccountId', 'Category']
+
+class CategoryPivot:
+    """
+    Totaux par type, catégorie et période des transactions d'un compte (ou de tous les comptes).
+
+    Les totaux sont rangés dans un tableau (type, catégorie, période), accompagné de ses sommes
+    cumulées le long des périodes : le total d'une catégorie sur une plage de mois s'obtient par
+    une différence, sans repasser sur les transactions. Changer de période dans la page
+    Statistiques ne coûte donc qu'une lecture du tableau.
+    """
+
+    def __init__(self, totals: np.ndarray, counts: np.ndarray, categories: list, month_keys: list,
+                 fixed_point: bool = False):
+        """
+        Args:
+            totals (np.ndarray): Montants de forme (types, catégories, périodes), float ou centimes int64
+            counts (np.ndarray): Nombres de transactions, de même forme
+            categories (list): Libellés des catégories (deuxième axe)
+            month_keys (list): Clés 'YYYY-MM' des périodes, triées (troisième axe)
+            fixed_point (bool): Les montants sont des centimes int64
+        """
+        self.totals = totals
+        self.counts = counts
+        self.categories = categories
+        self.month_keys = month_keys
+        self.fixed_point = fixed_point
+
+        leading_zeros = np.zeros(totals.shape[:2] + (1,), dtype=totals.dtype)
+        self._cumulative_totals = np.concatenate([leading_zeros, np.cumsum(totals, axis=2)], axis=2)
+        self._cumulative_counts = np.concatenate([leading_zeros.astype(np.int64), np.cumsum(counts, axis=2)], axis=2)
+
+    @staticmethod
+    def _type_code(transaction_type: str) -> int:
+        if transaction_type not in TRANSACTION_TYPES:
+            raise ValueError(f"Type de transaction inconnu: {transaction_type}")
+        return TRANSACTION_TYPES.index(transaction_type)
+
+    def _period_range(self, start_key: str = None, end_key: str = None) -> tuple:
+        """Indices [début, fin[ des périodes comprises entre deux clés 'YYYY-MM' incluses"""
+        first = 0 if start_key is None else bisect.bisect_left(self.month_keys, start_key)
+        last = len(self.month_keys) if end_key is None else bisect.bisect_right(self.month_keys, end_key)
+        return first, max(first, last)
+
+    def _category_index(self, label: str) -> int:
+        """Indice d'une catégorie d'après son libellé, None si elle n'existe pas"""
+        return self.categories.index(label) if label in self.categories else None
+
+    def category_totals(self, transaction_type: str = 'expense', start_key: str = None, end_key: str = None) -> tuple:
+        """
+        Totaux de chaque catégorie sur une plage de périodes.
+
+        Args:
+            transaction_type (str): 'income', 'expense' ou 'transfer'
+            start_key (str, optional): Première période incluse ('YYYY-MM'), la première disponible par défaut
+            end_key (str, optional): Dernière période incluse ('YYYY-MM'), la dernière disponible par défaut
+
+        Returns:
+            tuple: (montants, nombres de transactions), un élément par catégorie
+        """
+        code = self._type_code(transaction_type)
+        first, last = self._period_range(start_key, end_key)
+        amounts = self._cumulative_totals[code, :, last] - self._cumulative_totals[code, :, first]
+        counts = self._cumulative_counts[code, :, last] - self._cumulative_counts[code, :, first]
+        return amounts, counts
+
+    def breakdown(self, transaction_type: str = 'expense', start_key: str = None, end_key: str = None,
+                  top_n: int = None, other_label: str = OTHER_CATEGORY) -> pd.DataFrame:
+        """
+        Répartition par catégorie sur une plage de périodes, de la plus grosse à la plus petite.
+
+        Args:
+            transaction_type (str): 'income', 'expense' ou 'transfer'
+            start_key (str, optional): Première période incluse ('YYYY-MM')
+            end_key (str, optional): Dernière période incluse ('YYYY-MM')
+            top_n (int, optional): Nombre de catégories détaillées ; les suivantes sont regroupées
+                                   dans une ligne `other_label`
+            other_label (str): Libellé du regroupement ; une catégorie qui porte déjà ce libellé
+                               y est fusionnée plutôt que détaillée
+
+        Returns:
+            pd.DataFrame: Colonnes 'Category', 'Amount', 'Count' et 'Share' (part du total, entre 0 et 1) ;
+                          les catégories sans transaction sur la plage sont omises
+        """
+        amounts, counts = self.category_totals(transaction_type, start_key, end_key)
+        order, rest = _rank_categories(amounts, counts, top_n, self._category_index(other_label))
+
+        labels = [self.categories[i] for i in order]
+        rows_amounts = amounts[order].tolist()
+        rows_counts = counts[order].tolist()
+        if len(rest):
+            labels.append(other_label)
+            rows_amounts.append(amounts[rest].sum().item())
+            rows_counts.append(counts[rest].sum().item())
+
+        breakdown = pd.DataFrame({
+            'Category': labels,
+            'Amount': np.array(rows_amounts, dtype=amounts.dtype),
+            'Count': np.array(rows_counts, dtype=np.int64)
+        })
+        total = breakdown['Amount'].sum()
+        breakdown['Share'] = breakdown['Amount'] / total if total else 0.0
+
+        return breakdown
+
+    def monthly(self, transaction_type: str = 'expense', start_key: str = None, end_key: str = None,
+                top_n: int = None, other_label: str = OTHER_CATEGORY) -> pd.DataFrame:
+        """
+        Montants par période et par catégorie (une colonne par catégorie, pour les graphiques empilés).
+
+        Les catégories détaillées sont les `top_n` plus grosses sur toute la plage, les mêmes pour chaque période.
+
+        Args:
+            transaction_type (str): 'income', 'expense' ou 'transfer'
+            start_key (str, optional): Première période incluse ('YYYY-MM')
+            end_key (str, optional): Dernière période incluse ('YYYY-MM')
+            top_n (int, optional): Nombre de catégories détaillées, les autres étant regroupées
+            other_label (str): Libellé du regroupement ; une catégorie qui porte déjà ce libellé
+                               y est fusionnée plutôt que détaillée
+
+        Returns:
+            pd.DataFrame: Index des clés 'YYYY-MM', une colonne par catégorie
+        """
+        amounts, counts = self.category_totals(transaction_type, start_key, end_key)
+        order, rest = _rank_categories(amounts, counts, top_n, self._category_index(other_label))
+        first, last = self._period_range(start_key, end_key)
+        per_period = self.totals[self._type_code(transaction_type), :, first:last]
+
+        columns = {self.categories[i]: per_period[i] for i in order}
+        if len(rest):
+            columns[other_label] = per_period[rest].sum(axis=0)
+
+        return pd.DataFrame(columns, index=pd.Index(self.month_keys[first:last], name='YearMonth'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convertit la ventilation en table longue (une ligne par type, catégorie et période non vides).
+
+        Returns:
+            pd.DataFrame: Colonnes 'YearMonth', 'Type', 'Category', 'Amount' et 'Count'
+        """
+        type_index, category_index, period_index = np.nonzero(self.counts)
+        return pd.DataFrame({
+            'YearMonth': np.array(self.month_keys, dtype=object)[period_index],
+            'Type': np.array(TRANSACTION_TYPES, dtype=object)[type_index],
+            'Category': np.array(self.categories, dtype=object)[category_index],
+            'Amount': self.totals[type_index, category_index, period_index],
+            'Count': self.counts[type_index, category_index, period_index]
+        })
+
+def _rank_categories(amounts: np.ndarray, counts: np.ndarray, top_n: int = None, grouped: int = None) -> tuple:
+    """
+    Classe les catégories ayant des transactions par montant décroissant.
+
+    Args:
+        grouped (int, optional): Catégorie portant le libellé du regroupement : s'il y a un regroupement,
+                                 elle en fait partie (sa colonne serait sinon écrasée par celui-ci)
+
+    Returns:
+        tuple: (indices des catégories détaillées, indices des catégories regroupées)
+    """
+    if top_n is not None and top_n < 0:
+        raise ValueError("Le nombre de catégories détaillées ne peut pas être négatif")
+
+    present = np.flatnonzero(counts > 0)
+    # Tri stable : à montant égal, les catégories restent dans leur ordre d'apparition
+    ranked = present[np.argsort(-amounts[present], kind='stable')]
+    if top_n is None or len(ranked) <= top_n:
+        return ranked, ranked[:0]
+    if grouped is not None and grouped in ranked:
+        ranked = np.append(ranked[ranked != grouped], grouped)
+        if len(ranked) == top_n + 1:
+            # Seule la catégorie homonyme aurait été regroupée : elle reste une ligne détaillée
+            return ranked, ranked[:0]
+    return ranked[:top_n], ranked[top_n:]
+
+def transaction_category_codes(transactions) -> tuple:
+    """
+    Retourne le code de catégorie de chaque transaction et les libellés correspondants.
+
+    Les transactions sans catégorie (absente, None ou vide) sont rangées dans UNCATEGORIZED.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions
+
+    Returns:
+        tuple: (codes, libellés)
+    """
+    if isinstance(transactions, pd.DataFrame):
+        if 'Category' in transactions.columns:
+            codes, labels = pd.factorize(transactions['Category'])
+        else:
+            codes, labels = np.full(len(transactions), -1), []
+    else:
+        codes, labels = transactions.category_codes, transactions.categories
+
+    # Le code -1 désigne le dernier élément : le libellé UNCATEGORIZED ajouté en fin de liste
+    index = {}
+    remap = [index.setdefault(label if label else UNCATEGORIZED, len(index)) for label in list(labels) + [None]]
+    return np.asarray(remap, dtype=np.int64)[codes], list(index)
+
+@profiled()
+def compute_category_pivot(transactions,
+                           month_mode: str = 'calendar',
+                           financial_month_day: int = 1,
+                           account_id: int = None,
+                           start_date=None,
+                           end_date=None,
+                           fixed_point: bool = False) -> CategoryPivot:
+    """
+    Calcule les totaux par type, catégorie et période en un seul regroupement sur les transactions.
+
+    Avec account_id, les revenus et dépenses du compte comptent, ainsi que les transferts dont il est
+    la source ou la destination. Les montants sont ceux des transactions, sans signe.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions ('Date', 'Amount', 'Type', 'Category', ...)
+        month_mode (str): 'calendar' ou 'financial'
+        financial_month_day (int): Jour du début du mois financier
+        account_id (int, optional): Compte concerné, ou None pour tous les comptes
+        start_date (datetime, optional): Début de la première période, la date de la première transaction par défaut
+        end_date (datetime, optional): Date comprise dans la dernière période, celle de la dernière transaction par défaut
+        fixed_point (bool): Sommer les montants en centimes int64
+
+    Returns:
+        CategoryPivot: Totaux par type, catégorie et période
+    """
+    dates, amounts, types, account_ids, to_account_ids = transaction_columns(transactions, fixed_point)
+    category_codes, categories = transaction_category_codes(transactions)
+
+    if len(dates) and (start_date is None or end_date is None):
+        start_date = pd.Timestamp(dates.min()) if start_date is None else start_date
+        end_date = pd.Timestamp(dates.max()) if end_date is None else end_date
+    if start_date is None or end_date is None or pd.Timestamp(start_date) > pd.Timestamp(end_date):
+        period_starts = period_ends = np.array([], dtype='datetime64[s]')
+        month_keys = []
+    else:
+        period_starts, period_ends, month_keys = build_period_grid(start_date, month_mode, financial_month_day, end_date)
+
+    amounts = np.asarray(amounts)
+    if amounts.dtype.kind not in 'iu':
+        amounts = np.nan_to_num(amounts.astype(float))
+
+    is_income, is_expense, is_transfer = type_masks(types)
+    type_codes = np.select([is_income, is_expense, is_transfer], [0, 1, 2], -1).astype(np.int64)
+
+    period_index = assign_periods(dates, period_starts, period_ends)
+    valid = (period_index >= 0) & (type_codes >= 0)
+    if account_id is not None:
+        concerned = account_ids == account_id if account_ids is not None else np.zeros(len(dates), dtype=bool)
+        if to_account_ids is not None:
+            concerned |= is_transfer & (to_account_ids == account_id)
+        valid &= concerned
+
+    # Indice à plat (type, catégorie, période) de chaque transaction retenue
+    shape = (len(TRANSACTION_TYPES), len(categories), len(month_keys))
+    flat_index = np.where(valid, (type_codes * shape[1] + category_codes) * shape[2] + period_index, -1)
+    size = shape[0] * shape[1] * shape[2]
+
+    totals = sum_by_index(flat_index, amounts, size).reshape(shape)
+    counts = np.bincount(flat_index[valid], minlength=size).reshape(shape)
+
+    debug("Ventilation par catégorie: %s catégories, %s périodes", shape[1], shape[2], module="category_breakdown")
+
+    return CategoryPivot(totals, counts, categories, month_keys, fixed_point)
+
+def compute_data_version(transactions) -> str:
+    """
+    Calcule une empreinte des transactions (catégories comprises), servant de version des données.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    if not isinstance(transactions, pd.DataFrame):
+        return transactions.checksum(with_categories=True)
+
+    columns = [col for col in _VERSION_COLUMNS if col in transactions.columns]
+    digest = hashlib.blake2b(','.join(columns).encode('utf-8'), digest_size=16)
+    if len(transactions):
+        digest.update(pd.util.hash_pandas_object(transactions[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def get_category_pivot(transactions,
+                       month_mode: str = 'calendar',
+                       financial_month_day: int = 1,
+                       account_id: int = None,
+                       user_id=None,
+                       data_version: str = None,
+                       fixed_point: bool = False) -> CategoryPivot:
+    """
+    Retourne la ventilation par catégorie de toutes les périodes couvertes par les transactions,
+    depuis le cache tant que les données du compte n'ont pas changé.
+
+    Le cache est indexé par utilisateur, compte, mode de mois et version des données ; il est aussi
+    vidé par `cache.invalidate_account`. Sans `data_version`, chaque appel, même servi par le cache,
+    calcule l'empreinte d'un DataFrame en O(n) (celle d'un TransactionStore est mémorisée) : fournir
+    une version peu coûteuse (date de dernière synchronisation, date de modification du fichier
+    utilisateur...) rend une consultation du cache O(1).
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions de l'utilisateur
+        month_mode (str): 'calendar' ou 'financial'
+        financial_month_day (int): Jour du début du mois financier
+        account_id (int, optional): Compte concerné, ou None pour tous les comptes
+        user_id (optional): Identifiant de l'utilisateur
+        data_version (str, optional): Version des données, leur empreinte par défaut (voir `compute_data_version`,
+                                      en O(n) pour un DataFrame)
+        fixed_point (bool): Sommer les montants en centimes int64
+
+    Returns:
+        CategoryPivot: Ventilation à interroger par plage de périodes (`breakdown`, `monthly`)
+    """
+    if data_version is None:
+        data_version = compute_data_version(transactions)
+
+    # La version des données et le mode de calcul tiennent la place du mois dans la clé du cache
+    key = BalanceCache.make_key(('categories', data_version, fixed_point), user_id, account_id,
+                                month_mode, financial_month_day)
+    pivot = category_pivot_cache.get(key)
+    if pivot is None:
+        pivot = compute_category_pivot(transactions, month_mode, financial_month_day, account_id,
+                                       fixed_point=fixed_point)
+        category_pivot_cache.set(key, pivot)
+    return pivot
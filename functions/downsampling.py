@@ -0,0 +1,104 @@
+import numpy as np
+
+# Méthodes de réduction disponibles et nombre minimal de points qu'elles retournent
+DOWNSAMPLING_METHODS = {'lttb': 3, 'minmax': 4}
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Choisit au plus `max_points` points d'une série par l'algorithme Largest-Triangle-Three-Buckets.
+
+    Le premier et le dernier point sont conservés ; entre les deux, chaque tranche garde le point
+    formant le plus grand triangle avec le point retenu précédemment et la moyenne de la tranche
+    suivante, ce qui préserve la forme visuelle de la courbe (pics et creux marqués).
+
+    Args:
+        x (np.ndarray): Abscisses croissantes
+        y (np.ndarray): Ordonnées
+        max_points (int): Nombre maximal de points retournés (au moins 3)
+
+    Returns:
+        np.ndarray: Indices croissants des points retenus
+    """
+    n = len(y)
+    if max_points < DOWNSAMPLING_METHODS['lttb']:
+        raise ValueError("La réduction LTTB nécessite au moins 3 points")
+    if n <= max_points:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bornes des tranches intérieures : la tranche i couvre [edges[i], edges[i + 1][
+    edges = (np.floor(np.arange(max_points - 1) * ((n - 2) / (max_points - 2))) + 1).astype(np.int64)
+    edges[-1] = n - 1
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Moyenne de la tranche suivante (le dernier point pour la dernière tranche)
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x = x[end:next_end].mean()
+        average_y = y[end:next_end].mean()
+
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Choisit au plus `max_points` points d'une série en gardant le minimum et le maximum de chaque tranche.
+
+    Le premier et le dernier point sont conservés ; les extrêmes de la série (solde le plus haut
+    et le plus bas) figurent toujours parmi les points retenus.
+
+    Args:
+        y (np.ndarray): Ordonnées
+        max_points (int): Nombre maximal de points retournés (au moins 4)
+
+    Returns:
+        np.ndarray: Indices croissants des points retenus
+    """
+    n = len(y)
+    if max_points < DOWNSAMPLING_METHODS['minmax']:
+        raise ValueError("La réduction min/max nécessite au moins 4 points")
+    if n <= max_points:
+        return np.arange(n)
+
+    y = np.asarray(y)
+    bucket_count = (max_points - 2) // 2
+    edges = np.linspace(1, n - 1, bucket_count + 1).astype(np.int64)
+
+    selected = [0]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        low = start + int(np.argmin(y[start:end]))
+        high = start + int(np.argmax(y[start:end]))
+        selected.extend(sorted({low, high}))
+    selected.append(n - 1)
+
+    return np.asarray(selected, dtype=np.int64)
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: int, method: str = 'lttb') -> np.ndarray:
+    """
+    Choisit au plus `max_points` points d'une série selon la méthode demandée.
+
+    Args:
+        x (np.ndarray): Abscisses croissantes
+        y (np.ndarray): Ordonnées
+        max_points (int): Nombre maximal de points retournés
+        method (str): 'lttb' (forme de la courbe) ou 'minmax' (extrêmes de chaque tranche)
+
+    Returns:
+        np.ndarray: Indices croissants des points retenus
+    """
+    if method == 'lttb':
+        return lttb_indices(x, y, max_points)
+    if method == 'minmax':
+        return minmax_indices(y, max_points)
+    raise ValueError(f"Méthode de réduction inconnue: {method}")
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from logging import debug, warning
+from functions.balance_calculator import TRANSACTION_TYPES
+from functions.transaction_store import TransactionStore, MISSING_ID, id_or_missing
+from utils_date import local_days
+
+# Pas des fréquences récurrentes, en jours ou en mois (voir RecurringFrequency côté application)
+DAY_STEP_FREQUENCIES = {'daily': 1, 'weekly': 7, 'biweekly': 14}
+MONTH_STEP_FREQUENCIES = {'monthly': 1, 'quarterly': 3, 'yearly': 12}
+
+# Borne utilisée pour les règles sans date de fin
+_NO_END_DATE = np.datetime64('9999-12-31', 'D')
+
+def _parse_days(values) -> np.ndarray:
+    """Convertit des dates ISO (ou None) en jours locaux datetime64[D], None devenant NaT"""
+    return local_days(values)
+
+def _month_step_dates(anchor_months: np.ndarray, anchor_days: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Calcule les dates situées `offsets` mois après l'ancrage, le jour étant ramené à la fin des mois courts.
+
+    Le jour d'ancrage est conservé d'une échéance à l'autre : une règle du 31 janvier tombe le
+    28 (ou 29) février puis le 31 mars.
+    """
+    months = (anchor_months + offsets).astype('datetime64[M]')
+    month_starts = months.astype('datetime64[D]')
+    month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+    return month_starts + (np.minimum(anchor_days, month_lengths) - 1)
+
+def _occurrence_offsets(first_offsets: np.ndarray, counts: np.ndarray) -> tuple:
+    """
+    Déplie des plages d'échéances [first, first + count) en un seul tableau, sans boucle par règle.
+
+    Returns:
+        tuple: (indice de la règle de chaque échéance, numéro de l'échéance dans sa règle)
+    """
+    rule_index = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    offsets = first_offsets[rule_index] + (np.arange(counts.sum()) - starts[rule_index])
+    return (rule_index, offsets)
+
+def expand_recurring_transactions(recurring_transactions: list, horizon_start, horizon_end) -> TransactionStore:
+    """
+    Déplie les transactions récurrentes d'un utilisateur en échéances datées sur un horizon.
+
+    Les échéances suivent le calendrier de chaque règle à partir de sa date de début (startDate),
+    en ne gardant que celles comprises entre le début de l'horizon (ou nextExecution s'il est
+    postérieur : les échéances précédentes ont déjà été exécutées) et la fin de l'horizon (ou
+    endDate si elle est antérieure). Toutes les règles d'un même type de pas sont dépliées
+    ensemble, sans boucle par jour ni par règle.
+
+    Args:
+        recurring_transactions (list): Règles au format JSON de l'application (`recurringTransactions`)
+        horizon_start: Première date de l'horizon (incluse)
+        horizon_end: Dernière date de l'horizon (incluse)
+
+    Returns:
+        TransactionStore: Échéances triées par date, sans identifiant de transaction (MISSING_ID)
+    """
+    horizon_start = np.datetime64(horizon_start, 'D')
+    horizon_end = np.datetime64(horizon_end, 'D')
+
+    rules = [rule for rule in recurring_transactions
+             if rule.get('startDate') and (rule.get('frequency') in DAY_STEP_FREQUENCIES or rule.get('frequency') in MONTH_STEP_FREQUENCIES)]
+    if len(rules) != len(recurring_transactions):
+        warning("%s transactions récurrentes ignorées (fréquence inconnue ou date de début absente)",
+                len(recurring_transactions) - len(rules), module="recurring_expansion")
+
+    type_codes = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+    frequencies = np.array([rule['frequency'] for rule in rules], dtype=object)
+    anchors = _parse_days([rule.get('startDate') for rule in rules])
+    next_executions = _parse_days([rule.get('nextExecution') for rule in rules])
+    end_dates = _parse_days([rule.get('endDate') for rule in rules])
+
+    # Fenêtre de chaque règle : [max(horizon, nextExecution, startDate), min(horizon, endDate)]
+    firsts = np.maximum(np.maximum(anchors, horizon_start), np.where(np.isnat(next_executions), anchors, next_executions))
+    lasts = np.minimum(np.where(np.isnat(end_dates), _NO_END_DATE, end_dates), horizon_end)
+
+    rule_parts = []
+    date_parts = []
+
+    # Pas en jours : l'échéance k tombe k × pas jours après l'ancrage
+    day_steps = np.array([DAY_STEP_FREQUENCIES.get(frequency, 0) for frequency in frequencies], dtype=np.int64)
+    day_rules = np.flatnonzero(day_steps)
+    if len(day_rules):
+        steps = day_steps[day_rules]
+        first_gaps = (firsts[day_rules] - anchors[day_rules]).astype(np.int64)
+        last_gaps = (lasts[day_rules] - anchors[day_rules]).astype(np.int64)
+        first_offsets = -(-first_gaps // steps)
+        counts = np.maximum(last_gaps // steps - first_offsets + 1, 0)
+
+        rule_index, offsets = _occurrence_offsets(first_offsets, counts)
+        rule_parts.append(day_rules[rule_index])
+        date_parts.append(anchors[day_rules][rule_index] + offsets * steps[rule_index])
+
+    # Pas en mois : l'échéance k tombe k × pas mois après l'ancrage, au même jour si le mois le permet
+    month_steps = np.array([MONTH_STEP_FREQUENCIES.get(frequency, 0) for frequency in frequencies], dtype=np.int64)
+    month_rules = np.flatnonzero(month_steps)
+    if len(month_rules):
+        steps = month_steps[month_rules]
+        rule_anchors = anchors[month_rules]
+        anchor_months = rule_anchors.astype('datetime64[M]').astype(np.int64)
+        anchor_days = (rule_anchors - rule_anchors.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+
+        # Estimation au mois près, corrigée d'une échéance si le jour tombe hors de la fenêtre
+        first_offsets = np.maximum(-(-(firsts[month_rules].astype('datetime64[M]').astype(np.int64) - anchor_months) // steps), 0)
+        first_offsets += _month_step_dates(anchor_months, anchor_days, first_offsets * steps) < firsts[month_rules]
+        last_offsets = (lasts[month_rules].astype('datetime64[M]').astype(np.int64) - anchor_months) // steps
+        last_offsets -= _month_step_dates(anchor_months, anchor_days, last_offsets * steps) > lasts[month_rules]
+        counts = np.maximum(last_offsets - first_offsets + 1, 0)
+
+        rule_index, offsets = _occurrence_offsets(first_offsets, counts)
+        rule_parts.append(month_rules[rule_index])
+        date_parts.append(_month_step_dates(anchor_months[rule_index], anchor_days[rule_index], offsets * steps[rule_index]))
+
+    occurrence_rules = np.concatenate(rule_parts) if rule_parts else np.array([], dtype=np.int64)
+    occurrence_dates = np.concatenate(date_parts) if date_parts else np.array([], dtype='datetime64[D]')
+    order = np.argsort(occurrence_dates, kind='stable')
+    occurrence_rules = occurrence_rules[order]
+
+    # Attributs des règles, recopiés sur chacune de leurs échéances
+    amounts = np.array([rule.get('amount', 0.0) for rule in rules], dtype=np.float64)
+    types = np.array([type_codes.get(rule.get('type'), -1) for rule in rules], dtype=np.int8)
+    account_ids = np.array([id_or_missing(rule.get('accountId')) for rule in rules], dtype=np.int32)
+    to_account_ids = np.array([id_or_missing(rule.get('toAccountId')) for rule in rules], dtype=np.int32)
+    category_codes, categories = pd.factorize(pd.Series([rule.get('category') for rule in rules], dtype=object))
+
+    occurrences = TransactionStore(
+        np.full(len(occurrence_rules), MISSING_ID, dtype=np.int64),
+        occurrence_dates[order].astype(np.int64),
+        amounts[occurrence_rules],
+        types[occurrence_rules],
+        account_ids[occurrence_rules],
+        to_account_ids[occurrence_rules],
+        category_codes.astype(np.int32)[occurrence_rules],
+        list(categories)
+    )
+
+    debug("%s transactions récurrentes dépliées en %s échéances", len(rules), len(occurrences), module="recurring_expansion")
+
+    return occurrences
+
+def merge_with_transactions(transactions, occurrences: TransactionStore):
+    """
+    Ajoute des échéances récurrentes aux transactions réelles pour le calculateur de soldes.
+
+    Args:
+        transactions (pd.DataFrame | TransactionStore): Transactions réelles
+        occurrences (TransactionStore): Échéances produites par `expand_recurring_transactions`
+
+    Returns:
+        Transactions et échéances triées par date, du même type que `transactions`
+    """
+    if isinstance(transactions, TransactionStore):
+        return TransactionStore.concatenate([transactions, occurrences])
+
+    # Dates encore au format ISO (texte) : converties en jours locaux pour être triées avec les échéances
+    if not pd.api.types.is_datetime64_any_dtype(transactions['Date']):
+        transactions = transactions.assign(Date=pd.to_datetime(local_days(transactions['Date'])))
+
+    occurrences_df = occurrences.to_dataframe()[['Date', 'Amount', 'Type', 'AccountId', 'ToAccountId', 'Category']]
+    occurrences_df = occurrences_df[[col for col in occurrences_df.columns if col in transactions.columns]]
+    merged = pd.concat([transactions, occurrences_df], ignore_index=True)
+
+    return merged.sort_values('Date', kind='stable', ignore_index=True)
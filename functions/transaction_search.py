@@ -0,0 +1,474 @@
+import re
+import bisect
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from logging import debug
+from functions.balance_calculator import TRANSACTION_TYPES
+from functions.transaction_store import MISSING_ID, id_or_missing
+from functions.user_data_reader import DEFAULT_CHUNK_SIZE, iter_transaction_chunks
+from profiling import profiled
+from utils_date import local_days
+
+# Champs interrogeables, comme le sélecteur « Rechercher par » de TransactionSearch
+SEARCH_FIELDS = ('all', 'description', 'category')
+
+# Poids d'un terme trouvé dans la description ou dans la catégorie, et d'un mot ne faisant que commencer par le terme
+DESCRIPTION_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.5
+
+_INITIAL_CAPACITY = 1024
+_TOKEN = re.compile(r'[a-z0-9]+')
+# Ligatures que la décomposition Unicode ne sépare pas (« œuvre », « ex æquo »)
+_LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss'})
+
+def normalize_text(text) -> str:
+    """Met un texte en minuscules et retire ses accents ('Électricité' -> 'electricite')"""
+    if text is None:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text).translate(_LIGATURES).lower())
+    return decomposed.encode('ascii', 'ignore').decode('ascii')
+
+def tokenize(text) -> list:
+    """Découpe un texte normalisé en mots (lettres et chiffres)"""
+    return _TOKEN.findall(normalize_text(text))
+
+class TransactionSearchIndex:
+    """
+    Index inversé des transactions pour la recherche et l'autocomplétion.
+
+    Les descriptions et catégories distinctes (libellés) sont découpées en mots normalisés une seule
+    fois ; l'index associe chaque mot aux libellés qui le contiennent, et chaque transaction garde le
+    code de sa description et de sa catégorie. Une requête ne parcourt donc que les mots du
+    vocabulaire (trié, pour la recherche par préfixe) puis un tableau de codes par transaction.
+
+    Les colonnes filtrables (montant, type, comptes, jour) sont tenues dans des tableaux NumPy qui
+    grandissent par doublement. Une suppression ne fait que marquer la ligne ; les lignes supprimées
+    sont retirées lorsqu'elles deviennent majoritaires.
+    """
+
+    def __init__(self):
+        """Initialise un index vide"""
+        self._size = 0
+        self._deleted = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._days = np.empty(0, dtype=np.int64)
+        self._amounts = np.empty(0, dtype=np.float64)
+        self._type_codes = np.empty(0, dtype=np.int8)
+        self._account_ids = np.empty(0, dtype=np.int32)
+        self._to_account_ids = np.empty(0, dtype=np.int32)
+        self._description_codes = np.empty(0, dtype=np.int32)
+        self._category_codes = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        # Identifiant de transaction -> ligne
+        self._rows = {}
+
+        # Libellés distincts, et nombre de transactions qui les utilisent comme description ou catégorie
+        self._labels = []
+        self._label_index = {}
+        self._description_counts = np.zeros(0, dtype=np.int64)
+        self._category_counts = np.zeros(0, dtype=np.int64)
+        # Mot normalisé -> codes des libellés qui le contiennent, et vocabulaire trié
+        self._token_labels = {}
+        self._vocabulary = []
+
+    @classmethod
+    def from_records(cls, transactions: list) -> "TransactionSearchIndex":
+        """
+        Construit l'index à partir de transactions au format JSON de l'application.
+
+        Args:
+            transactions (list): Transactions (id, date, amount, type, accountId, toAccountId, category, description)
+
+        Returns:
+            TransactionSearchIndex: Index initialisé
+        """
+        index = cls()
+        index.add_records(transactions)
+        return index
+
+    @classmethod
+    def from_user_file(cls, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "TransactionSearchIndex":
+        """
+        Construit l'index des transactions d'un fichier utilisateur data/<hash>.json, lu par morceaux.
+
+        Args:
+            path (str): Chemin du fichier utilisateur
+            chunk_size (int): Nombre de transactions lues à la fois
+
+        Returns:
+            TransactionSearchIndex: Index initialisé
+        """
+        index = cls()
+        for chunk in iter_transaction_chunks(path, chunk_size):
+            index.add_records(chunk)
+        return index
+
+    def __len__(self) -> int:
+        return self._size - self._deleted
+
+    def __contains__(self, transaction_id) -> bool:
+        return transaction_id in self._rows
+
+    def _columns(self) -> tuple:
+        """Noms des tableaux indexés par ligne"""
+        return ('_ids', '_days', '_amounts', '_type_codes', '_account_ids', '_to_account_ids',
+                '_description_codes', '_category_codes', '_alive')
+
+    def _reserve(self, count: int) -> None:
+        """Agrandit les tableaux (par doublement) pour accueillir count lignes de plus"""
+        needed = self._size + count
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, _INITIAL_CAPACITY)
+        while capacity < needed:
+            capacity *= 2
+        for name in self._columns():
+            array = getattr(self, name)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            setattr(self, name, grown)
+
+    def _label_code(self, text) -> int:
+        """Code d'un libellé, découpé en mots et ajouté à l'index à sa première apparition (-1 si vide)"""
+        if text is None or text == '':
+            return -1
+        code = self._label_index.get(text)
+        if code is None:
+            code = self._label_index[text] = len(self._labels)
+            self._labels.append(text)
+            for token in set(tokenize(text)):
+                labels = self._token_labels.get(token)
+                if labels is None:
+                    labels = self._token_labels[token] = []
+                    bisect.insort(self._vocabulary, token)
+                labels.append(code)
+        return code
+
+    def _parse_records(self, transactions: list, replaced=None) -> dict:
+        """
+        Lit et valide les colonnes de transactions, sans modifier l'index.
+
+        Args:
+            transactions (list): Transactions au format JSON de l'application
+            replaced (optional): Identifiant indexé que ces transactions remplacent (voir update)
+
+        Raises:
+            ValueError: Si un identifiant est déjà indexé ou répété, ou si une date manque ou est invalide
+        """
+        ids = np.array([id_or_missing(t.get('id')) for t in transactions], dtype=np.int64)
+        batch_ids = set()
+        for transaction_id in ids.tolist():
+            if transaction_id == MISSING_ID:
+                continue
+            if transaction_id in batch_ids or (transaction_id in self._rows and transaction_id != replaced):
+                raise ValueError(f"La transaction {transaction_id} existe déjà dans l'index")
+            batch_ids.add(transaction_id)
+
+        # Jour local de chaque transaction (une date enregistrée '2025-03-01T23:00:00.000Z' tombe le 02/03)
+        try:
+            days = local_days([t['date'] for t in transactions])
+        except KeyError:
+            days = None
+        if days is None or np.isnat(days).any():
+            raise ValueError("Date manquante ou invalide parmi les transactions à indexer")
+
+        type_codes = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+        return {
+            '_ids': ids,
+            '_days': days.astype(np.int64),
+            '_amounts': np.array([t.get('amount', 0.0) for t in transactions], dtype=float),
+            '_type_codes': np.array([type_codes.get(t.get('type'), -1) for t in transactions], dtype=np.int8),
+            '_account_ids': np.array([id_or_missing(t.get('accountId')) for t in transactions], dtype=np.int64),
+            '_to_account_ids': np.array([id_or_missing(t.get('toAccountId')) for t in transactions], dtype=np.int64),
+            'descriptions': [t.get('description') for t in transactions],
+            'categories': [t.get('category') for t in transactions],
+        }
+
+    def _insert(self, columns: dict) -> None:
+        """Ajoute à l'index des colonnes lues et validées par _parse_records"""
+        count = len(columns['_ids'])
+        first = self._size
+        description_codes = np.array([self._label_code(text) for text in columns['descriptions']], dtype=np.int32)
+        category_codes = np.array([self._label_code(text) for text in columns['categories']], dtype=np.int32)
+
+        new_labels = len(self._labels) - len(self._description_counts)
+        self._description_counts = np.concatenate([self._description_counts, np.zeros(new_labels, dtype=np.int64)])
+        self._category_counts = np.concatenate([self._category_counts, np.zeros(new_labels, dtype=np.int64)])
+        self._description_counts += np.bincount(description_codes[description_codes >= 0], minlength=len(self._labels))
+        self._category_counts += np.bincount(category_codes[category_codes >= 0], minlength=len(self._labels))
+
+        self._reserve(count)
+        rows = slice(first, first + count)
+        for name in ('_ids', '_days', '_amounts', '_type_codes', '_account_ids', '_to_account_ids'):
+            getattr(self, name)[rows] = columns[name]
+        self._description_codes[rows] = description_codes
+        self._category_codes[rows] = category_codes
+        self._alive[rows] = True
+        self._size += count
+        for offset, transaction_id in enumerate(columns['_ids'].tolist()):
+            if transaction_id != MISSING_ID:
+                self._rows[transaction_id] = first + offset
+
+        debug("TransactionSearchIndex: %s transactions ajoutées, %s libellés, %s mots", count,
+              len(self._labels), len(self._vocabulary), module="transaction_search")
+
+    @profiled()
+    def add_records(self, transactions: list) -> None:
+        """
+        Ajoute des transactions à l'index.
+
+        Toutes les transactions sont lues et validées avant que l'index ne soit modifié : en cas
+        d'erreur, aucune n'est ajoutée.
+
+        Args:
+            transactions (list): Transactions au format JSON de l'application
+
+        Raises:
+            ValueError: Si l'identifiant d'une transaction est déjà indexé ou si sa date manque ou est invalide
+        """
+        self._insert(self._parse_records(transactions))
+
+    def add(self, transaction: dict) -> None:
+        """
+        Ajoute une transaction à l'index.
+
+        Args:
+            transaction (dict): Transaction au format JSON de l'application
+        """
+        self.add_records([transaction])
+
+    def remove(self, transaction_id) -> None:
+        """
+        Retire une transaction de l'index.
+
+        Args:
+            transaction_id: Identifiant de la transaction
+
+        Raises:
+            ValueError: Si la transaction n'est pas indexée
+        """
+        row = self._rows.pop(transaction_id, None)
+        if row is None:
+            raise ValueError(f"La transaction {transaction_id} est absente de l'index")
+
+        self._alive[row] = False
+        self._deleted += 1
+        description_code, category_code = int(self._description_codes[row]), int(self._category_codes[row])
+        if description_code >= 0:
+            self._description_counts[description_code] -= 1
+        if category_code >= 0:
+            self._category_counts[category_code] -= 1
+
+        if self._deleted > max(self._size // 2, _INITIAL_CAPACITY):
+            self._compact()
+
+    def update(self, transaction: dict) -> None:
+        """
+        Remplace une transaction indexée par sa nouvelle version.
+
+        Args:
+            transaction (dict): Transaction au format JSON de l'application, avec son id
+
+        Raises:
+            ValueError: Si la transaction n'est pas indexée ou si sa nouvelle version est invalide
+                        (l'index est alors inchangé)
+        """
+        transaction_id = transaction.get('id')
+        if transaction_id not in self._rows:
+            raise ValueError(f"La transaction {transaction_id} est absente de l'index")
+        columns = self._parse_records([transaction], replaced=transaction_id)
+        self.remove(transaction_id)
+        self._insert(columns)
+
+    def _compact(self) -> None:
+        """Retire les lignes supprimées des tableaux (les libellés et le vocabulaire sont conservés)"""
+        kept = np.flatnonzero(self._alive[:self._size])
+        for name in self._columns():
+            setattr(self, name, getattr(self, name)[kept])
+        self._size = len(kept)
+        self._deleted = 0
+        self._rows = {transaction_id: row for row, transaction_id in enumerate(self._ids.tolist())
+                      if transaction_id != MISSING_ID}
+
+    def _matching_tokens(self, term: str, prefix: bool) -> list:
+        """Mots du vocabulaire égaux au terme ou, en recherche par préfixe, commençant par lui"""
+        if not prefix:
+            return [term] if term in self._token_labels else []
+        first = bisect.bisect_left(self._vocabulary, term)
+        # Premier mot qui suit tous ceux commençant par le terme (les mots ne contiennent que [a-z0-9])
+        last = bisect.bisect_left(self._vocabulary, term[:-1] + chr(ord(term[-1]) + 1), first)
+        return self._vocabulary[first:last]
+
+    def _label_scores(self, term: str, prefix: bool) -> np.ndarray:
+        """
+        Score de chaque libellé pour un terme : 1 s'il contient le mot exact, PREFIX_WEIGHT s'il contient
+        seulement un mot qui commence par le terme, 0 sinon. Le dernier élément (0) sert aux codes -1.
+        """
+        scores = np.zeros(len(self._labels) + 1, dtype=np.float32)
+        for token in self._matching_tokens(term, prefix):
+            labels = self._token_labels[token]
+            scores[labels] = np.maximum(scores[labels], 1.0 if token == term else PREFIX_WEIGHT)
+        return scores
+
+    def _term_scores(self, term: str, prefix: bool, field: str, rows: np.ndarray = None) -> np.ndarray:
+        """Score d'un mot de la requête pour chaque ligne (ou pour les lignes données), 0 si absent du champ"""
+        label_scores = self._label_scores(term, prefix)
+        window = slice(0, self._size) if rows is None else rows
+        # Un champ n'est parcouru que si l'un des libellés trouvés y est employé
+        found = label_scores[:-1] > 0
+        in_descriptions = field != 'category' and (found & (self._description_counts > 0)).any()
+        in_categories = field != 'description' and (found & (self._category_counts > 0)).any()
+
+        if in_descriptions and in_categories:
+            return np.maximum((DESCRIPTION_WEIGHT * label_scores)[self._description_codes[window]],
+                              (CATEGORY_WEIGHT * label_scores)[self._category_codes[window]])
+        if in_descriptions:
+            return (DESCRIPTION_WEIGHT * label_scores)[self._description_codes[window]]
+        if in_categories:
+            return (CATEGORY_WEIGHT * label_scores)[self._category_codes[window]]
+        return np.zeros(self._size if rows is None else len(rows), dtype=np.float32)
+
+    def _label_values(self, codes: np.ndarray) -> list:
+        """Libellés correspondant à des codes (None pour -1)"""
+        return [self._labels[code] if code >= 0 else None for code in codes.tolist()]
+
+    @staticmethod
+    def _day(date) -> int:
+        """Jour d'une date, en jours depuis l'époque"""
+        return int(pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64))
+
+    @profiled()
+    def search(self,
+               query: str = '',
+               field: str = 'all',
+               min_amount: float = None,
+               max_amount: float = None,
+               type: str = None,
+               account_id: int = None,
+               start_date=None,
+               end_date=None,
+               limit: int = 50,
+               prefix: bool = True) -> pd.DataFrame:
+        """
+        Recherche des transactions par mots et filtres combinés.
+
+        Une transaction doit contenir chacun des mots de la requête (sans tenir compte des majuscules ni
+        des accents) dans le champ choisi ; le dernier mot peut n'être qu'un début de mot, comme pendant
+        la saisie. Les résultats sont classés par score (mots exacts avant débuts de mots, description
+        avant catégorie), puis du plus récent au plus ancien.
+
+        Args:
+            query (str): Texte recherché (vide : toutes les transactions qui passent les filtres)
+            field (str): 'all', 'description' ou 'category'
+            min_amount (float, optional): Montant minimal (inclus)
+            max_amount (float, optional): Montant maximal (inclus)
+            type (str, optional): 'income', 'expense' ou 'transfer'
+            account_id (int, optional): Compte source ou destination
+            start_date (optional): Premier jour inclus
+            end_date (optional): Dernier jour inclus
+            limit (int, optional): Nombre maximal de résultats (None pour tous)
+            prefix (bool): Accepter un début de mot pour le dernier mot de la requête
+
+        Returns:
+            pd.DataFrame: Transactions trouvées ('Id', 'Date', 'Amount', 'Type', 'AccountId', 'ToAccountId',
+                          'Category', 'Description', 'Score')
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Champ de recherche inconnu: {field}")
+
+        size = self._size
+        mask = self._alive[:size].copy()
+        if min_amount is not None:
+            mask &= self._amounts[:size] >= min_amount
+        if max_amount is not None:
+            mask &= self._amounts[:size] <= max_amount
+        if type is not None:
+            if type not in TRANSACTION_TYPES:
+                raise ValueError(f"Type de transaction inconnu: {type}")
+            mask &= self._type_codes[:size] == TRANSACTION_TYPES.index(type)
+        if account_id is not None:
+            mask &= (self._account_ids[:size] == account_id) | (self._to_account_ids[:size] == account_id)
+        if start_date is not None:
+            mask &= self._days[:size] >= self._day(start_date)
+        if end_date is not None:
+            mask &= self._days[:size] <= self._day(end_date)
+
+        # Le premier mot est évalué sur tous les tableaux, les suivants sur les seules lignes retenues
+        rows = scores = None
+        terms = tokenize(query)
+        for position, term in enumerate(terms):
+            term_scores = self._term_scores(term, prefix and position == len(terms) - 1, field, rows)
+            if rows is None:
+                mask &= term_scores > 0
+                rows = np.flatnonzero(mask)
+                scores = term_scores[rows]
+            else:
+                found = term_scores > 0
+                rows, scores = rows[found], scores[found] + term_scores[found]
+        if rows is None:
+            rows = np.flatnonzero(mask)
+            scores = np.zeros(len(rows))
+
+        # Sélection des meilleurs résultats en temps linéaire, puis tri de ceux-ci seulement
+        if limit is not None and len(rows) > limit:
+            keys = np.rint(scores * 2).astype(np.int64) * (1 << 32) + self._days[rows]
+            best = np.argpartition(-keys, limit - 1)[:limit]
+            rows, scores = rows[best], scores[best]
+        order = np.lexsort((-rows, -self._days[rows], -scores))
+        rows, scores = rows[order], scores[order]
+
+        type_names = np.array(TRANSACTION_TYPES + (None,), dtype=object)
+        account_ids, to_account_ids = self._account_ids[rows], self._to_account_ids[rows]
+        return pd.DataFrame({
+            'Id': self._ids[rows],
+            'Date': self._days[rows].view('datetime64[D]'),
+            'Amount': self._amounts[rows],
+            'Type': type_names[self._type_codes[rows]],
+            'AccountId': pd.array(np.where(account_ids == MISSING_ID, None, account_ids), dtype='Int32'),
+            'ToAccountId': pd.array(np.where(to_account_ids == MISSING_ID, None, to_account_ids), dtype='Int32'),
+            'Category': self._label_values(self._category_codes[rows]),
+            'Description': self._label_values(self._description_codes[rows]),
+            'Score': scores
+        })
+
+    @profiled()
+    def suggest(self, text: str, field: str = 'all', limit: int = 10) -> list:
+        """
+        Propose des descriptions et catégories pour l'autocomplétion.
+
+        Les libellés proposés contiennent tous les mots saisis, le dernier pouvant n'être qu'un début de
+        mot ; ils sont classés du plus utilisé au moins utilisé. Seuls les libellés, et non les
+        transactions, sont parcourus.
+
+        Args:
+            text (str): Texte en cours de saisie
+            field (str): 'all', 'description' ou 'category'
+            limit (int): Nombre maximal de propositions
+
+        Returns:
+            list: Libellés proposés
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Champ de recherche inconnu: {field}")
+
+        terms = tokenize(text)
+        if not terms:
+            return []
+
+        matched = np.ones(len(self._labels), dtype=bool)
+        for position, term in enumerate(terms):
+            matched &= self._label_scores(term, position == len(terms) - 1)[:-1] > 0
+
+        usage = np.zeros(len(self._labels), dtype=np.int64)
+        if field != 'category':
+            usage = usage + self._description_counts
+        if field != 'description':
+            usage = usage + self._category_counts
+        codes = np.flatnonzero(matched & (usage > 0))
+        # Du plus utilisé au moins utilisé ; à égalité, dans l'ordre d'apparition
+        codes = codes[np.argsort(-usage[codes], kind='stable')[:limit]]
+        return [self._labels[code] for code in codes.tolist()]
@@ -0,0 +1,262 @@
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from logging import debug
+from functions.balance_calculator import TRANSACTION_TYPES, to_cents
+from utils_date import APP_TIMEZONE, local_days
+
+# Valeur des identifiants absents (compte destination d'une dépense, transaction sans id...)
+MISSING_ID = -1
+
+class TransactionStore:
+    """
+    Stockage en colonnes des transactions d'un utilisateur.
+
+    Les transactions sont chargées une seule fois dans des tableaux typés triés par date :
+    jours depuis l'époque (int64), montants (float64), codes de type (int8, position dans
+    TRANSACTION_TYPES), comptes source et destination (int32) et codes de catégorie (int32).
+    Les fonctions du calculateur de soldes acceptent directement un TransactionStore et
+    travaillent sur ces tableaux sans copie ni nouvelle conversion des dates.
+    """
+
+    def __init__(self, ids: np.ndarray, days: np.ndarray, amounts: np.ndarray, type_codes: np.ndarray,
+                 account_ids: np.ndarray, to_account_ids: np.ndarray, category_codes: np.ndarray, categories: list):
+        """
+        Initialise le stockage à partir de tableaux déjà triés par date.
+
+        Utiliser de préférence `from_records` ou `from_user_file`.
+        """
+        self.ids = ids
+        self.days = days
+        self.amounts = amounts
+        self.type_codes = type_codes
+        self.account_ids = account_ids
+        self.to_account_ids = to_account_ids
+        self.category_codes = category_codes
+        self.categories = categories
+        self._amount_cents = None
+        self._checksums = {}
+
+    @classmethod
+    def from_records(cls, transactions: list, timezone: str = APP_TIMEZONE) -> "TransactionStore":
+        """
+        Construit le stockage à partir de la liste `transactions` d'un fichier utilisateur.
+
+        Les dates sont ramenées à leur jour local dans le fuseau `timezone` (voir `local_days`).
+
+        Args:
+            transactions (list): Transactions au format JSON de l'application
+                                 (id, date, amount, type, accountId, toAccountId, category)
+            timezone (str): Fuseau horaire de l'application
+
+        Returns:
+            TransactionStore: Stockage trié par date
+        """
+        type_codes = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+
+        days = local_days([t['date'] for t in transactions], timezone)
+        if np.isnat(days).any():
+            raise ValueError("Date manquante ou invalide parmi les transactions du stockage")
+        days = days.astype(np.int64)
+        amounts = np.array([t.get('amount', 0.0) for t in transactions], dtype=np.float64)
+        types = np.array([type_codes.get(t.get('type'), -1) for t in transactions], dtype=np.int8)
+        ids = np.array([id_or_missing(t.get('id')) for t in transactions], dtype=np.int64)
+        account_ids = np.array([id_or_missing(t.get('accountId')) for t in transactions], dtype=np.int32)
+        to_account_ids = np.array([id_or_missing(t.get('toAccountId')) for t in transactions], dtype=np.int32)
+        category_codes, categories = pd.factorize(pd.Series([t.get('category') for t in transactions], dtype=object))
+
+        # Tri stable par date : les transactions d'un même jour gardent leur ordre d'origine
+        order = np.argsort(days, kind='stable')
+
+        store = cls(
+            ids[order],
+            days[order],
+            amounts[order],
+            types[order],
+            account_ids[order],
+            to_account_ids[order],
+            category_codes.astype(np.int32)[order],
+            list(categories)
+        )
+
+        debug("TransactionStore chargé: %s transactions, %s octets", len(store), store.nbytes, module="transaction_store")
+
+        return store
+
+    @classmethod
+    def concatenate(cls, stores: list) -> "TransactionStore":
+        """
+        Fusionne plusieurs stockages en un seul, trié par date.
+
+        Les catégories sont réunies et les codes de catégorie renumérotés en conséquence.
+
+        Args:
+            stores (list): Stockages à fusionner
+
+        Returns:
+            TransactionStore: Stockage trié par date (tri stable : à date égale, l'ordre des stockages est conservé)
+        """
+        categories = []
+        category_index = {}
+        category_codes = []
+        for store in stores:
+            for category in store.categories:
+                if category not in category_index:
+                    category_index[category] = len(categories)
+                    categories.append(category)
+            # Le dernier élément sert aux transactions sans catégorie (code -1)
+            remap = np.array([category_index[category] for category in store.categories] + [-1], dtype=np.int32)
+            category_codes.append(remap[store.category_codes])
+
+        days = np.concatenate([store.days for store in stores]) if stores else np.array([], dtype=np.int64)
+        order = np.argsort(days, kind='stable')
+
+        def merged(name, dtype):
+            if not stores:
+                return np.array([], dtype=dtype)
+            return np.concatenate([getattr(store, name) for store in stores])[order]
+
+        return cls(
+            merged('ids', np.int64),
+            days[order],
+            merged('amounts', np.float64),
+            merged('type_codes', np.int8),
+            merged('account_ids', np.int32),
+            merged('to_account_ids', np.int32),
+            np.concatenate(category_codes)[order] if stores else np.array([], dtype=np.int32),
+            categories
+        )
+
+    @classmethod
+    def from_user_file(cls, path: str, timezone: str = APP_TIMEZONE) -> "TransactionStore":
+        """
+        Charge les transactions d'un fichier utilisateur data/<hash>.json.
+
+        Args:
+            path (str): Chemin du fichier utilisateur
+            timezone (str): Fuseau horaire de l'application
+
+        Returns:
+            TransactionStore: Stockage trié par date
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            user_data = json.load(f)
+
+        return cls.from_records(user_data.get('data', {}).get('transactions', []), timezone)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les tableaux, en octets"""
+        return sum(array.nbytes for array in (self.ids, self.days, self.amounts, self.type_codes,
+                                              self.account_ids, self.to_account_ids, self.category_codes))
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Dates des transactions en datetime64[D] (vue sans copie des jours)"""
+        return self.days.view('datetime64[D]')
+
+    @property
+    def amount_cents(self) -> np.ndarray:
+        """Montants en centimes int64, convertis au premier accès puis conservés (mode virgule fixe)"""
+        if self._amount_cents is None:
+            self._amount_cents = to_cents(self.amounts)
+        return self._amount_cents
+
+    def as_columns(self, fixed_point: bool = False) -> tuple:
+        """
+        Retourne les colonnes attendues par le calculateur de soldes, sans copie.
+
+        Args:
+            fixed_point (bool): Retourner les montants en centimes int64 (`amount_cents`)
+
+        Returns:
+            tuple: (dates, amounts, type_codes, account_ids, to_account_ids)
+        """
+        amounts = self.amount_cents if fixed_point else self.amounts
+        return (self.dates, amounts, self.type_codes, self.account_ids, self.to_account_ids)
+
+    def between(self, start, end) -> "TransactionStore":
+        """
+        Retourne les transactions comprises entre deux dates (incluses), sous forme de vues sans copie.
+
+        Args:
+            start: Première date incluse
+            end: Dernière date incluse
+
+        Returns:
+            TransactionStore: Stockage partageant les tableaux de celui-ci
+        """
+        first = np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')
+        last = np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')
+        window = slice(first, last)
+
+        return TransactionStore(
+            self.ids[window],
+            self.days[window],
+            self.amounts[window],
+            self.type_codes[window],
+            self.account_ids[window],
+            self.to_account_ids[window],
+            self.category_codes[window],
+            self.categories
+        )
+
+    def checksum(self, with_categories: bool = False) -> str:
+        """
+        Calcule l'empreinte du contenu du stockage (pour détecter des instantanés périmés).
+
+        Les tableaux ne sont jamais modifiés en place : l'empreinte est calculée au premier appel puis conservée.
+
+        Args:
+            with_categories (bool): Inclure les catégories (inutiles aux soldes, utiles aux ventilations par catégorie)
+
+        Returns:
+            str: Empreinte hexadécimale
+        """
+        checksum = self._checksums.get(with_categories)
+        if checksum is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for array in (self.ids, self.days, self.amounts, self.type_codes, self.account_ids, self.to_account_ids):
+                digest.update(array.tobytes())
+            if with_categories:
+                digest.update(self.category_codes.tobytes())
+                digest.update('\x00'.join(str(category) for category in self.categories).encode('utf-8'))
+            checksum = self._checksums[with_categories] = digest.hexdigest()
+        return checksum
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Convertit le stockage en DataFrame au format du calculateur ('Id', 'Date', 'Amount', 'Type', ...).
+
+        Returns:
+            pd.DataFrame: Une ligne par transaction, triées par date
+        """
+        type_names = np.array(TRANSACTION_TYPES + (None,), dtype=object)
+        categories = np.array(self.categories + [None], dtype=object)
+
+        return pd.DataFrame({
+            'Id': self.ids,
+            'Date': self.dates,
+            'Amount': self.amounts,
+            'Type': type_names[self.type_codes],
+            'AccountId': pd.array(np.where(self.account_ids == MISSING_ID, None, self.account_ids), dtype='Int32'),
+            'ToAccountId': pd.array(np.where(self.to_account_ids == MISSING_ID, None, self.to_account_ids), dtype='Int32'),
+            'Category': categories[self.category_codes]
+        })
+
+def id_or_missing(value) -> int:
+    """
+    Retourne l'identifiant sous forme d'entier, ou MISSING_ID s'il est absent.
+
+    Args:
+        value: Identifiant d'un champ JSON de l'application (id, accountId, toAccountId), ou None
+
+    Returns:
+        int: Identifiant entier, MISSING_ID si `value` vaut None
+    """
+    return MISSING_ID if value is None else int(value)
@@ -0,0 +1,291 @@
+import re
+import json
+from datetime import datetime
+from typing import Any, Iterator, List, Optional
+import pandas as pd
+
+from logging import debug
+from functions.balance_calculator import calculate_monthly_balances_from_chunks
+from functions.transaction_store import TransactionStore
+
+# Taille des lectures dans le fichier (en caractères) et nombre de transactions par morceau
+DEFAULT_BUFFER_SIZE = 1 << 16
+DEFAULT_CHUNK_SIZE = 10000
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NUMBER_START = '-0123456789'
+_NUMBER_END = re.compile(r'[^0-9+\-.eE]')
+_decoder = json.JSONDecoder()
+
+class JsonStreamReader:
+    """
+    Lecteur JSON incrémental à mémoire bornée.
+
+    Le document est lu par blocs : seules les valeurs explicitement lues sont converties en
+    objets Python, les autres sont sautées en ne suivant que les délimiteurs. Les itérateurs
+    `iter_object` et `iter_array` s'arrêtent sur chaque valeur, que l'appelant doit consommer
+    (lecture, saut ou nouvelle itération) avant de passer à la suivante.
+    """
+
+    def __init__(self, file, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Initialise le lecteur
+
+        Args:
+            file: Fichier texte ouvert en lecture
+            buffer_size: Nombre de caractères lus à chaque bloc
+        """
+        self._file = file
+        self._buffer_size = buffer_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int = None) -> bool:
+        """Ajoute un bloc au tampon après avoir retiré la partie déjà consommée"""
+        if self._eof:
+            return False
+        data = self._file.read(size or self._buffer_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"JSON invalide: {message}")
+
+    def peek(self) -> str:
+        """Saute les blancs et retourne le prochain caractère sans le consommer"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error("fin de fichier inattendue")
+
+    def _expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"'{char}' attendu, '{self._buffer[self._pos]}' trouvé")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Lit la prochaine valeur et la convertit en objet Python"""
+        if self.peek() in _NUMBER_START:
+            # Un nombre en fin de tampon peut être tronqué : lire jusqu'au premier caractère qui le termine
+            while _NUMBER_END.search(self._buffer, self._pos) is None and self._fill():
+                pass
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Valeur incomplète dans le tampon : lire davantage (en doublant pour les grosses valeurs)
+                if not self._fill(max(self._buffer_size, len(self._buffer))):
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def _skip_string(self) -> None:
+        """Saute une chaîne dont le guillemet ouvrant a déjà été consommé"""
+        while True:
+            match = _STRING_SPECIAL.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+            elif match.group() == '"':
+                self._pos = match.end()
+                return
+            elif match.end() < len(self._buffer):
+                # Caractère échappé : on saute la barre oblique et le caractère suivant
+                self._pos = match.end() + 1
+                continue
+            else:
+                self._pos = match.start()
+            if not self._fill():
+                raise self._error("chaîne non terminée")
+
+    def skip_value(self) -> None:
+        """Saute la prochaine valeur sans construire d'objets Python"""
+        char = self.peek()
+        if char == '"':
+            self._pos += 1
+            self._skip_string()
+            return
+        if char not in '[{':
+            self.read_value()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise self._error("fin de fichier inattendue")
+                continue
+            self._pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string()
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def iter_object(self) -> Iterator[str]:
+        """Parcourt un objet et produit chacune de ses clés, positionné sur la valeur correspondante"""
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise self._error(f"',' ou '}}' attendu, '{char}' trouvé")
+
+    def iter_array(self) -> Iterator[int]:
+        """Parcourt un tableau et produit l'indice de chaque élément, positionné sur celui-ci"""
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise self._error(f"',' ou ']' attendu, '{char}' trouvé")
+
+def _seek_user_section(reader: JsonStreamReader, section: str) -> bool:
+    """Positionne le lecteur sur data.<section> d'un fichier utilisateur en sautant le reste"""
+    for key in reader.iter_object():
+        if key != 'data':
+            reader.skip_value()
+            continue
+        for data_key in reader.iter_object():
+            if data_key == section:
+                return True
+            reader.skip_value()
+        return False
+    return False
+
+def read_user_section(path: str, section: str) -> Optional[Any]:
+    """
+    Lit une seule section d'un fichier utilisateur data/<hash>.json.
+
+    Les autres sections (en particulier les transactions) sont sautées sans être converties.
+
+    Args:
+        path: Chemin du fichier utilisateur
+        section: Nom de la section ('accounts', 'transactions', 'recurringTransactions', 'preferences', ...)
+
+    Returns:
+        Contenu de la section, ou None si elle est absente
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        reader = JsonStreamReader(f)
+        if not _seek_user_section(reader, section):
+            return None
+        return reader.read_value()
+
+def read_preferences(path: str) -> dict:
+    """
+    Lit uniquement les préférences d'un fichier utilisateur (mois financier, devise...).
+
+    Args:
+        path: Chemin du fichier utilisateur
+
+    Returns:
+        Préférences de l'utilisateur (dictionnaire vide si absentes)
+    """
+    return read_user_section(path, 'preferences') or {}
+
+def iter_transaction_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Parcourt les transactions d'un fichier utilisateur par morceaux de taille fixe.
+
+    Seul le morceau courant est conservé en mémoire.
+
+    Args:
+        path: Chemin du fichier utilisateur
+        chunk_size: Nombre maximal de transactions par morceau
+
+    Returns:
+        Itérateur de listes de transactions (dictionnaires au format JSON de l'application)
+    """
+    if chunk_size < 1:
+        raise ValueError("La taille des morceaux doit être d'au moins une transaction")
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        reader = JsonStreamReader(f)
+        if not _seek_user_section(reader, 'transactions'):
+            return
+
+        chunk = []
+        for _ in reader.iter_array():
+            chunk.append(reader.read_value())
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def iter_transaction_stores(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[TransactionStore]:
+    """
+    Parcourt les transactions d'un fichier utilisateur par morceaux convertis en TransactionStore.
+
+    Args:
+        path: Chemin du fichier utilisateur
+        chunk_size: Nombre maximal de transactions par morceau
+
+    Returns:
+        Itérateur de TransactionStore
+    """
+    for chunk in iter_transaction_chunks(path, chunk_size):
+        yield TransactionStore.from_records(chunk)
+
+def calculate_monthly_balances_from_user_file(path: str,
+                                              account_creation_date: datetime,
+                                              initial_balance: float,
+                                              month_mode: str,
+                                              financial_month_day: int,
+                                              end_date: datetime,
+                                              account_id: int = None,
+                                              chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                              fixed_point: bool = False) -> pd.Series:
+    """
+    Calcule les soldes mensuels d'un fichier utilisateur sans charger toutes ses transactions.
+
+    Les arguments sont ceux de `calculate_monthly_balances`, le DataFrame étant remplacé par
+    le chemin du fichier et la taille des morceaux lus.
+
+    Returns:
+        pd.Series: Soldes indexés par mois ('YYYY-MM')
+    """
+    debug("Calcul des soldes en flux depuis %s (morceaux de %s)", path, chunk_size, module="user_data_reader")
+
+    return calculate_monthly_balances_from_chunks(
+        iter_transaction_stores(path, chunk_size),
+        account_creation_date,
+        initial_balance,
+        month_mode,
+        financial_month_day,
+        end_date,
+        account_id,
+        fixed_point
+    )
@@ -1,4 +1,47 @@
-from .logger import get_logger, log, debug, info, warning, error, critical, export_logs, clear_logs
+import os as _os
+
+from .logger import get_logger, log, debug, info, warning, error, critical, export_logs, clear_logs, start_sink, stop_sink, query_logs
+
+# Dossier du module standard `logging` (à côté de os.py dans la bibliothèque standard)
+_STDLIB_DIR = _os.path.join(_os.path.dirname(_os.__file__), "logging")
+
+# Ajouter ce dossier au __path__ pour `logging.handlers`/`logging.config`
+__path__.append(_STDLIB_DIR)
+
+_stdlib_logging = None
+
+
+def _load_stdlib_logging():
+    """
+    Charge le module standard `logging` sous un autre nom, au premier besoin.
+
+    Ce paquet porte le même nom que le module standard : dès que la racine du projet
+    est en tête de sys.path (lancement via main.py), les bibliothèques tierces
+    (pandas, concurrent.futures, ...) importent ce paquet au lieu du module standard.
+    Le module standard n'est exécuté que lorsqu'un de ses attributs est demandé, pour
+    que les commandes qui n'en ont pas besoin n'en paient pas l'importation.
+    """
+    global _stdlib_logging
+    if _stdlib_logging is None:
+        import importlib.util as _importlib_util
+        spec = _importlib_util.spec_from_file_location("_stdlib_logging", _os.path.join(_STDLIB_DIR, "__init__.py"))
+        module = _importlib_util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _stdlib_logging = module
+    return _stdlib_logging
+
+
+def __getattr__(name):
+    """Réexpose l'API du module standard `logging` (getLogger, Handler, NullHandler...)"""
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(_load_stdlib_logging(), name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
 
 # Exposer l'API du module
 __all__ = [
@@ -10,5 +53,8 @@ __all__ = [
     'error',
     'critical',
     'export_logs',
-    'clear_logs'
+    'clear_logs',
+    'start_sink',
+    'stop_sink',
+    'query_logs'
 ]
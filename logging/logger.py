@@ -7,14 +7,75 @@ Permet de centraliser tous les messages de log et de les exporter
 """
 
 import os
-import json
+import bisect
+import heapq
 import datetime
-import csv
-from typing import List, Dict, Any, Optional, Literal
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Literal, Union, Callable, Iterable, Iterator
+
+from profiling import profiled
+
+if TYPE_CHECKING:
+    from .sink import LogSink
 
 # Niveaux de journalisation
 LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 
+# Arguments immuables dont le formatage peut être différé sans retenir d'objet de l'appelant
+_SCALAR_TYPES = (str, int, float, bool, bytes, type(None), datetime.date, datetime.time, datetime.timedelta)
+
+class LogEntry:
+    """
+    Entrée de journal compacte.
+
+    Le message est conservé sous forme de modèle et d'arguments (ou d'appelable) et n'est
+    formaté qu'à la première lecture ; l'horodatage est un time.time() converti à la demande.
+    Si un argument n'est pas un scalaire immuable (DataFrame, liste, exception...), le message
+    est formaté dès la création : l'entrée ne retient pas l'objet et reflète son état au moment du log.
+    """
+
+    __slots__ = ("created", "level", "module", "data", "_message", "_args")
+
+    def __init__(self, created: float, level: LogLevel, module: str, message: Union[str, Callable[[], str]],
+                 args: tuple = (), data: Optional[Dict[str, Any]] = None):
+        self.created = created
+        self.level = level
+        self.module = module
+        self.data = data
+        self._message = message
+        self._args = args
+        if args and not all(isinstance(arg, _SCALAR_TYPES) for arg in args):
+            # Formatage immédiat : seule la chaîne est retenue
+            self._message = self.message
+
+    @property
+    def message(self) -> str:
+        """Message formaté (calculé une seule fois)"""
+        if self._args or callable(self._message):
+            if callable(self._message):
+                self._message = str(self._message())
+            else:
+                self._message = self._message % self._args
+            self._args = ()
+        return self._message
+
+    @property
+    def timestamp(self) -> str:
+        """Horodatage au format ISO"""
+        return datetime.datetime.fromtimestamp(self.created).isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retourne l'entrée au format dictionnaire des exports"""
+        entry = {
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "module": self.module,
+            "message": self.message
+        }
+        if self.data:
+            entry["data"] = self.data
+        return entry
+
 class Logger:
     """Gestionnaire de journalisation pour Ma Bourse"""
     
@@ -26,9 +87,6 @@ class Logger:
             max_entries: Nombre maximum d'entrées à conserver en mémoire
             level: Niveau minimum de journalisation
         """
-        self.logs: List[Dict[str, Any]] = []
-        self.max_entries = max_entries
-        self.level = level
         self.level_priority = {
             "DEBUG": 0,
             "INFO": 1,
@@ -36,72 +94,241 @@ class Logger:
             "ERROR": 3,
             "CRITICAL": 4
         }
+        self.level = level
+        
+        # Tampon circulaire de capacité fixe : la plus ancienne entrée est écrasée une fois plein.
+        # Chaque entrée reçoit un numéro de séquence croissant ; l'entrée n° seq occupe la case seq % max_entries
+        self.max_entries = max_entries
+        self._entries: List[Optional[LogEntry]] = [None] * max_entries
+        self._seq = 0
+        self._count = 0
+        
+        # Index par module et par niveau : numéros de séquence triés, les entrées écrasées
+        # n'étant retirées que de temps en temps (voir _index)
+        self._module_index: Dict[str, List[int]] = {}
+        self._level_index: Dict[str, List[int]] = {}
+        
+        # Écrivain en arrière-plan optionnel (voir start_sink)
+        self.sink: Optional["LogSink"] = None
         
-        # Créer un dossier pour les journaux exportés s'il n'existe pas
+        # Dossier des journaux exportés, créé au premier export (voir _export_path)
         self.log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exported_logs")
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+    
+    @property
+    def level(self) -> LogLevel:
+        """Niveau minimum de journalisation"""
+        return self._level
+    
+    @level.setter
+    def level(self, level: LogLevel) -> None:
+        self._level = level
+        self._min_priority = self.level_priority[level]
+    
+    def _export_path(self, filename: str) -> str:
+        """Chemin d'un fichier d'export, en créant le dossier des journaux s'il n'existe pas"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        return os.path.join(self.log_dir, filename)
     
     def _should_log(self, level: LogLevel) -> bool:
         """Détermine si un message doit être journalisé selon son niveau"""
-        return self.level_priority[level] >= self.level_priority[self.level]
+        return self.level_priority[level] >= self._min_priority
     
-    def log(self, message: str, level: LogLevel = "INFO", module: str = "", 
-            additional_data: Optional[Dict[str, Any]] = None) -> None:
+    def entries(self) -> Iterator[LogEntry]:
+        """Parcourt les entrées conservées, de la plus ancienne à la plus récente"""
+        for seq in range(self._oldest_seq, self._seq):
+            yield self._entries[seq % self.max_entries]
+    
+    @property
+    def _oldest_seq(self) -> int:
+        """Numéro de séquence de la plus ancienne entrée conservée"""
+        return self._seq - self._count
+    
+    def _created(self, seq: int) -> float:
+        return self._entries[seq % self.max_entries].created
+    
+    def _index(self, index: Dict[str, List[int]], key: str, seq: int) -> None:
+        """
+        Ajoute un numéro de séquence à un index
+        
+        Les numéros des entrées écrasées sont retirés dès que la liste dépasse le double de la
+        capacité : au plus max_entries sont encore valides, le coût reste donc constant en moyenne.
+        """
+        seqs = index.get(key)
+        if seqs is None:
+            seqs = index[key] = []
+        seqs.append(seq)
+        if len(seqs) > 2 * self.max_entries:
+            del seqs[:bisect.bisect_left(seqs, self._oldest_seq)]
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def logs(self) -> List[Dict[str, Any]]:
+        """Entrées conservées au format dictionnaire (formate les messages différés)"""
+        return [entry.to_dict() for entry in self.entries()]
+    
+    def log(self, message: Union[str, Callable[[], str]], level: LogLevel = "INFO", module: str = "", 
+            additional_data: Optional[Dict[str, Any]] = None, args: tuple = ()) -> None:
         """
         Ajoute une entrée au journal
         
+        Le formatage est différé : `message % args` (ou `message()` si message est appelable)
+        n'est évalué qu'à la lecture de l'entrée, et jamais si le niveau est filtré ; il a lieu
+        dès la création de l'entrée si un argument n'est pas un scalaire immuable (voir LogEntry).
+        
         Args:
-            message: Le message à journaliser
+            message: Le message à journaliser, modèle %-style ou appelable retournant le message
             level: Le niveau de journalisation
             module: Le module source du message
             additional_data: Données supplémentaires à inclure
+            args: Arguments du modèle de message
         """
-        if not self._should_log(level):
+        if self.level_priority[level] < self._min_priority:
             return
-            
-        entry = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "level": level,
-            "module": module,
-            "message": message
-        }
-        
-        if additional_data:
-            entry["data"] = additional_data
-            
-        self.logs.append(entry)
-        
-        # Limiter la taille du journal
-        if len(self.logs) > self.max_entries:
-            self.logs = self.logs[-self.max_entries:]
+        self._append(LogEntry(time.time(), level, module, message, args, additional_data or None))
     
-    def debug(self, message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+    @profiled("logger.Logger.log")
+    def _append(self, entry: LogEntry) -> None:
+        """Range une entrée retenue dans le tampon, les index et l'écrivain en arrière-plan"""
+        seq = self._seq
+        self._entries[seq % self.max_entries] = entry
+        self._seq = seq + 1
+        if self._count < self.max_entries:
+            self._count += 1
+        self._index(self._module_index, entry.module, seq)
+        self._index(self._level_index, entry.level, seq)
+        if self.sink is not None:
+            self.sink.emit(entry)
+    
+    def debug(self, message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+              additional_data: Optional[Dict[str, Any]] = None) -> None:
         """Log de niveau DEBUG"""
-        self.log(message, "DEBUG", module, additional_data)
+        self.log(message, "DEBUG", module, additional_data, args)
     
-    def info(self, message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+    def info(self, message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+             additional_data: Optional[Dict[str, Any]] = None) -> None:
         """Log de niveau INFO"""
-        self.log(message, "INFO", module, additional_data)
+        self.log(message, "INFO", module, additional_data, args)
     
-    def warning(self, message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+    def warning(self, message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+                additional_data: Optional[Dict[str, Any]] = None) -> None:
         """Log de niveau WARNING"""
-        self.log(message, "WARNING", module, additional_data)
+        self.log(message, "WARNING", module, additional_data, args)
     
-    def error(self, message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+    def error(self, message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+              additional_data: Optional[Dict[str, Any]] = None) -> None:
         """Log de niveau ERROR"""
-        self.log(message, "ERROR", module, additional_data)
+        self.log(message, "ERROR", module, additional_data, args)
     
-    def critical(self, message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+    def critical(self, message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+                 additional_data: Optional[Dict[str, Any]] = None) -> None:
         """Log de niveau CRITICAL"""
-        self.log(message, "CRITICAL", module, additional_data)
+        self.log(message, "CRITICAL", module, additional_data, args)
+    
+    def _records(self, records: Optional[Iterable[Dict[str, Any]]]) -> Iterable[Dict[str, Any]]:
+        """Entrées à exporter : celles fournies, sinon celles conservées en mémoire"""
+        if records is not None:
+            return records
+        return (entry.to_dict() for entry in self.entries())
+    
+    def _candidates(self, index: Dict[str, List[int]], keys: Union[str, Iterable[str]]) -> List[int]:
+        """Numéros de séquence encore valides des entrées indexées sous l'une des clés, triés"""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        oldest = self._oldest_seq
+        lists = []
+        for key in keys:
+            seqs = index.get(key)
+            if seqs:
+                # Élagage paresseux des entrées écrasées
+                del seqs[:bisect.bisect_left(seqs, oldest)]
+                lists.append(seqs)
+        if len(lists) == 1:
+            return lists[0]
+        return list(heapq.merge(*lists))
+    
+    @profiled()
+    def query_entries(self, level: Optional[Union[LogLevel, Iterable[LogLevel]]] = None,
+                      module: Optional[Union[str, Iterable[str]]] = None,
+                      since: Optional[Union[datetime.datetime, datetime.timedelta, float]] = None,
+                      until: Optional[Union[datetime.datetime, float]] = None,
+                      limit: Optional[int] = None) -> List[LogEntry]:
+        """
+        Recherche les entrées conservées par niveau, module et plage d'horodatage
+        
+        Les entrées candidates sont lues dans l'index du module ou du niveau (le plus court des
+        deux), la plage de temps est délimitée par recherche dichotomique sur les horodatages
+        croissants : seules les entrées retenues sont parcourues, jamais tout le journal.
+        
+        Args:
+            level: Niveau ou liste de niveaux recherchés
+            module: Module ou liste de modules recherchés
+            since: Début de la plage (datetime, time.time(), ou timedelta pour « depuis N minutes »)
+            until: Fin de la plage, incluse (datetime ou time.time())
+            limit: Ne retourner que les `limit` entrées les plus récentes
+            
+        Returns:
+            Entrées retenues, de la plus ancienne à la plus récente
+        """
+        if level is not None:
+            levels = [level] if isinstance(level, str) else list(level)
+            for name in levels:
+                if name not in self.level_priority:
+                    raise ValueError(f"Niveau de journalisation inconnu: {name}")
+        
+        by_module = self._candidates(self._module_index, module) if module is not None else None
+        by_level = self._candidates(self._level_index, level) if level is not None else None
+        
+        # Parcourir l'index le plus court et vérifier l'autre critère entrée par entrée
+        if by_module is not None and by_level is not None:
+            if len(by_module) <= len(by_level):
+                seqs, check = by_module, ("level", set(levels))
+            else:
+                seqs, check = by_level, ("module", {module} if isinstance(module, str) else set(module))
+        else:
+            seqs = by_module if by_module is not None else by_level
+            check = None
+        if seqs is None:
+            seqs = range(self._oldest_seq, self._seq)
+        
+        # Plage de temps par dichotomie (les horodatages croissent avec les numéros de séquence)
+        first, last = 0, len(seqs)
+        if isinstance(since, datetime.timedelta):
+            since = time.time() - since.total_seconds()
+        elif isinstance(since, datetime.datetime):
+            since = since.timestamp()
+        if isinstance(until, datetime.datetime):
+            until = until.timestamp()
+        if since is not None:
+            first = bisect.bisect_left(seqs, since, key=self._created)
+        if until is not None:
+            last = bisect.bisect_right(seqs, until, lo=first, key=self._created)
+        
+        entries = [self._entries[seq % self.max_entries] for seq in seqs[first:last]]
+        if check is not None:
+            attribute, accepted = check
+            entries = [entry for entry in entries if getattr(entry, attribute) in accepted]
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        
+        return entries
+    
+    def query(self, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Recherche les entrées conservées (voir query_entries pour les filtres)
+        
+        Returns:
+            Entrées retenues au format dictionnaire des exports
+        """
+        return [entry.to_dict() for entry in self.query_entries(**filters)]
     
-    def export_json(self, filename: Optional[str] = None) -> str:
+    def export_json(self, filename: Optional[str] = None, records: Optional[Iterable[Dict[str, Any]]] = None) -> str:
         """
         Exporte les journaux au format JSON
         
         Args:
             filename: Nom du fichier d'export (généré automatiquement si None)
+            records: Entrées à exporter (par défaut celles en mémoire), écrites au fil de l'eau
             
         Returns:
             Chemin du fichier exporté
@@ -110,19 +337,30 @@ class Logger:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"mabourse_logs_{timestamp}.json"
         
-        filepath = os.path.join(self.log_dir, filename)
+        filepath = self._export_path(filename)
+        
+        # Importations différées : seuls les exports en ont besoin
+        import json
+        import textwrap
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, ensure_ascii=False, indent=2)
+            # Tableau écrit entrée par entrée, identique à json.dump(..., indent=2)
+            separator = "[\n"
+            for record in self._records(records):
+                f.write(separator)
+                f.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=2), "  "))
+                separator = ",\n"
+            f.write("[]" if separator == "[\n" else "\n]")
         
         return filepath
     
-    def export_csv(self, filename: Optional[str] = None) -> str:
+    def export_csv(self, filename: Optional[str] = None, records: Optional[Iterable[Dict[str, Any]]] = None) -> str:
         """
         Exporte les journaux au format CSV
         
         Args:
             filename: Nom du fichier d'export (généré automatiquement si None)
+            records: Entrées à exporter (par défaut celles en mémoire), écrites au fil de l'eau
             
         Returns:
             Chemin du fichier exporté
@@ -131,26 +369,29 @@ class Logger:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"mabourse_logs_{timestamp}.csv"
         
-        filepath = os.path.join(self.log_dir, filename)
+        filepath = self._export_path(filename)
+        
+        import csv
         
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             fieldnames = ["timestamp", "level", "module", "message"]
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             
             writer.writeheader()
-            for entry in self.logs:
+            for entry in self._records(records):
                 # Filtrer uniquement les champs standard pour le CSV
                 row = {field: entry.get(field, "") for field in fieldnames}
                 writer.writerow(row)
         
         return filepath
     
-    def export_txt(self, filename: Optional[str] = None) -> str:
+    def export_txt(self, filename: Optional[str] = None, records: Optional[Iterable[Dict[str, Any]]] = None) -> str:
         """
         Exporte les journaux au format texte
         
         Args:
             filename: Nom du fichier d'export (généré automatiquement si None)
+            records: Entrées à exporter (par défaut celles en mémoire), écrites au fil de l'eau
             
         Returns:
             Chemin du fichier exporté
@@ -159,10 +400,10 @@ class Logger:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"mabourse_logs_{timestamp}.txt"
         
-        filepath = os.path.join(self.log_dir, filename)
+        filepath = self._export_path(filename)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            for entry in self.logs:
+            for entry in self._records(records):
                 timestamp = entry["timestamp"]
                 level = entry["level"]
                 module = entry["module"]
@@ -173,67 +414,160 @@ class Logger:
         
         return filepath
     
-    def export(self, format: Literal["json", "csv", "txt"] = "json", filename: Optional[str] = None) -> str:
+    @profiled()
+    def export(self, format: Literal["json", "csv", "txt"] = "json", filename: Optional[str] = None,
+               from_files: bool = False, **filters: Any) -> str:
         """
         Exporte les journaux dans le format spécifié
         
         Args:
             format: Format d'exportation ("json", "csv", "txt")
             filename: Nom du fichier d'export
+            from_files: Convertir les fichiers écrits par l'écrivain en arrière-plan (fichiers tournés
+                        compris) plutôt que les seules entrées en mémoire ; la conversion se fait
+                        ligne par ligne, sans charger les fichiers en mémoire
+            **filters: N'exporter que les entrées retenues par ces filtres (voir query_entries)
             
         Returns:
             Chemin du fichier exporté
         """
+        records = None
+        if from_files:
+            if self.sink is None:
+                raise ValueError("Aucun écrivain de journaux n'est démarré (voir start_sink)")
+            records = self.sink.iter_records()
+            if filters:
+                records = _filter_records(records, **filters)
+        elif filters:
+            records = (entry.to_dict() for entry in self.query_entries(**filters))
+        
         if format == "json":
-            return self.export_json(filename)
+            return self.export_json(filename, records)
         elif format == "csv":
-            return self.export_csv(filename)
+            return self.export_csv(filename, records)
         elif format == "txt":
-            return self.export_txt(filename)
+            return self.export_txt(filename, records)
         else:
             raise ValueError(f"Format d'exportation non supporté: {format}")
     
+    def start_sink(self, **options: Any) -> "LogSink":
+        """
+        Démarre l'écriture continue des journaux dans exported_logs/ par un thread d'arrière-plan
+        
+        Args:
+            **options: Options de LogSink (max_bytes, max_age, compress, backup_count, queue_size...)
+            
+        Returns:
+            L'écrivain démarré (celui déjà actif s'il y en a un)
+        """
+        if self.sink is None:
+            from .sink import LogSink
+            self.sink = LogSink(options.pop("directory", self.log_dir), **options)
+        return self.sink
+    
+    def stop_sink(self) -> None:
+        """Écrit les entrées en attente et arrête l'écrivain en arrière-plan"""
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+    
     def clear(self) -> None:
         """Efface toutes les entrées du journal"""
-        self.logs = []
+        self._entries = [None] * self.max_entries
+        self._count = 0
+        self._module_index = {}
+        self._level_index = {}
+
+def _filter_records(records: Iterable[Dict[str, Any]], level: Optional[Union[str, Iterable[str]]] = None,
+                    module: Optional[Union[str, Iterable[str]]] = None,
+                    since: Optional[Union[datetime.datetime, datetime.timedelta, float]] = None,
+                    until: Optional[Union[datetime.datetime, float]] = None,
+                    limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Applique les filtres de query_entries à des entrées relues depuis les fichiers, au fil de l'eau"""
+    if limit is not None:
+        raise ValueError("Le filtre limit n'est pas disponible pour l'export depuis les fichiers")
+    levels = {level} if isinstance(level, str) else (set(level) if level is not None else None)
+    modules = {module} if isinstance(module, str) else (set(module) if module is not None else None)
+    if isinstance(since, datetime.timedelta):
+        since = time.time() - since.total_seconds()
+    elif isinstance(since, datetime.datetime):
+        since = since.timestamp()
+    if isinstance(until, datetime.datetime):
+        until = until.timestamp()
+    
+    for record in records:
+        if levels is not None and record["level"] not in levels:
+            continue
+        if modules is not None and record["module"] not in modules:
+            continue
+        if since is not None or until is not None:
+            created = datetime.datetime.fromisoformat(record["timestamp"]).timestamp()
+            if (since is not None and created < since) or (until is not None and created > until):
+                continue
+        yield record
 
-# Instance singleton du logger
-_logger = Logger()
+# Instance singleton du logger, créée au premier message (importer le paquet ne coûte rien)
+_logger: Optional[Logger] = None
 
 # Fonctions d'accès global au logger
 def get_logger() -> Logger:
-    """Retourne l'instance singleton du logger"""
+    """Retourne l'instance singleton du logger, en la créant au premier appel"""
+    global _logger
+    if _logger is None:
+        _logger = Logger()
     return _logger
 
-def log(message: str, level: LogLevel = "INFO", module: str = "", 
-        additional_data: Optional[Dict[str, Any]] = None) -> None:
+def log(message: Union[str, Callable[[], str]], level: LogLevel = "INFO", module: str = "", 
+        additional_data: Optional[Dict[str, Any]] = None, args: tuple = ()) -> None:
     """Fonction globale pour journaliser un message"""
-    _logger.log(message, level, module, additional_data)
+    (_logger or get_logger()).log(message, level, module, additional_data, args)
 
-def debug(message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+def debug(message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+          additional_data: Optional[Dict[str, Any]] = None) -> None:
     """Fonction globale pour un log de niveau DEBUG"""
-    _logger.debug(message, module, additional_data)
+    (_logger or get_logger()).log(message, "DEBUG", module, additional_data, args)
 
-def info(message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+def info(message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+         additional_data: Optional[Dict[str, Any]] = None) -> None:
     """Fonction globale pour un log de niveau INFO"""
-    _logger.info(message, module, additional_data)
+    (_logger or get_logger()).log(message, "INFO", module, additional_data, args)
 
-def warning(message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+def warning(message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+            additional_data: Optional[Dict[str, Any]] = None) -> None:
     """Fonction globale pour un log de niveau WARNING"""
-    _logger.warning(message, module, additional_data)
+    (_logger or get_logger()).log(message, "WARNING", module, additional_data, args)
 
-def error(message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+def error(message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+          additional_data: Optional[Dict[str, Any]] = None) -> None:
     """Fonction globale pour un log de niveau ERROR"""
-    _logger.error(message, module, additional_data)
+    (_logger or get_logger()).log(message, "ERROR", module, additional_data, args)
 
-def critical(message: str, module: str = "", additional_data: Optional[Dict[str, Any]] = None) -> None:
+def critical(message: Union[str, Callable[[], str]], *args: Any, module: str = "",
+             additional_data: Optional[Dict[str, Any]] = None) -> None:
     """Fonction globale pour un log de niveau CRITICAL"""
-    _logger.critical(message, module, additional_data)
+    (_logger or get_logger()).log(message, "CRITICAL", module, additional_data, args)
+
+def export_logs(format: Literal["json", "csv", "txt"] = "json", filename: Optional[str] = None,
+                from_files: bool = False, **filters: Any) -> str:
+    """Fonction globale pour exporter les journaux (éventuellement filtrés, voir query_logs)"""
+    return (_logger or get_logger()).export(format, filename, from_files, **filters)
+
+def query_logs(**filters: Any) -> List[Dict[str, Any]]:
+    """
+    Fonction globale pour rechercher des entrées par niveau, module et plage d'horodatage
+    
+    Exemple : query_logs(module="balance_calculator", level="DEBUG", since=timedelta(minutes=5))
+    """
+    return (_logger or get_logger()).query(**filters)
+
+def start_sink(**options: Any) -> "LogSink":
+    """Fonction globale pour démarrer l'écriture continue des journaux"""
+    return (_logger or get_logger()).start_sink(**options)
 
-def export_logs(format: Literal["json", "csv", "txt"] = "json", filename: Optional[str] = None) -> str:
-    """Fonction globale pour exporter les journaux"""
-    return _logger.export(format, filename)
+def stop_sink() -> None:
+    """Fonction globale pour arrêter l'écriture continue des journaux"""
+    (_logger or get_logger()).stop_sink()
 
 def clear_logs() -> None:
     """Fonction globale pour effacer les journaux"""
-    _logger.clear()
+    (_logger or get_logger()).clear()
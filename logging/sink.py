@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Écriture des journaux en continu pour Ma Bourse
+Un thread d'arrière-plan ajoute les entrées au format JSON par ligne (NDJSON) dans exported_logs/,
+avec rotation par taille et par âge et compression optionnelle des fichiers tournés
+"""
+
+import os
+import sys
+import json
+import gzip
+import atexit
+import time
+import queue
+import shutil
+import datetime
+import threading
+from typing import List, Dict, Any, Optional, Iterator
+
+# Rotation par défaut : 5 Mo ou une journée par fichier
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_QUEUE_SIZE = 10000
+
+# Attente maximale de l'arrêt du thread d'écriture, en secondes
+DEFAULT_CLOSE_TIMEOUT = 10.0
+
+# Nombre maximal d'entrées écrites entre deux vidages du fichier
+_BATCH_SIZE = 1000
+
+class LogSink:
+    """
+    Écrivain de journaux en arrière-plan.
+
+    Les entrées sont déposées dans une file bornée (`emit` ne bloque jamais : si la file est
+    pleine, l'entrée est comptée comme perdue) puis formatées et écrites par un thread dédié.
+    Le fichier courant `<base>.ndjson` est renommé `<base>-<horodatage>.ndjson` (et compressé
+    en .gz si demandé) dès qu'il dépasse `max_bytes` ou qu'il a été ouvert depuis plus de `max_age` secondes.
+    """
+
+    def __init__(self, directory: str, base_name: str = "mabourse_logs", max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE, compress: bool = True,
+                 backup_count: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 close_timeout: float = DEFAULT_CLOSE_TIMEOUT):
+        """
+        Initialise l'écrivain et démarre son thread
+
+        Args:
+            directory: Dossier des fichiers de journaux
+            base_name: Préfixe des noms de fichiers
+            max_bytes: Taille à partir de laquelle le fichier courant est tourné (None pour ne pas limiter)
+            max_age: Âge en secondes à partir duquel le fichier courant est tourné (None pour ne pas limiter)
+            compress: Compresser les fichiers tournés (gzip)
+            backup_count: Nombre de fichiers tournés à conserver (None pour tous les garder)
+            queue_size: Nombre maximal d'entrées en attente d'écriture
+            close_timeout: Attente maximale en secondes de l'écriture des entrées en attente à la sortie du programme
+        """
+        self.directory = directory
+        self.base_name = base_name
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.backup_count = backup_count
+        self.close_timeout = close_timeout
+        self.dropped = 0
+
+        self._queue: "queue.Queue[Optional[Any]]" = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._opened_at = 0.0
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        self._thread = threading.Thread(target=self._run, name="mabourse-log-sink", daemon=True)
+        self._thread.start()
+        # Le thread est un démon : sans fermeture à la sortie, les entrées en attente seraient perdues
+        atexit.register(self._close_at_exit)
+
+    @property
+    def active_path(self) -> str:
+        """Chemin du fichier en cours d'écriture"""
+        return os.path.join(self.directory, f"{self.base_name}.ndjson")
+
+    def emit(self, entry: Any) -> None:
+        """
+        Dépose une entrée (LogEntry ou dictionnaire) dans la file d'écriture, sans attendre
+
+        Args:
+            entry: Entrée à écrire
+        """
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Attend que toutes les entrées déposées soient écrites sur le disque"""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = DEFAULT_CLOSE_TIMEOUT) -> None:
+        """
+        Écrit les entrées en attente, arrête le thread et ferme le fichier courant
+
+        Args:
+            timeout: Attente maximale en secondes de l'arrêt du thread (None pour attendre indéfiniment)
+        """
+        atexit.unregister(self._close_at_exit)
+        if self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                print("Arrêt de l'écriture du journal impossible: file pleine", file=sys.stderr)
+                return
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print("L'écriture du journal ne s'est pas arrêtée à temps", file=sys.stderr)
+
+    def _close_at_exit(self) -> None:
+        """Ferme l'écrivain à la sortie du programme, sans attendre plus de `close_timeout` secondes"""
+        self.close(self.close_timeout)
+
+    def _run(self) -> None:
+        """Boucle du thread d'écriture : regroupe les entrées disponibles et les écrit par lots"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            try:
+                for entry in batch:
+                    if entry is None:
+                        stop = True
+                        continue
+                    try:
+                        self._write(entry)
+                    except (OSError, ValueError, TypeError) as e:
+                        # Une entrée non sérialisable ou une erreur disque ne coûte que cette entrée
+                        self.dropped += 1
+                        print(f"Écriture du journal impossible: {e}", file=sys.stderr)
+                if self._file is not None:
+                    try:
+                        self._file.flush()
+                    except OSError as e:
+                        print(f"Écriture du journal impossible: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, entry: Any) -> None:
+        """Écrit une entrée dans le fichier courant, en le tournant si nécessaire"""
+        record = entry if isinstance(entry, dict) else entry.to_dict()
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+        if self._file is None:
+            self._open()
+        elif self.max_age is not None and time.time() - self._opened_at >= self.max_age:
+            self._rotate()
+
+        self._file.write(line)
+
+        if self.max_bytes is not None and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _open(self) -> None:
+        self._file = open(self.active_path, 'a', encoding='utf-8')
+        self._opened_at = time.time()
+
+    def _rotate(self) -> None:
+        """Ferme le fichier courant, le renomme avec un horodatage, le compresse puis en ouvre un nouveau"""
+        self._file.close()
+        self._file = None
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        rotated_path = os.path.join(self.directory, f"{self.base_name}-{timestamp}.ndjson")
+        os.replace(self.active_path, rotated_path)
+
+        if self.compress:
+            with open(rotated_path, 'rb') as source, gzip.open(rotated_path + ".gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated_path)
+
+        if self.backup_count is not None:
+            rotated = self.rotated_files()
+            for path in rotated[:max(len(rotated) - self.backup_count, 0)]:
+                os.remove(path)
+
+        self._open()
+
+    def rotated_files(self) -> List[str]:
+        """
+        Liste les fichiers tournés, du plus ancien au plus récent
+
+        Returns:
+            Chemins des fichiers (l'horodatage des noms donne l'ordre chronologique)
+        """
+        prefix = f"{self.base_name}-"
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(prefix) and (name.endswith(".ndjson") or name.endswith(".ndjson.gz"))]
+        return [os.path.join(self.directory, name) for name in sorted(names)]
+
+    def files(self) -> List[str]:
+        """Fichiers tournés puis fichier courant, dans l'ordre chronologique"""
+        files = self.rotated_files()
+        if os.path.exists(self.active_path):
+            files.append(self.active_path)
+        return files
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Relit toutes les entrées écrites, fichier par fichier et ligne par ligne
+
+        Seule la ligne courante est conservée en mémoire ; les entrées en attente sont écrites d'abord.
+
+        Returns:
+            Itérateur de dictionnaires (timestamp, level, module, message, data)
+        """
+        self.flush()
+        for path in self.files():
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
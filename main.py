@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import argparse
 import getpass
+import profiling
+from datetime import datetime
 from mabourse.mabourse import Mabourse
 
 def parse_arguments():
@@ -19,16 +22,115 @@ def parse_arguments():
     group.add_argument('--delete-config', action='store_true',
                        help='Supprimer le fichier de configuration existant')
     
+    # Mesure des temps d'exécution
+    parser.add_argument('--profile', action='store_true',
+                      help="Mesurer les fonctions critiques et afficher leurs temps d'exécution en fin de programme")
+    parser.add_argument('--profile-log', action='store_true',
+                      help='Avec --profile, écrire aussi les statistiques dans le fichier du journal (exported_logs/)')
+    
     # Autres arguments possibles
     # parser.add_argument('--autre-option', type=str, help='Description')
     
+    # Sous-commandes
+    subparsers = parser.add_subparsers(dest='command')
+    recompute = subparsers.add_parser('recompute',
+                                      help='Recalculer les soldes mensuels de tous les utilisateurs du dossier de données')
+    recompute.add_argument('--data-dir', type=str, default=None,
+                           help='Dossier des fichiers utilisateur (data/ par défaut)')
+    recompute.add_argument('--workers', type=int, default=None,
+                           help='Nombre de processus (nombre de cœurs par défaut)')
+    recompute.add_argument('--chunk-size', type=int, default=None,
+                           help='Nombre de fichiers utilisateur confiés à un processus à la fois')
+    recompute.add_argument('--end-date', type=datetime.fromisoformat, default=None,
+                           help='Date de fin des calculs, YYYY-MM-DD (aujourd\'hui par défaut)')
+    bank_import = subparsers.add_parser('import',
+                                        help='Importer des relevés bancaires (CSV, OFX/QFX) dans un fichier utilisateur')
+    bank_import.add_argument('user_file', type=str,
+                             help='Fichier utilisateur data/<hash>.json')
+    bank_import.add_argument('statements', type=str, nargs='+',
+                             help='Relevés à importer')
+    bank_import.add_argument('--account', type=int, default=None,
+                             help='Compte de l\'application recevant les mouvements des relevés')
+    bank_import.add_argument('--account-map', type=str, action='append', default=[], metavar='NUMERO=ID',
+                             help='Compte de l\'application d\'un numéro de compte bancaire (répétable)')
+    bank_import.add_argument('--chunk-size', type=int, default=None,
+                             help='Nombre de lignes lues à la fois')
+    bank_import.add_argument('--transfer-window', type=int, default=None,
+                             help='Écart maximal en jours entre le débit et le crédit d\'un transfert')
+    bank_import.add_argument('--timezone', type=str, default=None,
+                             help='Fuseau de l\'application pour lire les dates du fichier utilisateur (Europe/Paris par défaut)')
+    bank_import.add_argument('--dry-run', action='store_true',
+                             help='Analyser les relevés sans modifier le fichier utilisateur')
+    
     return parser.parse_args()
 
+def report_profile(args):
+    """
+    Affiche les statistiques de profilage (--profile) et les écrit dans le fichier du journal (--profile-log)
+
+    Args:
+        args: Arguments de la ligne de commande
+    """
+    if not args.profile:
+        return
+    print(profiling.format_stats())
+    if args.profile_log:
+        # Import différé : la journalisation n'est chargée que si elle sert
+        from logging import get_logger
+        logger = get_logger()
+        started = logger.sink is None
+        sink = logger.start_sink()
+        profiling.log_stats()
+        if started:
+            logger.stop_sink()
+        else:
+            sink.flush()
+        print(f"Statistiques de profilage écrites dans {sink.active_path}")
+
 def main():
     """Point d'entrée principal du programme"""
     # Analyser les arguments
     args = parse_arguments()
     
+    if args.profile:
+        profiling.enable()
+    
+    # Recalcul en lot des soldes : tâche autonome, sans configuration Boursorama
+    if args.command == 'recompute':
+        from batch_recompute import recompute_all, print_progress
+        summary = recompute_all(args.data_dir, args.workers, args.chunk_size, args.end_date, progress=print_progress)
+        print(f"{summary['succeeded']}/{summary['users']} utilisateurs recalculés en {summary['seconds']:.1f} s")
+        for result in summary['results']:
+            if not result['ok']:
+                print(f"Échec : {result['path']} - {result['error']}")
+        report_profile(args)
+        return 1 if summary['failed'] else 0
+    
+    # Import de relevés bancaires : tâche autonome, sans configuration Boursorama
+    if args.command == 'import':
+        from bank_import import import_bank_files, DEFAULT_CHUNK_SIZE, DEFAULT_TIMEZONE, DEFAULT_TRANSFER_WINDOW_DAYS
+        account_map = {}
+        for entry in args.account_map:
+            number, _, account_id = entry.partition('=')
+            if not account_id.strip().lstrip('-').isdigit():
+                print(f"Correspondance de compte invalide : {entry} (attendu NUMERO=ID)")
+                return 2
+            account_map[number.strip()] = int(account_id)
+        try:
+            summary = import_bank_files(args.user_file, {path: args.account for path in args.statements},
+                                        account_map or None,
+                                        args.chunk_size or DEFAULT_CHUNK_SIZE,
+                                        DEFAULT_TRANSFER_WINDOW_DAYS if args.transfer_window is None else args.transfer_window,
+                                        dry_run=args.dry_run, timezone=args.timezone or DEFAULT_TIMEZONE)
+        except (OSError, ValueError) as e:
+            print(f"Échec de l'import : {e}")
+            return 1
+        print(f"{summary['rows']} lignes lues en {summary['seconds']:.1f} s : {summary['imported']} transactions "
+              f"{'à ajouter' if args.dry_run else 'ajoutées'}, {summary['duplicates']} doublons, "
+              f"{summary['rejected']} rejetées, {summary['transfers']} transferts")
+        report_profile(args)
+        return 0
+    
     # Définir le chemin de configuration
     config_path = args.config_path
     
@@ -58,7 +160,9 @@ def main():
     # if args.autre_option:
     #     # Traitement
     
+    report_profile(args)
+    
     print("Fin du programme.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
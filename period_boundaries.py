@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bornes des périodes mensuelles (calendaires ou financières)
+
+Module commun à utils_date et au calculateur de soldes. Les périodes sont repérées par
+leur mois d'ancrage, le mois dans lequel elles commencent, exprimé comme un indice de mois
+NumPy (0 = janvier 1970). En mode financier, une période commence le jour J du mois
+d'ancrage, ramené au dernier jour du mois si celui-ci est plus court, et se termine la
+veille du début de la période suivante. Le mode calendaire est le mode financier avec J = 1.
+"""
+
+from datetime import date
+from functools import lru_cache
+import numpy as np
+
+from profiling import profiled
+
+CALENDAR_MODES = ('calendar', 'calendaire')
+FINANCIAL_MODES = ('financial', 'financier')
+
+def normalize_period_mode(mode: str, start_day: int) -> tuple:
+    """
+    Valide le mode et le jour de début, et les ramène à une forme canonique.
+
+    Args:
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+
+    Returns:
+        tuple: (mode, start_day) avec mode valant 'calendar' ou 'financial'
+               et start_day valant 1 en mode calendaire
+    """
+    if mode in CALENDAR_MODES:
+        return ('calendar', 1)
+    if mode not in FINANCIAL_MODES:
+        raise ValueError(f"Mode de mois non supporté: {mode}")
+    if not 1 <= start_day <= 31:
+        raise ValueError("Le jour de début du mois financier doit être compris entre 1 et 31")
+    return ('financial', int(start_day))
+
+def month_index(year: int, month: int) -> int:
+    """Retourne l'indice de mois NumPy (0 = janvier 1970) d'un couple année/mois"""
+    return (year - 1970) * 12 + month - 1
+
+# Nombre de jours des mois d'une année non bissextile
+_MONTH_LENGTHS = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _month_length(year: int, month: int) -> int:
+    """Nombre de jours d'un mois"""
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MONTH_LENGTHS[month]
+
+def get_period_dates(mode: str, start_day: int, anchor_month: int) -> tuple:
+    """
+    Retourne le premier et le dernier jour d'une seule période, sans passer par NumPy.
+
+    Chemin direct des appels ponctuels : mêmes bornes que `get_period_boundaries` pour ce mois
+    d'ancrage, en quelques opérations sur des entiers.
+
+    Args:
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+        anchor_month (int): Indice du mois d'ancrage (voir `month_index`)
+
+    Returns:
+        tuple: (start_date, end_date) objets date
+    """
+    mode, start_day = normalize_period_mode(mode, start_day)
+    year, month = divmod(anchor_month, 12)
+    year += 1970
+    month += 1
+    start_date = date(year, month, min(start_day, _month_length(year, month)))
+
+    # Veille du début de la période suivante : dernier jour du mois d'ancrage si elle commence le 1er
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    next_start_day = min(start_day, _month_length(next_year, next_month))
+    if next_start_day == 1:
+        end_date = date(year, month, _month_length(year, month))
+    else:
+        end_date = date(next_year, next_month, next_start_day - 1)
+    return (start_date, end_date)
+
+@lru_cache(maxsize=512)
+def _boundaries(start_day: int, first_month: int, last_month: int) -> tuple:
+    """Calcule les bornes de toutes les périodes ancrées entre deux indices de mois (inclus)"""
+    # Un mois de plus que demandé pour obtenir la fin de la dernière période
+    months = np.arange(first_month, last_month + 2).astype('datetime64[M]')
+    month_starts = months.astype('datetime64[D]')
+    month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+
+    all_starts = month_starts + (np.minimum(start_day, month_lengths) - 1)
+    starts = all_starts[:-1]
+    ends = all_starts[1:] - np.timedelta64(1, 'D')
+
+    # Les tableaux sont partagés par le cache : on les protège en écriture
+    starts.setflags(write=False)
+    ends.setflags(write=False)
+
+    return (starts, ends)
+
+def get_period_boundaries(mode: str, start_day: int, first_month: int, last_month: int) -> tuple:
+    """
+    Retourne les bornes des périodes ancrées entre deux mois, en un seul appel.
+
+    Les résultats sont mémorisés par (mode, jour de début, plage) ; les tableaux retournés
+    sont en lecture seule.
+
+    Args:
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+        first_month (int): Indice du premier mois d'ancrage (voir `month_index`)
+        last_month (int): Indice du dernier mois d'ancrage, inclus
+
+    Returns:
+        tuple: (starts, ends) tableaux datetime64[D] du premier et du dernier jour de chaque période
+    """
+    mode, start_day = normalize_period_mode(mode, start_day)
+
+    if last_month < first_month:
+        empty = np.array([], dtype='datetime64[D]')
+        return (empty, empty)
+
+    return _boundaries(start_day, int(first_month), int(last_month))
+
+def get_anchor_month(value, mode: str, start_day: int) -> int:
+    """
+    Retourne l'indice du mois d'ancrage de la période contenant une date.
+
+    Args:
+        value (date | datetime): Date à situer
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+
+    Returns:
+        int: Indice du mois dans lequel commence la période contenant la date
+    """
+    mode, start_day = normalize_period_mode(mode, start_day)
+    anchor = month_index(value.year, value.month)
+
+    starts, _ = _boundaries(start_day, anchor, anchor)
+    if np.datetime64(date(value.year, value.month, value.day), 'D') < starts[0]:
+        anchor -= 1
+
+    return anchor
+
+@profiled()
+def get_period_boundaries_for_range(mode: str, start_day: int, start, end) -> tuple:
+    """
+    Retourne les bornes de toutes les périodes qui recouvrent l'intervalle [start, end].
+
+    Args:
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+        start (date | datetime): Début de l'intervalle
+        end (date | datetime): Fin de l'intervalle
+
+    Returns:
+        tuple: (starts, ends) tableaux datetime64[D], vides si start est postérieur à end
+    """
+    if start > end:
+        empty = np.array([], dtype='datetime64[D]')
+        return (empty, empty)
+
+    return get_period_boundaries(
+        mode,
+        start_day,
+        get_anchor_month(start, mode, start_day),
+        get_anchor_month(end, mode, start_day)
+    )
+
+@profiled()
+def get_period_containing(value, mode: str, start_day: int) -> tuple:
+    """
+    Retourne le premier et le dernier jour de la période contenant une date.
+
+    Args:
+        value (date | datetime): Date à situer
+        mode (str): 'calendar'/'calendaire' ou 'financial'/'financier'
+        start_day (int): Jour de début du mois financier (1-31)
+
+    Returns:
+        tuple: (start_date, end_date) objets date
+    """
+    anchor = get_anchor_month(value, mode, start_day)
+    starts, ends = get_period_boundaries(mode, start_day, anchor, anchor)
+    return (starts[0].item(), ends[0].item())
@@ -0,0 +1,245 @@
+# profiling.py
+# Ce module mesure le temps passé dans les fonctions critiques (calcul des soldes, dates, cache, journalisation).
+
+import time
+import functools
+import threading
+from typing import Callable, Dict, Optional
+
+# Les durées sont rangées par puissance de deux de nanosecondes : l'indice b couvre [2^(b-1), 2^b[
+_BUCKET_COUNT = 64
+
+class _ProfilingState:
+    """Interrupteur global des mesures (désactivées par défaut)"""
+    __slots__ = ("enabled",)
+
+    def __init__(self):
+        self.enabled = False
+
+_state = _ProfilingState()
+
+class LatencyHistogram:
+    """
+    Histogramme des durées d'appel d'une fonction, en classes logarithmiques (base 2).
+
+    Enregistrer une durée ne coûte qu'un calcul de bit_length et une incrémentation ; les
+    percentiles sont estimés par interpolation dans la classe qui les contient.
+    """
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * _BUCKET_COUNT
+
+    def record(self, duration_ns: int) -> None:
+        """Ajoute une durée (en nanosecondes)"""
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.buckets[min(duration_ns.bit_length(), _BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """
+        Estime le q-ième percentile des durées
+
+        Args:
+            q: Percentile recherché (0-100)
+
+        Returns:
+            Durée estimée en nanosecondes (0 si aucune mesure)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                low = 0 if bucket == 0 else 2 ** (bucket - 1)
+                high = 2 ** bucket
+                estimate = low + (high - low) * (rank - seen) / bucket_count
+                return float(min(max(estimate, self.min_ns), self.max_ns))
+            seen += bucket_count
+        return float(self.max_ns)
+
+    def summary(self) -> Dict[str, float]:
+        """Résumé des mesures, durées en microsecondes"""
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "min_us": (self.min_ns or 0) / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max_ns / 1e3
+        }
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_lock = threading.Lock()
+
+def enable() -> None:
+    """Active les mesures"""
+    _state.enabled = True
+
+def disable() -> None:
+    """Désactive les mesures (les statistiques déjà collectées sont conservées)"""
+    _state.enabled = False
+
+def is_enabled() -> bool:
+    """Indique si les mesures sont actives"""
+    return _state.enabled
+
+def record(name: str, duration_ns: int) -> None:
+    """
+    Enregistre une durée pour un point de mesure
+
+    Args:
+        name: Nom du point de mesure (ex: 'balance_calculator.calculate_monthly_balances')
+        duration_ns: Durée en nanosecondes
+    """
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(name, LatencyHistogram())
+    histogram.record(duration_ns)
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """
+    Décorateur mesurant chaque appel de la fonction décorée lorsque les mesures sont actives
+
+    Désactivé, il ne coûte qu'un test de l'interrupteur global par appel.
+
+    Args:
+        name: Nom du point de mesure (par défaut 'module.fonction')
+
+    Returns:
+        Le décorateur
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+class profile_block:
+    """
+    Gestionnaire de contexte mesurant un bloc de code lorsque les mesures sont actives
+
+    Exemple :
+        with profile_block("balance_calculator.assign_periods"):
+            ...
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = None
+
+    def __enter__(self) -> "profile_block":
+        if _state.enabled:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._start is not None:
+            record(self.name, time.perf_counter_ns() - self._start)
+            self._start = None
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Retourne les statistiques de chaque point de mesure
+
+    Returns:
+        Dictionnaire nom -> résumé (count, total_ms, mean_us, min_us, p50_us, p99_us, max_us)
+    """
+    with _lock:
+        histograms = dict(_histograms)
+    return {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+
+def export_histograms() -> Dict[str, tuple]:
+    """
+    Retourne les histogrammes bruts, sérialisables, pour les fusionner dans un autre processus
+
+    Returns:
+        Dictionnaire nom -> (count, total_ns, min_ns, max_ns, buckets)
+    """
+    with _lock:
+        histograms = dict(_histograms)
+    return {name: (histogram.count, histogram.total_ns, histogram.min_ns, histogram.max_ns, list(histogram.buckets))
+            for name, histogram in histograms.items()}
+
+def merge_histograms(exported: Dict[str, tuple]) -> None:
+    """
+    Ajoute aux statistiques de ce processus des histogrammes exportés par export_histograms
+
+    Args:
+        exported: Histogrammes d'un autre processus (processus de travail d'un lot, par exemple)
+    """
+    with _lock:
+        for name, (count, total_ns, min_ns, max_ns, buckets) in exported.items():
+            if not count:
+                continue
+            histogram = _histograms.setdefault(name, LatencyHistogram())
+            histogram.count += count
+            histogram.total_ns += total_ns
+            if histogram.min_ns is None or min_ns < histogram.min_ns:
+                histogram.min_ns = min_ns
+            histogram.max_ns = max(histogram.max_ns, max_ns)
+            histogram.buckets = [a + b for a, b in zip(histogram.buckets, buckets)]
+
+def reset_stats() -> None:
+    """Efface toutes les statistiques collectées"""
+    with _lock:
+        _histograms.clear()
+
+def format_stats(stats: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """
+    Met en forme les statistiques sous forme de tableau, triées par temps total décroissant
+
+    Returns:
+        Tableau texte
+    """
+    stats = get_stats() if stats is None else stats
+    if not stats:
+        return "Aucune mesure enregistrée."
+
+    header = f"{'Fonction':<60} {'Appels':>9} {'Total ms':>11} {'Moy. µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'Max µs':>10}"
+    lines = [header, "-" * len(header)]
+    for name, summary in sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        lines.append(
+            f"{name:<60} {summary['count']:>9} {summary['total_ms']:>11.3f} {summary['mean_us']:>10.1f} "
+            f"{summary['p50_us']:>10.1f} {summary['p99_us']:>10.1f} {summary['max_us']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+def log_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Écrit les statistiques dans le journal (champ additional_data d'une entrée INFO)
+
+    Returns:
+        Les statistiques écrites
+    """
+    # Import différé : le module de journalisation est lui-même instrumenté
+    from logging import info
+
+    stats = get_stats()
+    info("Statistiques de profilage (%s points de mesure)", len(stats), module="profiling", additional_data=stats)
+    return stats
@@ -0,0 +1,66 @@
+import csv
+import gzip
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.accounting_journal import (JOURNAL_COLUMNS, JournalCategory, JournalEntryName, export_journal,
+                                          iter_journal_rows)
+from functions.balance_calculator import calculate_monthly_balances_reference
+
+def _transactions(count=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.6, 0.1])
+    account_ids = rng.integers(1, 3, count)
+    return pd.DataFrame({
+        'Id': np.arange(1, count + 1),
+        'Date': pd.to_datetime(np.datetime64('2023-01-01') + rng.integers(0, 2 * 365, count)),
+        'Amount': np.round(rng.uniform(0.01, 600, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 2 + 1, account_ids).astype(float),
+        'Category': rng.choice(['fixed', 'current', 'exceptional'], count),
+    })
+
+@pytest.mark.parametrize("month_mode, financial_month_day, account_id", [('calendar', 1, None), ('financial', 25, 1)])
+def test_expected_balances_match_monthly_reference(month_mode, financial_month_day, account_id):
+    transactions = _transactions()
+    args = (datetime(2023, 1, 1), 150.0, month_mode, financial_month_day, datetime(2024, 12, 31), account_id)
+    rows = pd.DataFrame(list(iter_journal_rows(transactions, *args)), columns=JOURNAL_COLUMNS)
+    expected = calculate_monthly_balances_reference(transactions, *args)
+
+    closings = rows[rows['Name'] == JournalEntryName.EXPECTED_BALANCE]
+    assert closings['YearMonth'].tolist() == expected.index.tolist()
+    np.testing.assert_allclose(closings['Balance'].to_numpy(dtype=float), expected.to_numpy(), rtol=0, atol=1e-6)
+
+    # Le solde courant du dernier mouvement de chaque période est le solde prévu de fin de mois
+    movements = rows[~rows['IsCalculated']]
+    last_running = movements.groupby('YearMonth')['Balance'].last()
+    np.testing.assert_allclose(last_running.to_numpy(dtype=float),
+                               closings.set_index('YearMonth')['Balance'].loc[last_running.index].to_numpy(dtype=float),
+                               rtol=0, atol=1e-6)
+    assert movements['Date'].is_monotonic_increasing
+    assert set(movements['Category']) <= {JournalCategory.INCOME, JournalCategory.FIXED_EXPENSE,
+                                          JournalCategory.CURRENT_EXPENSE, JournalCategory.EXCEPTIONAL_EXPENSE}
+
+def test_export_formats(tmp_path):
+    transactions = _transactions(count=200, seed=1)
+    args = (transactions, datetime(2023, 1, 1), 0.0, 'calendar', 1, datetime(2024, 12, 31), 2)
+    rows = list(iter_journal_rows(*args))
+
+    csv_count = export_journal(str(tmp_path / "journal.csv.gz"), *args)
+    with gzip.open(tmp_path / "journal.csv.gz", 'rt', encoding='utf-8', newline='') as f:
+        written = list(csv.reader(f))
+    assert csv_count == len(rows) and written[0] == list(JOURNAL_COLUMNS) and len(written) == len(rows) + 1
+
+    ndjson_count = export_journal(str(tmp_path / "journal.ndjson"), *args)
+    with open(tmp_path / "journal.ndjson", encoding='utf-8') as f:
+        objects = [json.loads(line) for line in f]
+    assert ndjson_count == len(rows)
+    assert [tuple(o[column] for column in JOURNAL_COLUMNS) for o in objects] == rows
+
+    with pytest.raises(ValueError):
+        export_journal(str(tmp_path / "journal.xml"), *args, format='xml')
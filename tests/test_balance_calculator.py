@@ -0,0 +1,145 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.balance_calculator import (calculate_all_accounts_balances, calculate_monthly_balances,
+                                          calculate_monthly_balances_reference, calculate_monthly_balances_with_adjustments,
+                                          from_cents, to_cents)
+from functions.transaction_store import TransactionStore
+
+def _transactions(count=2000, seed=0):
+    """Transactions aléatoires sur trois comptes, dont des transferts et des dates en fin de mois"""
+    rng = np.random.default_rng(seed)
+    days = np.datetime64('2022-01-01') + rng.integers(0, 3 * 365, count)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.6, 0.1])
+    account_ids = rng.integers(1, 4, count)
+    return pd.DataFrame({
+        'Id': np.arange(1, count + 1),
+        'Date': pd.to_datetime(days),
+        'Amount': np.round(rng.uniform(0.01, 2000, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 3 + 1, account_ids).astype(float),
+    })
+
+@pytest.mark.parametrize("month_mode, financial_month_day", [
+    ('calendar', 1), ('financial', 1), ('financial', 15), ('financial', 29), ('financial', 31)
+])
+@pytest.mark.parametrize("account_id", [None, 1, 2])
+def test_vectorized_engine_matches_reference(month_mode, financial_month_day, account_id):
+    transactions = _transactions()
+    args = (datetime(2022, 2, 10), 1500.0, month_mode, financial_month_day, datetime(2024, 12, 31), account_id)
+
+    expected = calculate_monthly_balances_reference(transactions, *args)
+    result = calculate_monthly_balances(transactions, *args)
+
+    assert result.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
+
+def test_store_and_fixed_point_match_reference():
+    transactions = _transactions(seed=1)
+    args = (datetime(2022, 1, 1), 0.0, 'financial', 25, datetime(2024, 12, 31), 3)
+    expected = calculate_monthly_balances_reference(transactions, *args)
+
+    records = [{"id": int(row.Id), "date": row.Date.strftime('%Y-%m-%dT%H:%M:%S.000Z'), "amount": row.Amount,
+                "type": row.Type, "accountId": int(row.AccountId), "toAccountId": int(row.ToAccountId)}
+               for row in transactions.itertuples()]
+    from_store = calculate_monthly_balances(TransactionStore.from_records(records), *args)
+    in_cents = calculate_monthly_balances(transactions, *args, fixed_point=True)
+
+    np.testing.assert_allclose(from_store.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
+    assert in_cents.tolist() == np.round(expected.to_numpy() * 100).astype(np.int64).tolist()
+
+def test_store_reads_local_days():
+    records = [{"id": 1, "date": "2025-03-01T23:00:00.000Z", "amount": 10.0, "type": "income", "accountId": 1},
+               {"id": 2, "date": "2025-07-01T22:00:00.000Z", "amount": 5.0, "type": "expense", "accountId": 1},
+               {"id": 3, "date": "2025-03-05", "amount": 1.0, "type": "expense", "accountId": 1}]
+    store = TransactionStore.from_records(records)
+
+    assert store.days.astype('datetime64[D]').astype(str).tolist() == ['2025-03-02', '2025-03-05', '2025-07-02']
+    assert TransactionStore.from_records(records, 'UTC').days.astype('datetime64[D]').astype(str).tolist() == \
+        ['2025-03-01', '2025-03-05', '2025-07-01']
+
+def _adjusted_reference(balances: pd.Series, adjustments: list) -> list:
+    """Recalage mois par mois : chaque ajustement fixe son mois et décale les suivants jusqu'au prochain"""
+    anchors = dict(adjustments)
+    offset = 0.0
+    adjusted = []
+    for month_key, balance in balances.items():
+        if month_key in anchors:
+            offset = anchors[month_key] - balance
+        adjusted.append(balance + offset)
+    return adjusted
+
+def test_adjustments_anchor_later_months():
+    transactions = _transactions(seed=2)
+    args = (datetime(2022, 1, 1), 500.0, 'financial', 10, datetime(2024, 12, 31))
+    adjustments = pd.DataFrame({
+        'YearMonth': ['2022-06', '2023-01', '2023-01', '2024-03', '2030-01', '2023-05'],
+        'AccountId': [1, 1, 1, 1, 1, 2],
+        'AdjustedBalance': [1000.0, -50.0, 250.0, 0.0, 99.0, 7.0],
+    })
+    # Pour un même mois et un même compte, le dernier ajustement l'emporte ; hors grille, il est ignoré
+    expected = _adjusted_reference(calculate_monthly_balances_reference(transactions, *args, 1),
+                                   [('2022-06', 1000.0), ('2023-01', 250.0), ('2024-03', 0.0)])
+
+    result = calculate_monthly_balances_with_adjustments(transactions, *args, 1, adjustments)
+    in_cents = calculate_monthly_balances_with_adjustments(transactions, *args, 1, adjustments, fixed_point=True)
+    accounts = pd.DataFrame({'AccountId': [1, 2], 'CreationDate': [args[0], args[0]], 'InitialBalance': [500.0, 500.0]})
+    all_accounts = calculate_all_accounts_balances(transactions, accounts, *args[2:], balance_adjustments=adjustments)
+
+    np.testing.assert_allclose(result.to_numpy(), expected, rtol=0, atol=1e-6)
+    assert in_cents.tolist() == np.round(np.array(expected) * 100).astype(np.int64).tolist()
+    np.testing.assert_allclose(all_accounts[1].to_numpy(), expected, rtol=0, atol=1e-6)
+    assert all_accounts.loc['2023-05', 2] == 7.0
+
+@pytest.mark.parametrize("month_mode, financial_month_day", [('calendar', 1), ('financial', 28)])
+def test_cents_match_rounded_float_balances(month_mode, financial_month_day):
+    transactions = _transactions(seed=3)
+    args = (month_mode, financial_month_day, datetime(2024, 12, 31))
+    accounts = pd.DataFrame({'AccountId': [1, 2, 3],
+                             'CreationDate': [datetime(2022, 1, 1), datetime(2022, 7, 14), datetime(2023, 2, 1)],
+                             'InitialBalance': [100.0, 0.35, -20.1]})
+
+    in_float = calculate_all_accounts_balances(transactions, accounts, *args)
+    in_cents = calculate_all_accounts_balances(transactions, accounts, *args, fixed_point=True)
+
+    assert (in_cents.isna().to_numpy() == in_float.isna().to_numpy()).all()
+    for account_id in accounts['AccountId']:
+        created = in_float[account_id].notna()
+        expected = np.round(in_float.loc[created, account_id].to_numpy() * 100).astype(np.int64)
+        assert in_cents.loc[created, account_id].astype(np.int64).tolist() == expected.tolist()
+
+def test_cents_stay_exact_where_floats_drift():
+    transactions = pd.DataFrame({'Date': pd.to_datetime(['2024-01-05'] * 1000), 'Amount': [0.1] * 1000,
+                                 'Type': ['income'] * 1000, 'AccountId': [1] * 1000})
+    args = (datetime(2024, 1, 1), 0.0, 'calendar', 1, datetime(2024, 2, 29), 1)
+
+    in_float = calculate_monthly_balances(transactions, *args)
+    in_cents = calculate_monthly_balances(transactions, *args, fixed_point=True)
+
+    assert in_float.iloc[0] != 100.0
+    assert in_cents.tolist() == [10000, 10000]
+    assert from_cents(in_cents.to_numpy()).tolist() == [100.0, 100.0]
+    assert to_cents([0.1, 19.99, -2.5, np.nan]).tolist() == [10, 1999, -250, 0]
+
+@pytest.mark.parametrize("month_mode, financial_month_day", [('calendar', 1), ('financial', 20)])
+def test_all_accounts_matrix_matches_reference_per_account(month_mode, financial_month_day):
+    transactions = _transactions(seed=4)
+    end_date = datetime(2024, 12, 31)
+    accounts = pd.DataFrame({'AccountId': [1, 2, 3, 4],
+                             'CreationDate': [datetime(2022, 1, 1), datetime(2022, 5, 1), datetime(2023, 8, 1),
+                                              datetime(2025, 3, 1)],
+                             'InitialBalance': [10.0, 200.0, -35.5, 1.0]})
+
+    matrix = calculate_all_accounts_balances(transactions, accounts, month_mode, financial_month_day, end_date)
+
+    assert matrix.columns.tolist() == [1, 2, 3, 4] and matrix[4].isna().all()
+    for account in accounts.iloc[:3].itertuples():
+        expected = calculate_monthly_balances_reference(transactions, account.CreationDate, account.InitialBalance,
+                                                        month_mode, financial_month_day, end_date, account.AccountId)
+        column = matrix[account.AccountId].dropna()
+        assert column.index.tolist() == expected.index.tolist()
+        np.testing.assert_allclose(column.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
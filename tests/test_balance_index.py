@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.balance_calculator import build_period_grid, calculate_all_accounts_balances, calculate_monthly_balances
+from functions.balance_index import BalanceIndex
+
+_ACCOUNTS = pd.DataFrame({'AccountId': [1, 2, 3],
+                          'CreationDate': [datetime(2022, 1, 1), datetime(2022, 6, 1), datetime(2023, 3, 1)],
+                          'InitialBalance': [1000.0, 0.0, 250.5]})
+
+def _accounts(period_starts):
+    """Comptes créés en début de période : la matrice mensuelle et l'index comptent alors les mêmes mouvements"""
+    return _ACCOUNTS.assign(CreationDate=pd.to_datetime(period_starts[[0, 5, 14]]))
+
+def _transactions(count=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.55, 0.15])
+    account_ids = rng.integers(1, 4, count)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(np.datetime64('2022-01-01') + rng.integers(0, 3 * 365, count)),
+        'Amount': np.round(rng.uniform(0.01, 800, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 3 + 1, account_ids).astype(float),
+    })
+
+@pytest.mark.parametrize("month_mode, financial_month_day", [('calendar', 1), ('financial', 1), ('financial', 15)])
+@pytest.mark.parametrize("fixed_point", [False, True])
+def test_period_end_balances_match_all_accounts_matrix(month_mode, financial_month_day, fixed_point):
+    transactions = _transactions()
+    end_date = datetime(2024, 12, 31)
+    period_starts, period_ends, month_keys = build_period_grid(datetime(2022, 1, 1), month_mode, financial_month_day,
+                                                               end_date)
+    accounts = _accounts(period_starts)
+    expected = calculate_all_accounts_balances(transactions, accounts, month_mode, financial_month_day, end_date,
+                                               fixed_point=fixed_point)
+
+    index = BalanceIndex.from_transactions(transactions, accounts, fixed_point)
+
+    assert month_keys == expected.index.tolist()
+    for account_id in accounts['AccountId']:
+        result = pd.array(index.balances_at(period_ends, account_id))
+        column = pd.array(expected[account_id])
+        assert (pd.isna(result) == pd.isna(column)).all()
+        created = ~pd.isna(column)
+        np.testing.assert_allclose(np.asarray(result[created], dtype=float), np.asarray(column[created], dtype=float),
+                                   rtol=0, atol=1e-6)
+
+def test_all_accounts_view_matches_monthly_balances():
+    transactions = _transactions(seed=1)
+    end_date = datetime(2024, 12, 31)
+    expected = calculate_monthly_balances(transactions, datetime(2022, 1, 1), _ACCOUNTS['InitialBalance'].sum(),
+                                          'financial', 25, end_date)
+    _, period_ends, _ = build_period_grid(datetime(2022, 1, 1), 'financial', 25, end_date)
+
+    index = BalanceIndex.from_transactions(transactions, _ACCOUNTS)
+
+    np.testing.assert_allclose(index.balances_at(period_ends), expected.to_numpy(), rtol=0, atol=1e-6)
+
+def test_append_out_of_order_matches_single_pass():
+    transactions = _transactions(seed=2)
+    single = BalanceIndex.from_transactions(transactions, _ACCOUNTS, fixed_point=True)
+    chunked = BalanceIndex(_ACCOUNTS, fixed_point=True)
+    shuffled = transactions.sample(frac=1, random_state=0)
+    for start in range(0, len(shuffled), 700):
+        chunked.append(shuffled.iloc[start:start + 700])
+
+    days = pd.date_range('2021-12-01', '2025-01-31', freq='6D').to_numpy()
+    creation_dates = dict(zip(_ACCOUNTS['AccountId'], _ACCOUNTS['CreationDate']))
+    creation_dates[None] = _ACCOUNTS['CreationDate'].min()
+    for account_id, creation_date in creation_dates.items():
+        balances = pd.array(chunked.balances_at(days, account_id))
+        assert balances.tolist() == pd.array(single.balances_at(days, account_id)).tolist()
+
+        # Flux entre deux dates = écart des soldes, une fois le compte créé
+        flows = chunked.net_flows(days[:-1] + np.timedelta64(1, 'D'), days[1:], account_id)
+        created = days[:-1] >= np.datetime64(creation_date)
+        assert flows[created].tolist() == np.diff(np.asarray(balances.fillna(0), dtype=np.int64))[created].tolist()
+    assert len(chunked) == len(single)
+
+def test_unknown_account_is_rejected():
+    with pytest.raises(ValueError):
+        BalanceIndex(_ACCOUNTS).balance_at('2023-01-01', 99)
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.balance_calculator import calculate_monthly_balances_reference
+from functions.balance_ledger import BalanceLedger
+
+_ARGS = (datetime(2023, 1, 1), 250.0, 'financial', 25, datetime(2024, 12, 31))
+
+def _transactions(count=400, seed=0):
+    """Transactions aléatoires sur trois comptes, dont des transferts"""
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.6, 0.1])
+    account_ids = rng.integers(1, 4, count)
+    return pd.DataFrame({
+        'Id': np.arange(1, count + 1),
+        'Date': pd.to_datetime(np.datetime64('2023-01-01') + rng.integers(0, 2 * 365, count)),
+        'Amount': np.round(rng.uniform(0.01, 500, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 3 + 1, account_ids).astype(float),
+    })
+
+@pytest.mark.parametrize("account_id", [None, 2])
+def test_incremental_edits_match_reference(account_id):
+    transactions = _transactions()
+    ledger = BalanceLedger.from_dataframe(transactions.iloc[:300], *_ARGS, account_id)
+
+    # Ajouts, modifications (dont changements de période et de compte) et suppressions
+    for row in transactions.iloc[300:].itertuples():
+        ledger.add_transaction(row.Id, row.Date, row.Amount, row.Type, row.AccountId, row.ToAccountId)
+    edited = transactions.copy()
+    for position in range(0, 400, 7):
+        edited.loc[position, ['Date', 'Amount', 'AccountId']] = [pd.Timestamp('2024-06-15'), 42.5, 3]
+        row = edited.loc[position]
+        ledger.update_transaction(row.Id, row.Date, row.Amount, row.Type, row.AccountId, row.ToAccountId)
+    for transaction_id in edited['Id'].iloc[::11].tolist():
+        ledger.delete_transaction(transaction_id)
+    edited = edited[~edited['Id'].isin(edited['Id'].iloc[::11])]
+
+    expected = calculate_monthly_balances_reference(edited, *_ARGS, account_id)
+    result = ledger.to_series()
+
+    assert result.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
+
+def test_fixed_point_ledger_is_exact():
+    transactions = _transactions(seed=1)
+    ledger = BalanceLedger.from_dataframe(transactions, *_ARGS, 1, fixed_point=True)
+    ledger.add_transaction(10_000, datetime(2023, 3, 1), 0.1, 'income', 1)
+    ledger.add_transaction(10_001, datetime(2023, 3, 2), 0.2, 'income', 1)
+    ledger.delete_transaction(10_000)
+
+    expected = calculate_monthly_balances_reference(
+        pd.concat([transactions, pd.DataFrame({'Id': [10_001], 'Date': [pd.Timestamp('2023-03-02')], 'Amount': [0.2],
+                                               'Type': ['income'], 'AccountId': [1], 'ToAccountId': [np.nan]})]),
+        *_ARGS, 1)
+
+    assert ledger.to_series().tolist() == np.round(expected.to_numpy() * 100).astype(np.int64).tolist()
+
+def test_unknown_or_duplicate_ids_are_rejected():
+    ledger = BalanceLedger.from_dataframe(_transactions(count=10), *_ARGS)
+    with pytest.raises(ValueError):
+        ledger.add_transaction(1, datetime(2023, 5, 1), 1.0, 'income', 1)
+    with pytest.raises(ValueError):
+        ledger.update_transaction(99, datetime(2023, 5, 1), 1.0, 'income', 1)
+    with pytest.raises(ValueError):
+        ledger.delete_transaction(99)
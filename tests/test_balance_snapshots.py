@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import balance_snapshots
+from balance_snapshots import load_or_compute_monthly_balances, load_snapshot, save_snapshot
+from functions.balance_calculator import calculate_monthly_balances_reference
+
+_ARGS = (datetime(2023, 1, 1), 100.0, 'financial', 25)
+
+def _transactions(count=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(np.datetime64('2023-01-01') + rng.integers(0, 700, count)),
+        'Amount': np.round(rng.uniform(0.01, 500, count), 2),
+        'Type': rng.choice(['income', 'expense'], count),
+        'AccountId': rng.integers(1, 3, count),
+    })
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Compte les recalculs effectifs de load_or_compute_monthly_balances"""
+    calls = []
+    original = balance_snapshots.calculate_monthly_balances
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(balance_snapshots, "calculate_monthly_balances", counting)
+    return calls
+
+@pytest.mark.parametrize("values", [np.array([1.5, -2.25, 3.0]), np.array([150, -225, 300], dtype=np.int64)])
+def test_round_trip(tmp_path, values):
+    path = str(tmp_path / "s.mbsnap")
+    balances = pd.Series(values, index=['2023-11', '2023-12', '2024-01'])
+    save_snapshot(path, balances, "abc")
+
+    loaded = load_snapshot(path, "abc")
+    assert loaded.index.tolist() == balances.index.tolist()
+    assert loaded.dtype == values.dtype and loaded.tolist() == values.tolist()
+    assert load_snapshot(path, "autre") is None
+
+def test_corrupted_or_missing_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "s.mbsnap"
+    assert load_snapshot(str(path)) is None
+    path.write_bytes(b"not a snapshot")
+    assert load_snapshot(str(path)) is None
+
+def test_snapshot_matches_reference_and_is_invalidated(tmp_path, computed):
+    transactions = _transactions()
+    end_date = datetime(2024, 11, 30)
+    expected = calculate_monthly_balances_reference(transactions, *_ARGS, end_date, 1)
+
+    first = load_or_compute_monthly_balances("u", transactions, *_ARGS, end_date, 1, data_dir=str(tmp_path))
+    again = load_or_compute_monthly_balances("u", transactions, *_ARGS, datetime(2024, 12, 20), 1,
+                                             data_dir=str(tmp_path))
+    assert len(computed) == 1
+    np.testing.assert_allclose(first.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
+    assert again.tolist() == first.tolist()
+
+    # Transaction modifiée : l'empreinte change et les soldes sont recalculés
+    transactions.loc[0, 'Amount'] += 1
+    changed = load_or_compute_monthly_balances("u", transactions, *_ARGS, end_date, 1, data_dir=str(tmp_path))
+    assert len(computed) == 2
+    np.testing.assert_allclose(changed.to_numpy(),
+                               calculate_monthly_balances_reference(transactions, *_ARGS, end_date, 1).to_numpy(),
+                               rtol=0, atol=1e-6)
+
+    # Nouvelle période de fin : recalcul
+    load_or_compute_monthly_balances("u", transactions, *_ARGS, datetime(2024, 12, 26), 1, data_dir=str(tmp_path))
+    assert len(computed) == 3
+
+def test_data_version_skips_loading_transactions(tmp_path, computed):
+    transactions = _transactions(seed=1)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return transactions
+
+    end_date = datetime(2024, 11, 30)
+    first = load_or_compute_monthly_balances("u", loader, *_ARGS, end_date, data_dir=str(tmp_path), data_version="1:10")
+    again = load_or_compute_monthly_balances("u", loader, *_ARGS, end_date, data_dir=str(tmp_path), data_version="1:10")
+    assert len(loads) == 1 and again.tolist() == first.tolist()
+
+    load_or_compute_monthly_balances("u", loader, *_ARGS, end_date, data_dir=str(tmp_path), data_version="2:10")
+    assert len(loads) == 2 and len(computed) == 2
@@ -0,0 +1,87 @@
+import csv
+import json
+
+import pandas as pd
+import pytest
+
+from bank_import import _parse_amounts, import_bank_files
+from functions.user_data_reader import read_user_section
+
+def _write_user_file(path, transactions):
+    """Fichier utilisateur minimal avec deux comptes"""
+    user = {
+        "username": "test", "passwordHash": "x", "salt": "s", "createdAt": "2025-01-01T00:00:00.000Z",
+        "data": {
+            "accounts": [
+                {"id": 1, "name": "Courant", "initialBalance": 0, "createdAt": "2025-01-01T00:00:00.000Z"},
+                {"id": 2, "name": "Livret", "initialBalance": 0, "createdAt": "2025-01-01T00:00:00.000Z"}
+            ],
+            "transactions": transactions,
+            "recurringTransactions": [],
+            "preferences": {}
+        }
+    }
+    path.write_text(json.dumps(user, indent=2), encoding="utf-8")
+
+def _write_csv(path, header, rows, delimiter=";"):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+@pytest.mark.parametrize("values, expected", [
+    (["-1 234,56 €", "1.234,56", "-12,50"], [-1234.56, 1234.56, -12.5]),
+    (["-1,234.56", "2,000.00", "12.50"], [-1234.56, 2000.0, 12.5]),
+    (["1,234", "-12,50"], [1.234, -12.5]),
+    (["1,234", "12.50"], [1234.0, 12.5]),
+])
+def test_parse_amounts_decimal_separator(values, expected):
+    assert _parse_amounts(pd.Series(values)).tolist() == pytest.approx(expected)
+
+def test_parse_amounts_rejects_ambiguous_values():
+    amounts = _parse_amounts(pd.Series(["1,234", "1.234", "12", "1.2.3"]))
+    assert amounts.isna().tolist() == [True, True, False, True]
+
+def test_english_export_amounts(tmp_path):
+    user_path = tmp_path / "user.json"
+    statement = tmp_path / "statement.csv"
+    _write_user_file(user_path, [])
+    _write_csv(statement, ["Transaction Date", "Amount", "Description"],
+               [["2025-03-02", "-1,234.56", "Rent"], ["2025-03-03", "2,000.00", "Salary"]], delimiter=",")
+
+    summary = import_bank_files(str(user_path), {str(statement): 1})
+
+    assert summary["imported"] == 2
+    transactions = read_user_section(str(user_path), "transactions")
+    assert [(t["type"], t["amount"]) for t in transactions] == [("expense", 1234.56), ("income", 2000.0)]
+
+def test_dedup_uses_local_day_of_app_dates(tmp_path):
+    # Saisie dans l'application le 02/03 à Paris : minuit local enregistré en UTC par toISOString()
+    user_path = tmp_path / "user.json"
+    statement = tmp_path / "releve.csv"
+    _write_user_file(user_path, [{"id": 1, "accountId": 1, "amount": 12.5, "type": "expense",
+                                  "description": "Boulangerie", "date": "2025-03-01T23:00:00.000Z"}])
+    _write_csv(statement, ["Date", "Libellé", "Montant"],
+               [["02/03/2025", "Boulangerie", "-12,50"], ["03/03/2025", "Boulangerie", "-12,50"]])
+
+    summary = import_bank_files(str(user_path), {str(statement): 1}, timezone="Europe/Paris")
+
+    assert summary["duplicates"] == 1
+    assert summary["imported"] == 1
+    assert [t["date"][:10] for t in read_user_section(str(user_path), "transactions")] == ["2025-03-01", "2025-03-03"]
+
+def test_reimport_is_idempotent(tmp_path):
+    user_path = tmp_path / "user.json"
+    statement = tmp_path / "releve.csv"
+    _write_user_file(user_path, [])
+    # Deux cafés identiques le même jour, et un virement du courant vers le livret crédité la veille
+    _write_csv(statement, ["Date", "Libellé", "Montant", "Compte"],
+               [["10/02/2025", "Café", "-2,10", "C1"], ["10/02/2025", "Café", "-2,10", "C1"],
+                ["11/02/2025", "VIR LIVRET", "-300,00", "C1"], ["10/02/2025", "VIR COURANT", "300,00", "L2"]])
+    account_map = {"C1": 1, "L2": 2}
+
+    first = import_bank_files(str(user_path), {str(statement): None}, account_map)
+    second = import_bank_files(str(user_path), {str(statement): None}, account_map)
+
+    assert (first["imported"], first["transfers"]) == (3, 1)
+    assert (second["imported"], second["duplicates"]) == (0, 4)
@@ -0,0 +1,61 @@
+import hashlib
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from balance_snapshots import load_snapshot, snapshot_path
+from batch_recompute import recompute_all
+from functions.balance_calculator import calculate_monthly_balances_reference
+
+_END_DATE = datetime(2024, 12, 31)
+
+def _user_file(data_dir, name, seed, financial=False):
+    """Écrit un fichier utilisateur data/<hash>.json aux dates enregistrées comme par l'application (minuit local en UTC)"""
+    rng = np.random.default_rng(seed)
+    days = np.datetime64('2024-01-01') + rng.integers(0, 366, 300)
+    types = rng.choice(['income', 'expense', 'transfer'], 300, p=[0.3, 0.6, 0.1])
+    transactions = [{"id": i + 1, "date": f"{day - np.timedelta64(1, 'D')}T23:00:00.000Z", "amount": float(amount),
+                     "type": str(kind), "accountId": int(account), "toAccountId": int(account % 2 + 1) if kind == 'transfer' else None}
+                    for i, (day, amount, kind, account) in enumerate(zip(days, np.round(rng.uniform(1, 500, 300), 2), types,
+                                                                        rng.integers(1, 3, 300)))]
+    user = {"username": name, "data": {
+        "accounts": [{"id": 1, "createdAt": "2023-12-31T23:00:00.000Z", "initialBalance": 100.0},
+                     {"id": 2, "createdAt": "2024-03-14T23:00:00.000Z", "initialBalance": 0.0}],
+        "transactions": transactions,
+        "preferences": {"useFinancialMonth": financial, "financialMonthStartDay": 15},
+    }}
+    path = data_dir / f"{hashlib.md5(name.encode()).hexdigest()}.json"
+    path.write_text(json.dumps(user), encoding='utf-8')
+    frame = pd.DataFrame({'Date': pd.to_datetime(days), 'Amount': [t["amount"] for t in transactions], 'Type': types,
+                          'AccountId': [t["accountId"] for t in transactions],
+                          'ToAccountId': [np.nan if t["toAccountId"] is None else t["toAccountId"] for t in transactions]})
+    return path, frame
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_recompute_all_matches_reference(tmp_path, workers):
+    users = [_user_file(tmp_path, "alice", 0), _user_file(tmp_path, "bob", 1, financial=True)]
+    (tmp_path / ("0" * 32 + ".json")).write_text("{ pas du json", encoding='utf-8')
+    (tmp_path / "users.json").write_text("[]", encoding='utf-8')
+
+    summary = recompute_all(str(tmp_path), workers, 1, _END_DATE)
+
+    assert (summary["users"], summary["succeeded"], summary["failed"]) == (3, 2, 1)
+    for (path, frame), (month_mode, day) in zip(users, [('calendar', 1), ('financial', 15)]):
+        user_id = path.stem
+        for account_id, created, initial in [(1, datetime(2024, 1, 1), 100.0), (2, datetime(2024, 3, 15), 0.0),
+                                             (None, datetime(2024, 1, 1), 100.0)]:
+            expected = calculate_monthly_balances_reference(frame, created, initial, month_mode, day, _END_DATE, account_id)
+            stored = load_snapshot(snapshot_path(user_id, account_id, month_mode, day, str(tmp_path)))
+            assert stored.index.tolist() == expected.index.tolist()
+            np.testing.assert_allclose(stored.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-6)
+
+def test_second_run_reads_snapshots(tmp_path):
+    _user_file(tmp_path, "alice", 0)
+    first = recompute_all(str(tmp_path), 1, None, _END_DATE)
+    second = recompute_all(str(tmp_path), 1, None, _END_DATE)
+
+    assert first["results"][0]["transactions"] == 300
+    assert second["results"][0]["transactions"] is None
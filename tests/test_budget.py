@@ -0,0 +1,82 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from budget import calculate_forecast_balance
+from utils_date import calculate_period_dates
+
+_RULES = [
+    {"id": 1, "frequency": "monthly", "startDate": "2024-01-31T00:00:00.000Z", "amount": 800.0, "type": "expense",
+     "accountId": 1, "category": "Loyer"},
+    {"id": 2, "frequency": "biweekly", "startDate": "2024-02-29", "amount": 100.0, "type": "transfer",
+     "accountId": 1, "toAccountId": 2},
+]
+
+def _transactions(count=800, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.55, 0.15])
+    account_ids = rng.integers(1, 4, count)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(np.datetime64('2023-06-01') + rng.integers(0, 900, count)),
+        'Amount': np.round(rng.uniform(0.01, 900, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 3 + 1, account_ids).astype(float),
+    })
+
+def _reference(transactions, target_month, target_year, months, mode, start_day, initial_balance, account_id):
+    """Prévision mois par mois, par filtrage des transactions de chaque période"""
+    rows = []
+    for offset in range(months):
+        year, month = target_year + (target_month - 1 + offset) // 12, (target_month - 1 + offset) % 12 + 1
+        start, end = calculate_period_dates(month, year, mode, start_day)
+        days = transactions['Date'].dt.date
+        before, during = transactions[days < start], transactions[(days >= start) & (days <= end)]
+        rows.append([_flows(before, account_id), _flows(during, account_id)])
+    return [(initial_balance + sum(flows_before), *flows) for flows_before, flows in rows]
+
+def _flows(transactions, account_id):
+    """(revenus, dépenses, transferts) d'un compte, ou de tous les comptes sans account_id"""
+    if account_id is not None:
+        transactions = transactions[(transactions['AccountId'] == account_id) | (transactions['ToAccountId'] == account_id)]
+    amounts, types = transactions['Amount'], transactions['Type']
+    incomes = amounts[types == 'income'].sum()
+    expenses = amounts[types == 'expense'].sum()
+    transfers = 0.0
+    if account_id is not None:
+        transfer_rows = transactions[types == 'transfer']
+        transfers = (transfer_rows['Amount'][transfer_rows['ToAccountId'] == account_id].sum()
+                     - transfer_rows['Amount'][transfer_rows['AccountId'] == account_id].sum())
+    return (incomes, -expenses, transfers)
+
+@pytest.mark.parametrize("mode, start_day, account_id", [('calendaire', 1, None), ('financier', 25, 1), ('financier', 31, 2)])
+def test_forecast_matches_month_by_month_reference(mode, start_day, account_id):
+    transactions = _transactions()
+    forecast = calculate_forecast_balance(3, 2024, mode, start_day, 14, transactions, 500.0, account_id)
+
+    for (opening, incomes, expenses, transfers), row in zip(
+            _reference(transactions, 3, 2024, 14, mode, start_day, 500.0, account_id), forecast.itertuples()):
+        assert row.initial_balance == pytest.approx(opening)
+        assert (row.incomes, -row.expenses, row.transfers) == pytest.approx((incomes, expenses, transfers))
+        assert row.final_balance == pytest.approx(opening + incomes + expenses + transfers)
+
+def test_forecast_with_recurring_rules_and_string_dates():
+    transactions = pd.DataFrame({
+        'Date': ['2024-02-01T23:00:00.000Z', '2024-03-10'],
+        'Amount': [2500.0, 40.0],
+        'Type': ['income', 'expense'],
+        'AccountId': [1, 1],
+        'ToAccountId': [np.nan, np.nan],
+    })
+    forecast = calculate_forecast_balance(2, 2024, 'calendaire', 1, 2, transactions, 0.0, 1, _RULES)
+    in_cents = calculate_forecast_balance(2, 2024, 'calendaire', 1, 2, transactions, 0.0, 1, _RULES, fixed_point=True)
+
+    # Janvier : loyer du 31 ; février : salaire du 02 (heure de Paris), loyer du 29 et premier transfert du 29
+    assert forecast.loc['2024-02', 'initial_balance'] == -800.0
+    assert forecast.loc['2024-02', ['incomes', 'expenses', 'transfers']].tolist() == [2500.0, 800.0, -100.0]
+    # Mars : loyer du 31, dépense du 10 et transferts des 14 et 28
+    assert forecast.loc['2024-03', ['incomes', 'expenses', 'transfers']].tolist() == [0.0, 840.0, -200.0]
+    assert in_cents['final_balance'].tolist() == np.round(forecast['final_balance'].to_numpy() * 100).astype(np.int64).tolist()
+    assert forecast.attrs['mode'] == 'calendaire' and forecast['period_end'].iloc[-1] == np.datetime64(date(2024, 3, 31))
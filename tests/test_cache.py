@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from cache import BalanceCache
+
+def test_eviction_matches_reference_lru():
+    cache = BalanceCache(max_entries=8)
+    reference = []  # Clés de la moins à la plus récemment utilisée
+    values = {}
+    rng = random.Random(0)
+
+    for step in range(2000):
+        key = BalanceCache.make_key(f"2024-{rng.randint(1, 12):02d}", user_id=1, account_id=rng.randint(1, 2))
+        if rng.random() < 0.5:
+            cache.set(key, step)
+            values[key] = step
+            if key in reference:
+                reference.remove(key)
+            reference.append(key)
+            del reference[:-8]
+        else:
+            expected = values[key] if key in reference else None
+            if key in reference:
+                reference.remove(key)
+                reference.append(key)
+            assert cache.get(key) == expected
+
+    assert list(cache._entries) == reference
+    assert cache.stats()["size"] == 8 and cache.evictions > 0
+
+def test_invalidation_only_reaches_the_account_and_its_user_view():
+    cache = BalanceCache()
+    keys = {account_id: BalanceCache.make_key("2024-05", user_id=1, account_id=account_id) for account_id in (1, 2, None)}
+    other_user = BalanceCache.make_key("2024-05", user_id=2, account_id=1)
+    for key in [*keys.values(), other_user]:
+        cache.set(key, 100.0)
+
+    cache.invalidate_account(1, 1)
+    assert cache.get(keys[1]) is None and cache.get(keys[None]) is None
+    assert cache.get(keys[2]) == 100.0 and cache.get(other_user) == 100.0
+
+    # Une nouvelle valeur enregistrée après l'invalidation est de nouveau servie
+    cache.set(keys[1], 120.0)
+    assert cache.get(keys[1]) == 120.0
+
+    cache.invalidate_account(1)
+    assert cache.get(keys[1]) is None and cache.get(keys[2]) is None
+    assert cache.get(other_user) == 100.0
+
+def test_calendar_keys_ignore_financial_day():
+    assert BalanceCache.make_key("2024-05", month_mode='calendaire', financial_month_day=15) == \
+        BalanceCache.make_key("2024-05", month_mode='calendar')
+    assert BalanceCache.make_key("2024-05", month_mode='financier', financial_month_day=15) != \
+        BalanceCache.make_key("2024-05", month_mode='financial', financial_month_day=16)
+
+def test_resize_evicts_least_recently_used():
+    cache = BalanceCache(max_entries=4)
+    for month in range(1, 5):
+        cache.set(BalanceCache.make_key(f"2024-0{month}"), month)
+    cache.get(BalanceCache.make_key("2024-01"))
+
+    cache.resize(2)
+    assert [key[-1] for key in cache._entries] == ["2024-04", "2024-01"]
+    with pytest.raises(ValueError):
+        cache.resize(0)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import invalidate_account
+from functions.category_breakdown import OTHER_CATEGORY, UNCATEGORIZED, compute_category_pivot, get_category_pivot
+
+_CATEGORIES = ['Alimentation', 'Loyer', 'Sorties', 'Transport', 'Santé', OTHER_CATEGORY, None, '']
+
+def _transactions(count=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.2, 0.7, 0.1])
+    account_ids = rng.integers(1, 4, count)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(np.datetime64('2023-01-01') + rng.integers(0, 730, count)),
+        'Amount': np.round(rng.uniform(0.01, 300, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 3 + 1, account_ids).astype(float),
+        'Category': pd.Series(rng.choice(np.array(_CATEGORIES, dtype=object), count), dtype=object),
+    })
+
+def _reference(transactions, transaction_type, start_key, end_key, top_n, account_id):
+    """Répartition calculée avec un groupby pandas sur les mois calendaires"""
+    rows = transactions[(transactions['Type'] == transaction_type)
+                        & (transactions['Date'].dt.strftime('%Y-%m').between(start_key, end_key))]
+    if account_id is not None:
+        rows = rows[(rows['AccountId'] == account_id)
+                    | ((rows['Type'] == 'transfer') & (rows['ToAccountId'] == account_id))]
+    labels = rows['Category'].replace('', None).fillna(UNCATEGORIZED)
+    totals = rows['Amount'].groupby(labels).agg(['sum', 'count']).sort_values('sum', ascending=False)
+
+    if top_n is not None and len(totals) > top_n:
+        # Une catégorie déjà nommée comme le regroupement y est fusionnée ; le regroupement vient en dernier
+        detailed = totals.drop(OTHER_CATEGORY, errors='ignore')
+        grouped = totals.loc[totals.index == OTHER_CATEGORY]
+        if len(detailed) > top_n:
+            grouped = pd.concat([detailed.iloc[top_n:], grouped]).sum().to_frame(OTHER_CATEGORY).T
+            detailed = detailed.iloc[:top_n]
+        totals = pd.concat([detailed, grouped])
+    return totals
+
+@pytest.mark.parametrize("transaction_type, top_n, account_id", [
+    ('expense', None, None), ('expense', 3, None), ('expense', 6, 2), ('income', 2, 1), ('transfer', 1, 3),
+])
+def test_breakdown_matches_groupby(transaction_type, top_n, account_id):
+    transactions = _transactions()
+    pivot = compute_category_pivot(transactions, account_id=account_id)
+
+    for start_key, end_key in [('2023-01', '2024-12'), ('2023-05', '2023-05'), ('2024-02', '2024-09')]:
+        expected = _reference(transactions, transaction_type, start_key, end_key, top_n, account_id)
+        result = pivot.breakdown(transaction_type, start_key, end_key, top_n)
+
+        assert result['Category'].tolist() == expected.index.tolist()
+        np.testing.assert_allclose(result['Amount'].to_numpy(), expected['sum'].to_numpy(), rtol=0, atol=1e-6)
+        assert result['Count'].tolist() == expected['count'].tolist()
+        assert result['Share'].sum() == pytest.approx(1.0)
+
+def test_monthly_columns_add_up_to_breakdown():
+    pivot = compute_category_pivot(_transactions(seed=1), fixed_point=True)
+    monthly = pivot.monthly('expense', '2023-03', '2023-10', top_n=4)
+    breakdown = pivot.breakdown('expense', '2023-03', '2023-10', top_n=4)
+
+    assert monthly.index.tolist() == [f"2023-{month:02d}" for month in range(3, 11)]
+    assert monthly.columns.tolist() == breakdown['Category'].tolist()
+    assert monthly.sum().tolist() == breakdown['Amount'].tolist()
+
+def test_cached_pivot_follows_account_invalidation():
+    transactions = _transactions(count=100, seed=2)
+    first = get_category_pivot(transactions, user_id='test-category-pivot', account_id=1)
+    assert get_category_pivot(transactions, user_id='test-category-pivot', account_id=1) is first
+
+    invalidate_account('test-category-pivot', 1)
+    assert get_category_pivot(transactions, user_id='test-category-pivot', account_id=1) is not first
+
+    changed = transactions.assign(Amount=transactions['Amount'] + 1)
+    assert get_category_pivot(changed, user_id='test-category-pivot', account_id=1) is not first
@@ -0,0 +1,67 @@
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.balance_calculator import calculate_daily_balances, calculate_monthly_balances_reference
+from functions.downsampling import downsample_indices
+
+def _transactions(count=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(['income', 'expense', 'transfer'], count, p=[0.3, 0.6, 0.1])
+    account_ids = rng.integers(1, 3, count)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(np.datetime64('2022-01-01') + rng.integers(0, 3 * 365, count)),
+        'Amount': np.round(rng.uniform(0.01, 600, count), 2),
+        'Type': types,
+        'AccountId': account_ids,
+        'ToAccountId': np.where(types == 'transfer', account_ids % 2 + 1, account_ids).astype(float),
+    })
+
+def _lttb_reference(y, max_points):
+    """Largest-Triangle-Three-Buckets point par point, dans sa formulation d'origine"""
+    n = len(y)
+    every = (n - 2) / (max_points - 2)
+    selected = [0]
+    a = 0
+    for i in range(max_points - 2):
+        start, end = math.floor(i * every) + 1, math.floor((i + 1) * every) + 1
+        next_start, next_end = end, min(math.floor((i + 2) * every) + 1, n)
+        average_x = sum(range(next_start, next_end)) / (next_end - next_start)
+        average_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        areas = [abs((a - average_x) * (y[j] - y[a]) - (a - j) * (average_y - y[a])) for j in range(start, end)]
+        a = start + areas.index(max(areas))
+        selected.append(a)
+    return selected + [n - 1]
+
+@pytest.mark.parametrize("account_id", [None, 1])
+def test_month_end_days_match_monthly_reference(account_id):
+    transactions = _transactions()
+    args = (datetime(2022, 1, 1), 300.0)
+    daily = calculate_daily_balances(transactions, *args, datetime(2024, 12, 31), account_id)
+    monthly = calculate_monthly_balances_reference(transactions, *args, 'calendar', 1, datetime(2024, 12, 31), account_id)
+
+    month_ends = daily.groupby(daily.index.to_period('M')).last()
+    np.testing.assert_allclose(month_ends.to_numpy(), monthly.to_numpy(), rtol=0, atol=1e-6)
+    assert len(daily) == 1096 and daily.index[0] == pd.Timestamp('2022-01-01')
+
+def test_lttb_matches_reference():
+    balances = calculate_daily_balances(_transactions(seed=1), datetime(2022, 1, 1), 0.0, datetime(2024, 12, 31), 2)
+    for max_points in (3, 4, 50, 365, 1095):
+        selected = downsample_indices(np.arange(len(balances)), balances.to_numpy(), max_points)
+        assert selected.tolist() == _lttb_reference(balances.tolist(), max_points)
+
+def test_minmax_keeps_extremes_and_bounds():
+    transactions = _transactions(seed=2)
+    full = calculate_daily_balances(transactions, datetime(2022, 1, 1), 0.0, datetime(2024, 12, 31), fixed_point=True)
+    reduced = calculate_daily_balances(transactions, datetime(2022, 1, 1), 0.0, datetime(2024, 12, 31),
+                                       max_points=60, downsampling='minmax', fixed_point=True)
+
+    assert len(reduced) <= 60 and reduced.index.is_monotonic_increasing
+    assert reduced.index[0] == full.index[0] and reduced.index[-1] == full.index[-1]
+    assert reduced.max() == full.max() and reduced.min() == full.min()
+    assert (full.loc[reduced.index] == reduced).all()
+    with pytest.raises(ValueError):
+        downsample_indices(np.arange(10), np.arange(10), 5, 'moyenne')
@@ -0,0 +1,63 @@
+import os
+import sys
+import subprocess
+import threading
+
+from logging.logger import LogEntry
+from logging.sink import LogSink
+
+class _Unserializable:
+    def to_dict(self):
+        raise TypeError("entrée non sérialisable")
+
+def test_bad_entry_only_drops_itself(tmp_path):
+    sink = LogSink(str(tmp_path), compress=False)
+    sink.emit({"message": "avant"})
+    sink.emit(_Unserializable())
+    sink.emit(LogEntry(0.0, "INFO", "test", "après %s", (1,)))
+    sink.close(timeout=5)
+
+    assert not sink._thread.is_alive()
+    assert sink.dropped == 1
+    assert [record["message"] for record in sink.iter_records()] == ["avant", "après 1"]
+
+def test_close_does_not_wait_forever(tmp_path):
+    sink = LogSink(str(tmp_path), compress=False)
+    release = threading.Event()
+
+    class _Blocking:
+        def to_dict(self):
+            release.wait(10)
+            return {"message": "lent"}
+
+    sink.emit(_Blocking())
+    closed = threading.Event()
+    closer = threading.Thread(target=lambda: (sink.close(timeout=0.2), closed.set()))
+    closer.start()
+    assert closed.wait(5)
+
+    release.set()
+    sink.close(timeout=5)
+    assert not sink._thread.is_alive()
+
+def test_rotation_keeps_every_entry(tmp_path):
+    sink = LogSink(str(tmp_path), max_bytes=200, compress=True)
+    for i in range(50):
+        sink.emit({"message": f"entrée {i}"})
+    sink.close(timeout=5)
+
+    assert sink.rotated_files()
+    assert [record["message"] for record in sink.iter_records()] == [f"entrée {i}" for i in range(50)]
+
+def test_pending_entries_are_written_at_exit(tmp_path):
+    script = (
+        "from logging.sink import LogSink\n"
+        f"sink = LogSink({str(tmp_path)!r}, compress=False, close_timeout=5)\n"
+        "for i in range(100):\n"
+        "    sink.emit({'message': f'entrée {i}'})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(__file__)), check=True, timeout=30)
+
+    sink = LogSink(str(tmp_path), compress=False)
+    assert [record["message"] for record in sink.iter_records()] == [f"entrée {i}" for i in range(100)]
+    sink.close(timeout=5)
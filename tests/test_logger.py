@@ -0,0 +1,73 @@
+import random
+
+import pytest
+import pandas as pd
+
+from logging.logger import LogEntry, Logger
+
+def test_ring_keeps_the_latest_entries_in_order():
+    logger = Logger(max_entries=5, level="DEBUG")
+    for i in range(12):
+        logger.info("entrée %s", i, module="test")
+
+    assert len(logger) == 5
+    assert [entry["message"] for entry in logger.logs] == [f"entrée {i}" for i in range(7, 12)]
+
+    logger.clear()
+    logger.info("après", module="test")
+    assert [entry["message"] for entry in logger.logs] == ["après"]
+
+def test_messages_are_formatted_lazily():
+    calls = []
+
+    def message():
+        calls.append(1)
+        return "coûteux"
+
+    logger = Logger(level="INFO")
+    logger.debug(message, module="test")
+    logger.info(message, module="test")
+    assert calls == []
+
+    assert logger.logs[0]["message"] == "coûteux"
+    assert logger.logs[0]["message"] == "coûteux"
+    assert calls == [1]
+
+def test_mutable_arguments_are_formatted_at_log_time():
+    frame = pd.DataFrame({"a": [1]})
+    entry = LogEntry(0.0, "INFO", "test", "valeur %s", (frame,))
+    frame.loc[0, "a"] = 2
+
+    assert entry._args == () and "1" in entry.message and "2" not in entry.message
+
+def _linear_query(logger, level=None, module=None, since=None, until=None, limit=None):
+    """Filtrage naïf de toutes les entrées conservées"""
+    levels = None if level is None else {level} if isinstance(level, str) else set(level)
+    modules = None if module is None else {module} if isinstance(module, str) else set(module)
+    entries = [entry for entry in logger.entries()
+               if (levels is None or entry.level in levels) and (modules is None or entry.module in modules)
+               and (since is None or entry.created >= since) and (until is None or entry.created <= until)]
+    return entries if limit is None else entries[-limit:] if limit > 0 else []
+
+def test_query_index_matches_linear_filter():
+    rng = random.Random(0)
+    logger = Logger(max_entries=300, level="DEBUG")
+    levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+    modules = ["cache", "balance_calculator", "bank_import", "profiling"]
+    for i in range(1000):
+        logger.log("entrée %s", rng.choice(levels), rng.choice(modules), args=(i,))
+        # Horodatages croissants et reproductibles, avec des ex aequo
+        logger._entries[(logger._seq - 1) % logger.max_entries].created = 1_000_000.0 + i // 3
+
+    queries = [
+        {}, {"level": "ERROR"}, {"module": "cache"}, {"level": ["WARNING", "CRITICAL"], "module": "cache"},
+        {"module": ["cache", "profiling"], "level": "DEBUG"}, {"module": "inconnu"},
+        {"since": 1_000_250.0}, {"until": 1_000_260.0}, {"level": "INFO", "since": 1_000_240.0, "until": 1_000_300.0},
+        {"module": "bank_import", "limit": 7}, {"level": "DEBUG", "limit": 0},
+    ]
+    for filters in queries:
+        assert logger.query_entries(**filters) == _linear_query(logger, **filters), filters
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        Logger().query_entries(level="VERBOSE")
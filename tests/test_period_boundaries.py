@@ -0,0 +1,47 @@
+import calendar
+from datetime import date, timedelta
+
+import pytest
+
+from period_boundaries import get_period_boundaries, get_period_containing, get_period_dates, month_index
+from utils_date import calculate_period_dates, calculate_period_dates_range
+
+def _expected_start(year: int, month: int, start_day: int) -> date:
+    """Jour J du mois, ramené au dernier jour des mois courts"""
+    return date(year, month, min(start_day, calendar.monthrange(year, month)[1]))
+
+@pytest.mark.parametrize("start_day", range(1, 32))
+def test_boundaries_match_day_by_day_reference(start_day):
+    first, last = month_index(2023, 1), month_index(2025, 12)
+    starts, ends = get_period_boundaries('financial', start_day, first, last)
+
+    expected_starts = [_expected_start(2023 + m // 12, m % 12 + 1, start_day) for m in range(last - first + 2)]
+    assert starts.tolist() == expected_starts[:-1]
+    assert ends.tolist() == [day - timedelta(days=1) for day in expected_starts[1:]]
+
+    # Chemin scalaire et chemin vectorisé donnent les mêmes bornes
+    for offset in range(0, last - first + 1, 5):
+        assert get_period_dates('financier', start_day, first + offset) == (starts[offset].item(), ends[offset].item())
+
+    # Chaque jour tombe dans la période qui le contient
+    for day in (date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1), date(2025, 12, 31), date(2023, 2, 1)):
+        period_start, period_end = get_period_containing(day, 'financial', start_day)
+        assert period_start <= day <= period_end
+        assert period_start in starts.tolist()
+
+@pytest.mark.parametrize("mode, start_day", [('calendaire', 1), ('financier', 1), ('financier', 15), ('financier', 31)])
+def test_utils_date_single_and_range_agree(mode, start_day):
+    starts, ends = calculate_period_dates_range(1, 2024, 24, mode, start_day)
+    for offset in range(24):
+        year, month = 2024 + offset // 12, offset % 12 + 1
+        assert calculate_period_dates(month, year, mode, start_day) == (starts[offset].item(), ends[offset].item())
+    assert not starts.flags.writeable
+
+def test_invalid_arguments_are_rejected():
+    with pytest.raises(ValueError):
+        get_period_boundaries('hebdomadaire', 1, 0, 1)
+    with pytest.raises(ValueError):
+        calculate_period_dates(13, 2024)
+    with pytest.raises(ValueError):
+        calculate_period_dates_range(1, 2024, 0)
+    assert get_period_boundaries('calendar', 1, 5, 4)[0].size == 0
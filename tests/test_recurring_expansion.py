@@ -0,0 +1,87 @@
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from functions.recurring_expansion import expand_recurring_transactions, merge_with_transactions
+
+_RULES = [
+    {"id": 1, "frequency": "monthly", "startDate": "2024-01-31T00:00:00.000Z", "amount": 800.0, "type": "expense",
+     "accountId": 1, "category": "Loyer"},
+    {"id": 2, "frequency": "weekly", "startDate": "2024-01-03", "nextExecution": "2024-03-06", "endDate": "2024-05-01",
+     "amount": 20.0, "type": "expense", "accountId": 1},
+    {"id": 3, "frequency": "quarterly", "startDate": "2023-11-30", "amount": 150.0, "type": "income", "accountId": 2},
+    {"id": 4, "frequency": "biweekly", "startDate": "2024-02-29", "amount": 100.0, "type": "transfer",
+     "accountId": 1, "toAccountId": 2},
+    {"id": 5, "frequency": "yearly", "startDate": "2020-02-29", "amount": 60.0, "type": "expense", "accountId": 2},
+    {"id": 6, "frequency": "daily", "startDate": "2024-06-25", "endDate": "2024-07-02", "amount": 1.5,
+     "type": "expense", "accountId": 2},
+    {"id": 7, "frequency": "hourly", "startDate": "2024-01-01", "amount": 1.0, "type": "expense", "accountId": 1},
+]
+
+def _add_months(anchor: date, months: int) -> date:
+    year, month = divmod(anchor.month - 1 + months, 12)
+    year += anchor.year
+    return date(year, month + 1, min(anchor.day, calendar.monthrange(year, month + 1)[1]))
+
+def _expected(rules, horizon_start: date, horizon_end: date) -> list:
+    """Échéances calculées règle par règle et échéance par échéance"""
+    day_steps = {'daily': 1, 'weekly': 7, 'biweekly': 14}
+    month_steps = {'monthly': 1, 'quarterly': 3, 'yearly': 12}
+    occurrences = []
+    for rule in rules:
+        if rule["frequency"] not in day_steps and rule["frequency"] not in month_steps:
+            continue
+        anchor = date.fromisoformat(rule["startDate"][:10])
+        first = max(anchor, horizon_start, date.fromisoformat(rule.get("nextExecution", rule["startDate"])[:10]))
+        last = min(horizon_end, date.fromisoformat(rule["endDate"][:10]) if rule.get("endDate") else date.max)
+        k = 0
+        while True:
+            if rule["frequency"] in day_steps:
+                day = anchor + timedelta(days=k * day_steps[rule["frequency"]])
+            else:
+                day = _add_months(anchor, k * month_steps[rule["frequency"]])
+            if day > last:
+                break
+            if day >= first:
+                occurrences.append((day, rule["amount"], rule["accountId"]))
+            k += 1
+    return sorted(occurrences)
+
+def test_expansion_matches_rule_by_rule_walk():
+    horizon_start, horizon_end = date(2024, 2, 1), date(2025, 3, 31)
+    occurrences = expand_recurring_transactions(_RULES, horizon_start, horizon_end)
+
+    result = sorted(zip(occurrences.days.astype('datetime64[D]').tolist(), occurrences.amounts.tolist(),
+                        occurrences.account_ids.tolist()))
+    assert result == _expected(_RULES, horizon_start, horizon_end)
+
+def test_month_end_anchor_is_kept():
+    occurrences = expand_recurring_transactions(_RULES[:1], date(2024, 1, 1), date(2024, 5, 31))
+    assert np.datetime_as_string(occurrences.days.astype('datetime64[D]')).tolist() == [
+        '2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30', '2024-05-31']
+
+def test_empty_horizon():
+    assert len(expand_recurring_transactions(_RULES, date(2024, 3, 1), date(2024, 2, 1))) == 0
+
+def test_rule_dates_are_local_days():
+    rule = dict(_RULES[0], startDate="2024-01-30T23:00:00.000Z")
+    occurrences = expand_recurring_transactions([rule], date(2024, 1, 1), date(2024, 2, 29))
+    assert np.datetime_as_string(occurrences.days.astype('datetime64[D]')).tolist() == ['2024-01-31', '2024-02-29']
+
+def test_merge_with_string_dated_dataframe():
+    transactions = pd.DataFrame({
+        'Date': ['2024-02-01T23:00:00.000Z', '2024-01-15'],
+        'Amount': [10.0, 20.0],
+        'Type': ['income', 'expense'],
+        'AccountId': [1, 1],
+    })
+    occurrences = expand_recurring_transactions(_RULES[:1], date(2024, 1, 1), date(2024, 2, 29))
+
+    merged = merge_with_transactions(transactions, occurrences)
+
+    assert merged.columns.tolist() == ['Date', 'Amount', 'Type', 'AccountId']
+    assert merged['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-15', '2024-01-31', '2024-02-02', '2024-02-29']
+    assert merged['Amount'].tolist() == [20.0, 800.0, 10.0, 800.0]
+    assert transactions['Date'].tolist() == ['2024-02-01T23:00:00.000Z', '2024-01-15']
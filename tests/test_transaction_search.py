@@ -0,0 +1,37 @@
+import pytest
+
+from functions.transaction_search import TransactionSearchIndex
+
+def _index():
+    return TransactionSearchIndex.from_records([
+        {"id": 1, "date": "2024-01-02T00:00:00.000Z", "amount": 3.2, "type": "expense", "accountId": 1,
+         "description": "Café de la gare", "category": "Sorties"},
+    ])
+
+def test_failed_batch_leaves_index_unchanged():
+    index = _index()
+    with pytest.raises(ValueError):
+        index.add_records([{"id": 2, "date": "2024-01-03", "description": "Boulangerie Paul"},
+                           {"id": 3, "amount": 1.0}])
+
+    assert 2 not in index and len(index) == 1
+    assert index.suggest("boul") == []
+    index.add({"id": 2, "date": "2024-01-03", "description": "Boulangerie Paul"})
+    assert index.search("boul")["Id"].tolist() == [2]
+
+def test_invalid_update_keeps_previous_version():
+    index = _index()
+    with pytest.raises(ValueError):
+        index.update({"id": 1, "description": "Boulangerie"})
+
+    assert index.search("cafe")["Id"].tolist() == [1]
+    index.update({"id": 1, "date": "2024-01-02", "description": "Boulangerie"})
+    assert index.search("cafe").empty
+    assert index.search("boul")["Id"].tolist() == [1]
+
+def test_date_filter_uses_local_days():
+    index = _index()
+    index.add({"id": 2, "date": "2024-03-01T23:00:00.000Z", "description": "Boulangerie Paul"})
+
+    assert index.search("boulangerie", start_date="2024-03-02", end_date="2024-03-02")["Id"].tolist() == [2]
+    assert index.search("boulangerie", end_date="2024-03-01").empty
@@ -0,0 +1,56 @@
+import io
+import json
+
+import pytest
+
+from functions.user_data_reader import (JsonStreamReader, iter_transaction_chunks, read_preferences,
+                                        read_user_section)
+
+# Chaînes échappées, caractères non ASCII, nombres et structures imbriquées, pour couper les blocs partout
+_DOCUMENT = {
+    "username": "test \"guillemets\" \\ barre",
+    "data": {
+        "accounts": [{"id": 1, "name": "Compte épargne ✓", "initialBalance": -12.5e2}],
+        "transactions": [{"id": i, "amount": i * 1.25, "description": "Achat [{]}\" n°%d" % i,
+                          "tags": [[], {}, None, True]} for i in range(25)],
+        "preferences": {"useFinancialMonth": True, "financialMonthStartDay": 25}
+    },
+    "trailing": 123456789012
+}
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 7, 64, 1 << 16])
+def test_read_value_matches_json(buffer_size):
+    text = json.dumps(_DOCUMENT, ensure_ascii=False, indent=1)
+    reader = JsonStreamReader(io.StringIO(text), buffer_size)
+    assert reader.read_value() == _DOCUMENT
+
+@pytest.mark.parametrize("buffer_size", [1, 3, 64])
+def test_iter_object_skips_values(buffer_size):
+    text = json.dumps(_DOCUMENT, ensure_ascii=False)
+    reader = JsonStreamReader(io.StringIO(text), buffer_size)
+    values = {}
+    for key in reader.iter_object():
+        if key == "trailing":
+            values[key] = reader.read_value()
+        else:
+            reader.skip_value()
+    assert values == {"trailing": 123456789012}
+
+def test_truncated_document_raises():
+    text = json.dumps(_DOCUMENT)[:-20]
+    reader = JsonStreamReader(io.StringIO(text), 8)
+    with pytest.raises(ValueError):
+        for _ in reader.iter_object():
+            reader.skip_value()
+
+def test_user_file_sections(tmp_path):
+    path = tmp_path / "user.json"
+    path.write_text(json.dumps(_DOCUMENT, ensure_ascii=False), encoding="utf-8")
+
+    assert read_user_section(str(path), "accounts") == _DOCUMENT["data"]["accounts"]
+    assert read_user_section(str(path), "recurringTransactions") is None
+    assert read_preferences(str(path)) == _DOCUMENT["data"]["preferences"]
+
+    chunks = list(iter_transaction_chunks(str(path), chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [t for chunk in chunks for t in chunk] == _DOCUMENT["data"]["transactions"]
@@ -1,6 +1,44 @@
+import re
 from datetime import date, datetime, timedelta
-import calendar
+import numpy as np
+import pandas as pd
+from period_boundaries import get_period_boundaries, get_period_dates, month_index
+from profiling import profiled
 
+# Fuseau horaire de l'application : les dates sont saisies en heure locale puis enregistrées en UTC
+APP_TIMEZONE = 'Europe/Paris'
+
+# Suffixe des dates ISO avec fuseau ('Z' ou décalage '+01:00')
+_AWARE_SUFFIX = re.compile(r'(?:Z|[+-]\d{2}:?\d{2})$')
+
+def local_days(dates, timezone: str = APP_TIMEZONE) -> np.ndarray:
+    """
+    Calcule le jour local de dates ISO enregistrées par l'application.
+
+    Une opération saisie le 02/03 est enregistrée '2025-03-01T23:00:00.000Z' : le jour retenu est celui de
+    la date ramenée dans le fuseau `timezone` (02/03), et non les 10 premiers caractères (01/03).
+    Les dates sans fuseau ('2025-03-02') sont déjà locales et gardent leur jour.
+
+    Args:
+        dates (iterable): Dates ISO (str), None pour une date absente
+        timezone (str): Fuseau horaire des jours calculés
+
+    Returns:
+        np.ndarray: Jours locaux (datetime64[D]), NaT pour les dates absentes ou invalides
+    """
+    values = pd.Series([None if value is None else str(value) for value in dates], dtype=object)
+    aware = values.str.contains(_AWARE_SUFFIX, na=False).to_numpy()
+
+    days = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[D]')
+    if aware.any():
+        timestamps = pd.to_datetime(values[aware], utc=True, errors='coerce', format='ISO8601')
+        days[aware] = timestamps.dt.tz_convert(timezone).dt.tz_localize(None).to_numpy().astype('datetime64[D]')
+    if not aware.all():
+        timestamps = pd.to_datetime(values[~aware], errors='coerce', format='ISO8601')
+        days[~aware] = timestamps.to_numpy().astype('datetime64[D]')
+    return days
+
+@profiled()
 def calculate_period_dates(target_month: int, target_year: int, mode: str = 'calendaire', financial_start_day: int = 1) -> tuple:
     """
     Calcule les dates de début et de fin d'une période mensuelle selon le mode choisi.
@@ -32,40 +70,51 @@ def calculate_period_dates(target_month: int, target_year: int, mode: str = 'cal
     if not 1 <= financial_start_day <= 31:
         raise ValueError("Le jour de début du mois financier doit être compris entre 1 et 31")
     
-    if mode == 'calendaire':
-        # Mode calendaire: du 1er au dernier jour du mois
-        start_date = date(target_year, target_month, 1)
-        
-        # Obtenir le dernier jour du mois (en tenant compte des mois de longueur variable)
-        last_day = calendar.monthrange(target_year, target_month)[1]
-        end_date = date(target_year, target_month, last_day)
-        
-    else:  # mode == 'financier'
-        # Mode financier: du jour J du mois M-1 au jour J-1 du mois M
-        
-        # Calculer le mois et l'année précédents
-        if target_month == 1:  # Janvier
-            prev_month = 12
-            prev_year = target_year - 1
-        else:
-            prev_month = target_month - 1
-            prev_year = target_year
-        
-        # S'assurer que financial_start_day ne dépasse pas le nombre de jours du mois précédent
-        prev_month_days = calendar.monthrange(prev_year, prev_month)[1]
-        actual_start_day = min(financial_start_day, prev_month_days)
-        
-        # Date de début: jour J du mois précédent
-        start_date = date(prev_year, prev_month, actual_start_day)
-        
-        # Calculer la date de fin (veille du jour J du mois courant)
-        if financial_start_day == 1:
-            # Si le jour de début est le 1er, la fin est le dernier jour du mois précédent
-            end_date = date(prev_year, prev_month, prev_month_days)
-        else:
-            # S'assurer que le jour de fin n'excède pas le nombre de jours du mois courant
-            current_month_days = calendar.monthrange(target_year, target_month)[1]
-            end_day = min(financial_start_day - 1, current_month_days)
-            end_date = date(target_year, target_month, end_day)
-    
-    return (start_date, end_date)
+    # Mois d'ancrage de la période : le mois cible en mode calendaire, le mois précédent en mode financier
+    # (du jour J du mois M-1 à la veille du jour J du mois M, J étant ramené au dernier jour des mois courts)
+    anchor = month_index(target_year, target_month)
+    if mode == 'financier':
+        anchor -= 1
+    
+    # Une seule période : calcul direct sur des dates (calculate_period_dates_range pour plusieurs mois)
+    return get_period_dates(mode, financial_start_day, anchor)
+
+@profiled()
+def calculate_period_dates_range(target_month: int, target_year: int, months: int, mode: str = 'calendaire', financial_start_day: int = 1) -> tuple:
+    """
+    Calcule en un seul appel les dates de début et de fin de plusieurs périodes mensuelles consécutives.
+    
+    Chaque période est celle que retournerait `calculate_period_dates` pour le mois correspondant.
+    
+    Args:
+        target_month (int): Premier mois cible (1-12)
+        target_year (int): Année du premier mois cible
+        months (int): Nombre de mois cibles consécutifs
+        mode (str): Mode de calcul ('calendaire' ou 'financier')
+        financial_start_day (int): Jour de début du mois financier (1-31)
+    
+    Returns:
+        tuple: (start_dates, end_dates) tableaux NumPy datetime64[D] en lecture seule
+    
+    Exemples:
+        # Mode financier avec début au 15, de Janvier à Mars 2025
+        calculate_period_dates_range(1, 2025, 3, 'financier', 15)
+        # Retourne: débuts [2024-12-15, 2025-01-15, 2025-02-15], fins [2025-01-14, 2025-02-14, 2025-03-14]
+    """
+    if mode not in ['calendaire', 'financier']:
+        raise ValueError("Le mode doit être 'calendaire' ou 'financier'")
+    
+    if not 1 <= target_month <= 12:
+        raise ValueError("Le mois doit être compris entre 1 et 12")
+    
+    if not 1 <= financial_start_day <= 31:
+        raise ValueError("Le jour de début du mois financier doit être compris entre 1 et 31")
+    
+    if months < 1:
+        raise ValueError("Le nombre de mois doit être au moins 1")
+    
+    anchor = month_index(target_year, target_month)
+    if mode == 'financier':
+        anchor -= 1
+    
+    return get_period_boundaries(mode, financial_start_day, anchor, anchor + months - 1)